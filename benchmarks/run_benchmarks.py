@@ -0,0 +1,292 @@
+"""
+Performans Benchmark Paketi - Sentetik veri ölçeklerinde (1x, 100x, 10000x)
+boru hattı aşamalarının süresi ve tepe belleği; sonuçlar commit bazında
+saklanır ve önceki sonuçlarla karşılaştırılır
+
+Kullanım:
+    python benchmarks/run_benchmarks.py --scales 1x 100x --repeat 3
+    python benchmarks/run_benchmarks.py --scales 10000x --repeat 1 --compare latest
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config.settings import settings
+from config.startup import configure_logging
+from benchmarks.datasets import SCALES, build_dataset, scale_shape
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+STAGES = ["ingest_dam", "ingest_weather", "merge", "features", "analysis", "forecast",
+          "quantile_fit", "quantile_predict", "report", "write_results"]
+
+def pipeline_stages(dam_csv: str, weather_csv: str, days: int,
+                    predict_days: int, output_dir: str) -> List[Tuple[str, Callable[[], Any]]]:
+    """Taze uygulama üzerinde sırayla çalışacak (aşama, fonksiyon) listesi"""
+    from main import IzmirDamPredictionApp
+    from services.quantile_service import QuantileForecaster
+
+    app = IzmirDamPredictionApp()
+    app.setup_data_sources(dam_source="csv", weather_source="csv",
+                           dam_csv_path=dam_csv, weather_csv_path=weather_csv)
+    forecaster = QuantileForecaster(feature_engine=app.feature_engine)
+
+    def has_features() -> bool:
+        return app.features is not None and not app.features.empty
+
+    def check(result: bool, message: str) -> bool:
+        if not result:
+            raise RuntimeError(message)
+        return result
+
+    return [
+        ("ingest_dam", lambda: check(app.load_dam_data(days=days), "Baraj verileri yüklenemedi")),
+        ("ingest_weather", lambda: check(app.load_weather_data(days=days), "Meteorolojik veriler yüklenemedi")),
+        ("merge", lambda: check(app.process_data(), "Veri birleştirme başarısız")),
+        ("features", app.engineer_features),
+        ("analysis", app.analyze_dams),
+        ("forecast", lambda: app.predict_future_levels(predict_days)),
+        # Özellik üretilemeyen küçük ölçeklerde kantil aşamaları boş geçer
+        ("quantile_fit", lambda: forecaster.fit(app.features) if has_features() else None),
+        ("quantile_predict", lambda: forecaster.predict(app.features, predict_days) if forecaster.is_fitted else None),
+        ("report", app.generate_report),
+        ("write_results", lambda: app.save_results(output_dir)),
+    ]
+
+def run_pipeline(dam_csv: str, weather_csv: str, days: int, predict_days: int, output_dir: str,
+                 skip: Set[str] = frozenset(), measure_memory: bool = False) -> Dict[str, float]:
+    """
+    Boru hattını bir kez çalıştır
+
+    Returns:
+        Dict: aşama -> süre (saniye); measure_memory ise aşama -> tepe bellek (MB)
+    """
+    measurements = {}
+    for name, func in pipeline_stages(dam_csv, weather_csv, days, predict_days, output_dir):
+        if name in skip:
+            continue
+        if measure_memory:
+            tracemalloc.reset_peak()
+            func()
+            measurements[name] = tracemalloc.get_traced_memory()[1] / 1e6
+        else:
+            started = time.perf_counter()
+            func()
+            measurements[name] = time.perf_counter() - started
+    return measurements
+
+def benchmark_scale(scale: str, repeat: int, seed: int, predict_days: int, workdir: str,
+                    skip: Set[str] = frozenset(), memory: bool = True) -> Dict[str, Any]:
+    """Tek ölçek: veri üretimi, repeat kez süre ölçümü ve isteğe bağlı bir bellek ölçümü"""
+    started = time.perf_counter()
+    dam_data, weather_data, registry = build_dataset(scale, seed)
+    generate_seconds = time.perf_counter() - started
+
+    dam_csv = os.path.join(workdir, f"dam_{scale}.csv")
+    weather_csv = os.path.join(workdir, f"weather_{scale}.csv")
+    dam_data.to_csv(dam_csv, index=False)
+    weather_data.to_csv(weather_csv, index=False)
+    days = int(dam_data["date"].nunique())
+    output_dir = os.path.join(workdir, "results")
+
+    saved_registry = settings.dam_registry
+    settings.dam_registry = registry
+    try:
+        runs = [run_pipeline(dam_csv, weather_csv, days, predict_days, output_dir, skip)
+                for _ in range(repeat)]
+        peaks = {}
+        if memory:
+            # tracemalloc süreleri bozar; bellek ayrı bir geçişte ölçülür
+            tracemalloc.start()
+            try:
+                peaks = run_pipeline(dam_csv, weather_csv, days, predict_days, output_dir, skip,
+                                     measure_memory=True)
+            finally:
+                tracemalloc.stop()
+    finally:
+        settings.dam_registry = saved_registry
+
+    stages = {}
+    for stage in STAGES:
+        if stage in skip:
+            stages[stage] = {"skipped": True}
+            continue
+        seconds = [run[stage] for run in runs]
+        stages[stage] = {"min_seconds": round(min(seconds), 6),
+                         "median_seconds": round(statistics.median(seconds), 6),
+                         "runs": [round(value, 6) for value in seconds]}
+        if stage in peaks:
+            stages[stage]["peak_mb"] = round(peaks[stage], 3)
+    return {"dams": int(dam_data["dam_name"].nunique()), "days": days, "dam_rows": len(dam_data),
+            "weather_rows": len(weather_data), "generate_seconds": round(generate_seconds, 4), "stages": stages}
+
+# -- Sonuç saklama ve karşılaştırma ------------------------------------------
+
+def git_commit() -> str:
+    """Kısa commit özeti (çalışma ağacı değişmişse "-dirty" eki)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=PROJECT_ROOT).returncode != 0
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def environment() -> Dict[str, Any]:
+    import numpy
+    import pandas
+    import sklearn
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+            "sklearn": sklearn.__version__}
+
+def save_results(results: Dict[str, Any], results_dir: str = RESULTS_DIR) -> str:
+    """Sonuçları <zaman>_<commit>.json olarak atomik yaz"""
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(results_dir, f"{stamp}_{results['commit']}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def latest_results(results_dir: str = RESULTS_DIR, exclude: str = None) -> Optional[str]:
+    """Dizindeki en yeni sonuç dosyası"""
+    if not os.path.isdir(results_dir):
+        return None
+    paths = sorted(os.path.join(results_dir, name) for name in os.listdir(results_dir) if name.endswith(".json"))
+    paths = [path for path in paths if exclude is None or os.path.abspath(path) != os.path.abspath(exclude)]
+    return paths[-1] if paths else None
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float) -> List[Dict[str, Any]]:
+    """
+    Ortak ölçek/aşamalarda medyan süre ve tepe bellek oranları
+
+    Returns:
+        List[Dict]: scale, stage, oranlar ve regression bayrağı (oran > threshold)
+    """
+    rows = []
+    for scale, result in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if base is None:
+            continue
+        for stage, stats in result["stages"].items():
+            base_stats = base["stages"].get(stage)
+            if base_stats is None or stats.get("skipped") or base_stats.get("skipped"):
+                continue
+            time_ratio = stats["median_seconds"] / max(base_stats["median_seconds"], 1e-9)
+            memory_ratio = (stats["peak_mb"] / max(base_stats["peak_mb"], 1e-9)
+                            if "peak_mb" in stats and "peak_mb" in base_stats else None)
+            rows.append({"scale": scale, "stage": stage,
+                         "baseline_seconds": base_stats["median_seconds"], "seconds": stats["median_seconds"],
+                         "time_ratio": time_ratio, "memory_ratio": memory_ratio,
+                         # 10 ms altı aşamalardaki ölçüm gürültüsü gerileme sayılmaz
+                         "regression": (time_ratio > threshold and stats["median_seconds"] > 0.01)
+                         or (memory_ratio is not None and memory_ratio > threshold)})
+    return rows
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = []
+    for scale, result in results["scales"].items():
+        lines.append(f"\n[{scale}] {result['dams']} baraj x {result['days']} gün "
+                     f"({result['dam_rows']} satır, üretim {result['generate_seconds']:.2f}s)")
+        lines.append(f"  {'Aşama':<18}{'Medyan (s)':>12}{'En iyi (s)':>12}{'Tepe (MB)':>12}")
+        for stage, stats in result["stages"].items():
+            if stats.get("skipped"):
+                lines.append(f"  {stage:<18}{'atlandı':>12}")
+                continue
+            peak = f"{stats['peak_mb']:.1f}" if "peak_mb" in stats else "-"
+            lines.append(f"  {stage:<18}{stats['median_seconds']:>12.4f}{stats['min_seconds']:>12.4f}{peak:>12}")
+    return "\n".join(lines)
+
+def format_comparison(rows: List[Dict[str, Any]], baseline_path: str) -> str:
+    lines = [f"\nKarşılaştırma: {os.path.basename(baseline_path)}",
+             f"  {'Ölçek':<8}{'Aşama':<18}{'Önce (s)':>10}{'Şimdi (s)':>11}{'Süre':>8}{'Bellek':>8}"]
+    for row in rows:
+        flag = "  GERİLEME" if row["regression"] else ""
+        memory = f"{row['memory_ratio']:.2f}x" if row["memory_ratio"] is not None else "-"
+        lines.append(f"  {row['scale']:<8}{row['stage']:<18}{row['baseline_seconds']:>10.4f}{row['seconds']:>11.4f}"
+                     f"{row['time_ratio']:>7.2f}x{memory:>8}{flag}")
+    return "\n".join(lines)
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="İzmir baraj boru hattı performans benchmark'ları")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["1x", "100x"],
+                        help="Veri ölçekleri (data/*.csv boyutunun katları)")
+    parser.add_argument("--repeat", type=int, default=3, help="Ölçek başına süre ölçümü tekrarı")
+    parser.add_argument("--seed", type=int, default=42, help="Sentetik veri tohumu")
+    parser.add_argument("--predict-days", type=int, default=settings.model.prediction_days, help="Tahmin ufku (gün)")
+    parser.add_argument("--skip", nargs="+", choices=STAGES, default=[],
+                        help="Atlanacak aşamalar (quantile_fit atlanırsa quantile_predict de atlanır)")
+    parser.add_argument("--no-memory", action="store_true", help="Tepe bellek geçişini atla")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Sonuç dizini")
+    parser.add_argument("--compare", metavar="SONUÇ.json|latest", help="Karşılaştırılacak önceki sonuç")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Gerileme sayılan oran (ör. 1.2 = %%20)")
+    parser.add_argument("--no-save", action="store_true", help="Sonucu saklama")
+    parser.add_argument("--verbose", action="store_true", help="Uygulama loglarını göster")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    if args.repeat < 1:
+        raise ValueError(f"Tekrar sayısı pozitif olmalı: {args.repeat}")
+
+    skip = set(args.skip)
+    if "quantile_fit" in skip:
+        skip.add("quantile_predict")
+
+    results_dir = os.path.abspath(args.results_dir)
+    baseline_path = None
+    if args.compare:
+        baseline_path = latest_results(results_dir) if args.compare == "latest" else os.path.abspath(args.compare)
+        if baseline_path is None:
+            print("Karşılaştırılacak önceki sonuç bulunamadı", file=sys.stderr)
+            return 2
+
+    # Uygulamanın göreli yollarla yazdığı model deposu, uyarı durumu ve loglar
+    # geçici çalışma dizinine düşer; depo ağacı değişmez
+    workdir = tempfile.mkdtemp(prefix="izmir_bench_")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        configure_logging(level="INFO" if args.verbose else "WARNING")
+        results = {"created_at": datetime.now().isoformat(), "commit": git_commit(),
+                   "environment": environment(), "repeat": args.repeat, "seed": args.seed,
+                   "predict_days": args.predict_days, "skipped": sorted(skip), "scales": {}}
+        for scale in args.scales:
+            n_dams, n_days = scale_shape(SCALES[scale])
+            print(f"{scale}: {n_dams} baraj x {n_days} gün ölçülüyor...", flush=True)
+            results["scales"][scale] = benchmark_scale(scale, args.repeat, args.seed, args.predict_days, workdir,
+                                                       skip, memory=not args.no_memory)
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_results(results))
+    if not args.no_save:
+        print(f"\nSonuç: {save_results(results, results_dir)}")
+
+    if baseline_path is not None:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            rows = compare_results(results, json.load(f), args.threshold)
+        print(format_comparison(rows, baseline_path))
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 """
 Google Colab için İzmir Baraj Doluluk ve Kuraklık Riski Tahmini
 Bu dosya Colab'da çalıştırılmak üzere optimize edilmiştir.
+Tek başına açılıp çalıştırıldığı için paket modüllerini (config, services)
+import etmez; örnek veri üreteçleri bu yüzden burada ayrıca bulunur.
 """
 
 # Gerekli kütüphaneleri import et
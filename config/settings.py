@@ -2,11 +2,23 @@
 İzmir Baraj Doluluk ve Kuraklık Riski Tahmini - Konfigürasyon Ayarları
 """
 import os
-from typing import Dict, List, Optional
+import logging
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional
 from pydantic import BaseSettings, Field
-from dotenv import load_dotenv
 
-load_dotenv()
+if TYPE_CHECKING:
+    from models.dam_registry import DamRegistry
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    """.env dosyasını ilk konfigürasyon erişiminde (bir kez) yükle"""
+    from dotenv import load_dotenv
+    load_dotenv()
 
 class APIConfig(BaseSettings):
     """API konfigürasyon sınıfı"""
@@ -67,6 +79,19 @@ class APIConfig(BaseSettings):
         description="MGM hava durumu endpoint'i"
     )
     
+    # Yerel Sorgu Servisi
+    service_host: str = Field(default="127.0.0.1", description="Sorgu servisinin dinlediği adres (yalnızca yerel)")
+    service_port: int = Field(default=8765, description="Sorgu servisi portu")
+    service_cache_size: int = Field(default=256, description="Anlık görüntü başına saklanan parametreli yanıt sayısı")
+    
+    # Anlık Bildirim (SSE/WebSocket)
+    push_queue_size: int = Field(default=64, description="Abone başına bekleyen olay sınırı")
+    push_overflow_policy: str = Field(default="drop_oldest", description="Kuyruk dolunca: drop_oldest (resync gönder) veya disconnect")
+    push_heartbeat_seconds: float = Field(default=15.0, description="Boşta bağlantılar için canlılık sinyali aralığı (saniye)")
+    push_replay_size: int = Field(default=256, description="Yeniden bağlanan istemciler için tutulan son olay sayısı")
+    push_max_subscribers: int = Field(default=10000, description="Eşzamanlı abone sınırı")
+    push_breach_probability_step: float = Field(default=0.05, description="Eşik aşımı olasılığı olayı için minimum değişim")
+    
     # API Timeout ve Retry Ayarları
     api_timeout: int = Field(default=30, description="API timeout süresi (saniye)")
     max_retries: int = Field(default=3, description="Maksimum retry sayısı")
@@ -81,6 +106,13 @@ class DataConfig(BaseSettings):
         description="Desteklenen veri kaynakları"
     )
     
+    # Baraj Kaydı
+    dam_registry_path: str = Field(
+        default="data/dams.json",
+        description="Baraj kaydı dosyası (.json, .csv veya SQLite .db); göreli yol bulunamazsa proje kökünde aranır"
+    )
+    dam_registry_cell_deg: float = Field(default=0.5, description="Baraj mekânsal indeks hücre boyu (derece)")
+    
     # CSV Dosya Yolları
     csv_dam_data_path: str = Field(
         default="data/izmir_dam_data.csv",
@@ -91,6 +123,45 @@ class DataConfig(BaseSettings):
         description="Meteorolojik veriler CSV dosya yolu"
     )
     
+    # Gridli Reanaliz (ERA5-Land NetCDF/Zarr) Ayarları
+    gridded_data_path: Optional[str] = Field(
+        default=None,
+        description="Gridli reanaliz dosya yolu (.nc veya .zarr)"
+    )
+    catchment_mask_path: Optional[str] = Field(
+        default="data/catchment_masks.npz",
+        description="Önceden hesaplanmış havza ağırlık maskeleri"
+    )
+    catchment_radius_km: float = Field(default=15.0, description="Maske yoksa kullanılacak havza yarıçapı (km)")
+    gridded_time_chunk_days: int = Field(default=31, description="Gridli veri okuma parça boyu (gün)")
+    gridded_precipitation_accumulated: bool = Field(
+        default=True,
+        description="Gridli yağış 00 UTC'den beri birikimli mi (ERA5-Land tp); adım başına yağış veren kaynaklarda False"
+    )
+    
+    # Baraj Alan-Kot-Hacim Eğrileri
+    dam_curve_path: Optional[str] = Field(
+        default="data/dam_curves.csv",
+        description="Batimetri eğri tablosu (dam_name, elevation_m, area_km2, volume_mcm)"
+    )
+    synthetic_curve_knots: int = Field(default=41, description="Tablosu olmayan barajlar için sentetik eğri düğüm sayısı")
+
+    # Sentetik (Örnek) Veri
+    synthetic_seed: Optional[int] = Field(
+        default=None,
+        description="Örnek veri üreteci tohumu (None ise her çağrıda farklı veri)"
+    )
+    synthetic_chunk_days: int = Field(default=365, description="Sentetik veri üretim/yazım parça boyu (gün)")
+
+    # Sonuç Çıktıları
+    results_dir: str = Field(default="results", description="Sonuç dışa aktarım dizini")
+    results_table_format: str = Field(default="parquet", description="Tablo çıktı formatı (parquet veya csv)")
+    results_compression: Optional[str] = Field(default="zstd", description="Tablo sıkıştırması (parquet: zstd/snappy/gzip, csv: gzip)")
+    results_chunk_rows: int = Field(default=100_000, description="Parça başına yazılan satır sayısı")
+
+    # Meteorolojik Veri Birimleri
+    weather_wind_speed_unit: str = Field(default="km/h", description="Meteorolojik verideki rüzgar hızı birimi (km/h veya m/s)")
+    
     # Veri Kalitesi Ayarları
     min_data_points: int = Field(default=30, description="Minimum veri noktası sayısı")
     max_missing_ratio: float = Field(default=0.2, description="Maksimum eksik veri oranı")
@@ -98,6 +169,8 @@ class DataConfig(BaseSettings):
     # Veri Güncelleme Ayarları
     data_update_interval: int = Field(default=3600, description="Veri güncelleme aralığı (saniye)")
     cache_duration: int = Field(default=1800, description="Cache süresi (saniye)")
+    refresh_jitter_seconds: float = Field(default=60.0, description="Yenileme zamanına eklenen rastgele gecikme üst sınırı (saniye)")
+    refresh_on_start: bool = Field(default=True, description="Zamanlayıcı başlarken hemen bir yenileme yap")
 
 class ModelConfig(BaseSettings):
     """Model konfigürasyon sınıfı"""
@@ -114,6 +187,76 @@ class ModelConfig(BaseSettings):
     )
     cross_validation_folds: int = Field(default=5, description="Cross-validation fold sayısı")
     test_size: float = Field(default=0.2, description="Test set oranı")
+    model_params: Dict[str, Dict] = Field(
+        default={},
+        description="Model tipine göre hiperparametreler"
+    )
+    training_mode: str = Field(default="per_dam", description="Eğitim modu (per_dam veya global)")
+    n_jobs: int = Field(default=-1, description="Paralel işçi süreç sayısı (-1: tüm çekirdekler)")
+    model_registry_dir: str = Field(default="model_registry", description="Eğitilmiş model deposu dizini")
+    model_cache_size: int = Field(default=16, description="Bellekte tutulacak yüklü model sayısı")
+
+    # Hiperparametre Araması
+    tuning_strategy: str = Field(default="successive_halving", description="Arama stratejisi (successive_halving veya hyperband)")
+    tuning_n_candidates: int = Field(default=27, description="Ardışık yarılamada başlangıç aday sayısı")
+    tuning_reduction_factor: int = Field(default=3, description="Her basamakta aday azaltma katsayısı (eta)")
+    tuning_min_budget: float = Field(default=1 / 9, description="İlk basamakta kullanılan eğitim verisi oranı")
+    tuning_search_spaces: Dict[str, Dict[str, List]] = Field(
+        default={},
+        description="Model tipine göre arama uzayı (varsayılanları ezer)"
+    )
+    
+    # Kantil (Aralık) Tahmini
+    quantile_levels: List[float] = Field(default=[0.1, 0.5, 0.9], description="Tahmin edilecek kantiller")
+    quantile_horizons: List[int] = Field(
+        default=[1, 3, 7, 14, 21, 30],
+        description="Ayrı kantil modeli eğitilecek ufuklar (gün), ara günler enterpole edilir"
+    )
+    
+    # Çevrimiçi (artımlı) Öğrenme
+    online_method: str = Field(default="rls", description="Çevrimiçi öğrenme yöntemi (rls veya sgd)")
+    online_forgetting_factor: float = Field(default=0.995, description="RLS unutma faktörü")
+    online_checkpoint_path: str = Field(
+        default="model_registry/online_state.joblib",
+        description="Çevrimiçi model durumu dosyası"
+    )
+    online_checkpoint_interval: int = Field(default=7, description="Kaç güncellemede bir durum diske yazılır")
+
+    # Su Dengesi Simülasyonu
+    open_water_coefficient: float = Field(default=1.05, description="Açık su buharlaşma katsayısı (ET0 çarpanı)")
+    runoff_coefficient: float = Field(default=0.15, description="Havza yağış-akış katsayısı")
+    radiation_coefficient: float = Field(default=0.19, description="Hargreaves radyasyon katsayısı (kıyı: 0.19, iç: 0.16)")
+    
+    # Standartlaştırılmış Kuraklık İndisleri (SPI/SPEI)
+    drought_index_windows: List[int] = Field(default=[1, 3, 6, 12], description="Birikim pencereleri (ay)")
+    drought_index_min_samples: int = Field(default=90, description="Takvim ayı başına dağılım uydurmak için minimum örnek")
+    drought_index_thresholds: List[float] = Field(
+        default=[-0.5, -0.8, -1.3, -2.0],
+        description="Dikkat / orta / şiddetli / kritik kuraklık indis eşikleri"
+    )
+    drought_index_cache_path: str = Field(
+        default="model_registry/drought_index_params.joblib",
+        description="Uydurulmuş indis parametreleri dosyası"
+    )
+    
+    # Gün-Yıl Klimatolojisi (göreli uyarılar)
+    climatology_half_window: int = Field(default=15, description="Yılın günü yumuşatma yarı penceresi (gün)")
+    climatology_min_samples: int = Field(default=30, description="Yüzdelik hesabı için minimum örnek")
+    climatology_precipitation_window: int = Field(default=30, description="Yağış klimatolojisi toplam penceresi (gün)")
+    climatology_percentiles: List[float] = Field(default=[10, 25, 50, 75, 90], description="Raporlanan yüzdelik bantlar")
+    climatology_alert_percentiles: List[float] = Field(
+        default=[30, 20, 10, 5],
+        description="Dikkat / orta / şiddetli / kritik göreli kuraklık yüzdelik eşikleri"
+    )
+    climatology_path: str = Field(default="model_registry/climatology.joblib", description="Klimatoloji deposu dosyası")
+    
+    # Artımlı Uyarı Motoru
+    alert_hysteresis: float = Field(default=0.02, description="Seviye iyileşmesi için eşiğin üstünde gereken doluluk payı")
+    alert_trend_days: int = Field(default=30, description="Düşüş trendi penceresi (gün, son okumaya göre)")
+    alert_clear_after: int = Field(default=2, description="Trend uyarısının kapanması için gereken ardışık olumlu değerlendirme")
+    alert_state_path: str = Field(default="model_registry/alert_state.json", description="Uyarı durumu dosyası")
+    alert_event_history: int = Field(default=500, description="Bellekte tutulan son uyarı olayı sayısı")
+    alert_state_ttl_days: int = Field(default=90, description="Bu kadar gündür değerlendirilmeyen barajların uyarı durumu silinir")
     
     # Özellik Mühendisliği
     lag_features: List[int] = Field(
@@ -124,6 +267,11 @@ class ModelConfig(BaseSettings):
         default=[7, 14, 30],
         description="Hareketli ortalama pencereleri"
     )
+    precipitation_windows: List[int] = Field(
+        default=[7, 30, 90],
+        description="Yağış toplamı ve gün-derece pencereleri"
+    )
+    degree_day_base: float = Field(default=10.0, description="Gün-derece taban sıcaklığı (°C)")
 
 class VisualizationConfig(BaseSettings):
     """Görselleştirme konfigürasyon sınıfı"""
@@ -160,72 +308,79 @@ class LoggingConfig(BaseSettings):
         description="Log formatı"
     )
     log_file: str = Field(default="logs/izmir_dam_prediction.log", description="Log dosya yolu")
+    
+    # Enstrümantasyon (aşama süreleri, sayaçlar, profil)
+    instrumentation_enabled: bool = Field(default=True, description="Aşama zaman aralıkları ve sayaçlar toplansın")
+    trace_file: Optional[str] = Field(
+        default=None,
+        description="Çalıştırma sonunda yazılacak JSON iz dosyası (Chrome trace biçimi)"
+    )
+    trace_max_spans: int = Field(default=100_000, description="Bellekte tutulacak en fazla zaman aralığı olayı")
+    profile_cpu: bool = Field(default=False, description="Giriş noktası boyunca cProfile ile CPU profili al")
+    profile_output: str = Field(default="logs/profile.pstats", description="CPU profili (pstats) çıktı dosyası")
+    profile_memory: bool = Field(default=False, description="Giriş noktası boyunca tracemalloc ile bellek profili al")
+    profile_memory_top: int = Field(default=15, description="Bellek özetinde gösterilecek en büyük ayırma sayısı")
 
 class Settings:
-    """Ana konfigürasyon sınıfı"""
-    
-    def __init__(self):
-        self.api = APIConfig()
-        self.data = DataConfig()
-        self.model = ModelConfig()
-        self.visualization = VisualizationConfig()
-        self.logging = LoggingConfig()
-        
-        # İzmir Barajları Bilgileri
-        self.izmir_dams = self._get_izmir_dams()
-    
-    def _get_izmir_dams(self) -> Dict:
-        """İzmir bölgesi barajları bilgileri"""
-        return {
-            "Tahtalı": {
-                "name": "Tahtalı Barajı",
-                "latitude": 38.3167,
-                "longitude": 27.1500,
-                "capacity_mcm": 150.0,
-                "district": "Konak",
-                "water_source": "Tahtalı Deresi"
-            },
-            "Balçova": {
-                "name": "Balçova Barajı", 
-                "latitude": 38.3833,
-                "longitude": 27.0167,
-                "capacity_mcm": 25.0,
-                "district": "Balçova",
-                "water_source": "Balçova Deresi"
-            },
-            "Güzelhisar": {
-                "name": "Güzelhisar Barajı",
-                "latitude": 38.2500,
-                "longitude": 27.1000,
-                "capacity_mcm": 45.0,
-                "district": "Aliağa",
-                "water_source": "Güzelhisar Deresi"
-            },
-            "Çamlı": {
-                "name": "Çamlı Barajı",
-                "latitude": 38.4500,
-                "longitude": 27.2000,
-                "capacity_mcm": 35.0,
-                "district": "Bornova",
-                "water_source": "Çamlı Deresi"
-            },
-            "Gediz": {
-                "name": "Gediz Barajı",
-                "latitude": 38.5000,
-                "longitude": 27.3000,
-                "capacity_mcm": 80.0,
-                "district": "Menemen",
-                "water_source": "Gediz Nehri"
-            }
-        }
+    """
+    Ana konfigürasyon sınıfı
+
+    Alt konfigürasyonlar ilk erişimde ortam değişkenlerinden okunur; import
+    anında .env ayrıştırılmaz. Atama ile değiştirilebilirler.
+    """
+
+    @cached_property
+    def api(self) -> APIConfig:
+        _load_env()
+        return APIConfig()
+
+    @cached_property
+    def data(self) -> DataConfig:
+        _load_env()
+        return DataConfig()
+
+    @cached_property
+    def model(self) -> ModelConfig:
+        _load_env()
+        return ModelConfig()
+
+    @cached_property
+    def visualization(self) -> VisualizationConfig:
+        _load_env()
+        return VisualizationConfig()
+
+    @cached_property
+    def logging(self) -> LoggingConfig:
+        _load_env()
+        return LoggingConfig()
+
+    @cached_property
+    def dam_registry(self) -> "DamRegistry":
+        """
+        Baraj kaydı (ilk erişimde settings.data.dam_registry_path'ten yüklenir)
+
+        Dosya okunamazsa hata loglanır ve boş kayıt döner.
+        """
+        from models.dam_registry import DamRegistry
+
+        path = self.data.dam_registry_path
+        if not os.path.isabs(path) and not os.path.exists(path):
+            bundled = os.path.join(PROJECT_ROOT, path)
+            if os.path.exists(bundled):
+                path = bundled
+        try:
+            return DamRegistry.load(path, cell_deg=self.data.dam_registry_cell_deg)
+        except (OSError, ValueError) as e:
+            logger.error(f"Baraj kaydı yüklenemedi ({path}): {e}")
+            return DamRegistry(cell_deg=self.data.dam_registry_cell_deg, source=path)
     
     def get_dam_info(self, dam_name: str) -> Optional[Dict]:
-        """Belirli bir barajın bilgilerini döndürür"""
-        return self.izmir_dams.get(dam_name)
+        """Belirli bir barajın bilgilerini döndürür (takma adlar çözülür)"""
+        return self.dam_registry.get(dam_name)
     
     def get_all_dam_names(self) -> List[str]:
         """Tüm baraj isimlerini döndürür"""
-        return list(self.izmir_dams.keys())
+        return self.dam_registry.names()
     
     def get_dam_coordinates(self, dam_name: str) -> Optional[tuple]:
         """Baraj koordinatlarını döndürür"""
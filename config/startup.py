@@ -0,0 +1,128 @@
+"""
+Başlangıç Yardımcıları - Tembel import, giriş noktasında logging kurulumu
+ve import süresi profili
+"""
+import os
+import re
+import sys
+import time
+import logging
+import importlib.util
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+def lazy_import(name: str):
+    """
+    Modülü tembel yükle
+
+    Dönen modül nesnesinin ilk öznitelik erişiminde gerçek import yapılır;
+    modül zaten yüklüyse doğrudan döndürülür. Ağır bağımlılıkların (pandas,
+    numpy, scipy) yalnızca kullanıldıkları yolda yüklenmesi için.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"Modül bulunamadı: {name}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def configure_logging(level: str = None, log_file: str = None) -> None:
+    """
+    Giriş noktası logging kurulumu (tekrar çağrılırsa etkisiz)
+
+    Log dizini yoksa oluşturulur; dosya açılamazsa yalnızca konsola yazılır.
+    """
+    from config.settings import settings
+
+    root = logging.getLogger()
+    if getattr(root, "_izmir_configured", False):
+        return
+
+    log_file = log_file or settings.logging.log_file
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    file_error = None
+    try:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.insert(0, logging.FileHandler(log_file))
+    except OSError as e:
+        file_error = e
+
+    logging.basicConfig(
+        level=getattr(logging, level or settings.logging.log_level),
+        format=settings.logging.log_format,
+        handlers=handlers
+    )
+    root._izmir_configured = True
+    if file_error is not None:
+        logging.getLogger(__name__).warning(f"Log dosyası açılamadı, yalnızca konsola yazılıyor: {file_error}")
+
+# -- Import profili -------------------------------------------------------
+
+def parse_import_times(lines: List[str]) -> List[Tuple[str, int, int, int]]:
+    """
+    `python -X importtime` çıktısını ayrıştır
+
+    Returns:
+        (modül, kendi süresi µs, kümülatif süre µs, derinlik) listesi
+    """
+    entries = []
+    for line in lines:
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+def format_import_report(entries: List[Tuple[str, int, int, int]], wall_seconds: float,
+                         top: int = 20) -> str:
+    """Üst düzey paket ve modül bazında import süresi raporu"""
+    packages: Dict[str, int] = defaultdict(int)
+    for module, _, cumulative, depth in entries:
+        if depth == 0:
+            packages[module.split(".")[0]] += cumulative
+    total_us = sum(packages.values())
+
+    lines = ["", "=" * 60, "IMPORT SÜRESİ PROFİLİ", "=" * 60,
+             f"Toplam süre (süreç): {wall_seconds * 1000:.0f} ms",
+             f"Import süresi: {total_us / 1000:.0f} ms ({len(entries)} modül)", "",
+             f"{'Paket':<32}{'Kümülatif (ms)':>16}"]
+    for package, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{package:<32}{cumulative / 1000:>16.1f}")
+
+    lines += ["", f"{'Modül':<44}{'Kendi (ms)':>12}"]
+    for module, self_us, _, _ in sorted(entries, key=lambda entry: -entry[1])[:top]:
+        lines.append(f"{module:<44}{self_us / 1000:>12.1f}")
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+def profile_imports(script: str, args: List[str], top: int = 20) -> int:
+    """
+    Komutu `-X importtime` ile alt süreçte çalıştırıp import raporu yaz
+
+    Komutun kendi çıktısı aynen geçirilir; rapor stderr'e yazılır.
+
+    Returns:
+        Alt sürecin çıkış kodu
+    """
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", script, *args],
+                             stderr=subprocess.PIPE, text=True)
+    wall_seconds = time.perf_counter() - started
+
+    import_lines, other_lines = [], []
+    for line in process.stderr.splitlines():
+        (import_lines if line.startswith("import time:") else other_lines).append(line)
+    if other_lines:
+        print("\n".join(other_lines), file=sys.stderr)
+    print(format_import_report(parse_import_times(import_lines), wall_seconds, top), file=sys.stderr)
+    return process.returncode
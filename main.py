@@ -2,56 +2,193 @@
 İzmir Baraj Doluluk ve Kuraklık Riski Tahmini - Ana Uygulama
 OOP Tabanlı, API ve CSV Veri Kaynakları Desteği
 """
-import pandas as pd
-import numpy as np
+from __future__ import annotations
+
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List, Optional
 import warnings
+import argparse
+import json
+import sys
+import time
 warnings.filterwarnings('ignore')
 
-# Proje modüllerini import et
+# Proje modüllerini import et; ağır servisler kullanıldıkları yerde yüklenir
 from config.settings import settings
-from models.dam import Dam, DamLocation, DamCapacity, DamData, DamManager, DroughtLevel
-from services.data_service import DataService, IZSUAPIService, WeatherAPIService, CSVDataSource
-from services.weather_service import WeatherService
-
-# Logging ayarları
-logging.basicConfig(
-    level=getattr(logging, settings.logging.log_level),
-    format=settings.logging.log_format,
-    handlers=[
-        logging.FileHandler(settings.logging.log_file),
-        logging.StreamHandler()
-    ]
-)
+from config.startup import configure_logging, lazy_import, profile_imports
+from services.instrumentation import instrumented_run, traced, tracer
+from models.dam import Dam, DamLocation, DamCapacity, DamData, DamManager, DroughtLevel, drought_level_for
+
+if TYPE_CHECKING:
+    from services.data_service import DataService
+    from services.weather_service import WeatherService
+    from services.feature_service import FeatureEngine
+    from services.model_registry import ModelRegistry
+    from services.online_learning_service import OnlineLearner
+    from services.bathymetry_service import DamCurveSet
+    from services.drought_index_service import DroughtIndexEngine
+    from services.climatology_service import ClimatologyStore
+    from services.scheduler_service import RefreshScheduler
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 logger = logging.getLogger(__name__)
 
+def _select_records(data: pd.DataFrame, dam_names: List[str] = None,
+                    start_date: str = None, end_date: str = None) -> pd.DataFrame:
+    """Kayıtları baraj alt kümesine ve [start_date, end_date] aralığına indir"""
+    if data.empty:
+        return data
+    mask = np.ones(len(data), dtype=bool)
+    if dam_names is not None and 'dam_name' in data.columns:
+        mask &= data['dam_name'].isin(dam_names).to_numpy()
+    if (start_date or end_date) and 'date' in data.columns:
+        dates = pd.to_datetime(data['date'])
+        if start_date:
+            mask &= (dates >= pd.Timestamp(start_date)).to_numpy()
+        if end_date:
+            mask &= (dates <= pd.Timestamp(end_date)).to_numpy()
+    if mask.all():
+        return data
+    return data[mask].reset_index(drop=True)
+
+def _canonicalize_dam_names(data: pd.DataFrame) -> pd.DataFrame:
+    """Takma adla yazılmış dam_name değerlerini baraj kaydındaki kanonik adlara çevir"""
+    if data.empty or 'dam_name' not in data.columns:
+        return data
+    mapping = settings.dam_registry.canonical_names(data['dam_name'].unique())
+    if mapping:
+        data = data.assign(dam_name=data['dam_name'].replace(mapping))
+    return data
+
+def _resolve_dam_names(dam_names: Optional[List[str]]) -> List[str]:
+    """Baraj adlarını kayıttan çöz (None ise kayıttaki tüm barajlar)"""
+    if dam_names is None:
+        return settings.get_all_dam_names()
+    return [settings.dam_registry.resolve(name) or name for name in dam_names]
+
+def dam_status(dam_name: str, csv_path: str = None) -> Optional[Dict]:
+    """
+    Tek baraj için hızlı durum özeti
+
+    Uygulama kurulmadan, pandas ve modeller yüklenmeden baraj CSV'sindeki son
+    okuma ve kayıtlı uyarı durumundan üretilir.
+
+    Returns:
+        Durum sözlüğü; baraj için okuma yoksa None
+    """
+    import csv
+    from services.alert_service import AlertEngine
+
+    registry = settings.dam_registry
+    dam_name = registry.resolve(dam_name) or dam_name
+    resolved: Dict[str, str] = {}
+    latest = None
+    with open(csv_path or settings.data.csv_dam_data_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            raw_name = row.get("dam_name") or ""
+            if raw_name not in resolved:
+                resolved[raw_name] = registry.resolve(raw_name) or raw_name
+            if resolved[raw_name] == dam_name and (latest is None or row["date"] >= latest["date"]):
+                latest = row
+    if latest is None:
+        return None
+
+    fill_ratio = float(latest["fill_ratio"])
+    dam_info = settings.get_dam_info(dam_name) or {}
+    return {
+        "dam_name": dam_name,
+        "date": latest["date"][:10],
+        "fill_ratio": fill_ratio,
+        "current_volume_mcm": float(latest["current_volume_mcm"]),
+        "total_capacity_mcm": float(latest.get("total_capacity_mcm") or dam_info.get("capacity_mcm", 0.0)),
+        "drought_level": drought_level_for(fill_ratio).value,
+        "district": latest.get("district") or dam_info.get("district"),
+        "active_alerts": list(AlertEngine.load().active.get(dam_name, {}).values())
+    }
+
 class IzmirDamPredictionApp:
     """İzmir Baraj Doluluk ve Kuraklık Riski Tahmini Ana Uygulama Sınıfı"""
     
     def __init__(self):
-        """Uygulama başlatıcı"""
-        self.data_service = DataService()
-        self.weather_service = WeatherService()
+        """
+        Uygulama başlatıcı
+
+        Veri, meteoroloji, özellik ve model kayıt servisleri ilk kullanımda
+        oluşturulur (bkz. aynı adlı özellikler).
+        """
+        from services.alert_service import AlertEngine
+        from services.stage_cache import StageCache
+
         self.dam_manager = DamManager()
+        self.alert_engine = AlertEngine.load()
+        self.alert_engine.attach(self.dam_manager)
         
         # Veri depolama
         self.dam_data: pd.DataFrame = pd.DataFrame()
         self.weather_data: pd.DataFrame = pd.DataFrame()
         self.combined_data: pd.DataFrame = pd.DataFrame()
-        self.predictions: pd.DataFrame = pd.DataFrame()
+        self.predictions: Dict[str, List[Dict]] = {}
+        self.features: pd.DataFrame = pd.DataFrame()
+        self.training_results: Dict = {}
+        self.online_learner: Optional[OnlineLearner] = None
+        self.interval_predictions: Dict = {}
+        self.water_balance: pd.DataFrame = pd.DataFrame()
+        self._dam_curves: Optional[DamCurveSet] = None
+        self.drought_index_engine: Optional[DroughtIndexEngine] = None
+        self.drought_indices: pd.DataFrame = pd.DataFrame()
+        self.climatology: Optional[ClimatologyStore] = None
+        self.stage_cache = StageCache()
+        self._input_versions: Dict[str, str] = {}
+        self.last_refresh_at: Optional[datetime] = None
+        self.scheduler: Optional[RefreshScheduler] = None
         
         logger.info("İzmir Baraj Doluluk ve Kuraklık Riski Tahmini uygulaması başlatıldı")
     
+    @cached_property
+    def data_service(self) -> DataService:
+        from services.data_service import DataService
+        return DataService()
+    
+    @cached_property
+    def weather_service(self) -> WeatherService:
+        from services.weather_service import WeatherService
+        return WeatherService()
+    
+    @cached_property
+    def feature_engine(self) -> FeatureEngine:
+        from services.feature_service import FeatureEngine
+        return FeatureEngine()
+    
+    @cached_property
+    def model_registry(self) -> ModelRegistry:
+        from services.model_registry import ModelRegistry
+        return ModelRegistry()
+    
+    @property
+    def data_version(self) -> str:
+        """
+        Güncel verinin sürüm özeti
+
+        Her çağrıda içerikten hesaplanır; nesne kimliğine bakılmadığından yeniden
+        atanan ya da yerinde değiştirilen çerçeveler de yeni sürüm üretir.
+        """
+        from services.model_registry import compute_data_version
+        source = self.combined_data if not self.combined_data.empty else self.dam_data
+        return compute_data_version(source)
+    
+    @traced()
     def setup_data_sources(self, dam_source: str = "csv", weather_source: str = "csv", **kwargs):
         """
         Veri kaynaklarını ayarla
         
         Args:
             dam_source: Baraj veri kaynağı ("api" veya "csv")
-            weather_source: Meteorolojik veri kaynağı ("api" veya "csv")
-            **kwargs: Ek parametreler (file_path, api_type vb.)
+            weather_source: Meteorolojik veri kaynağı ("api", "csv" veya "gridded")
+            **kwargs: Ek parametreler (file_path, api_type, gridded_path vb.)
         """
         logger.info(f"Veri kaynakları ayarlanıyor - Baraj: {dam_source}, Hava: {weather_source}")
         
@@ -71,18 +208,27 @@ class IzmirDamPredictionApp:
         elif weather_source == "csv":
             file_path = kwargs.get('weather_csv_path', settings.data.csv_weather_data_path)
             self.data_service.set_weather_data_source("csv", file_path=file_path)
+        elif weather_source == "gridded":
+            file_path = kwargs.get('gridded_path', settings.data.gridded_data_path)
+            self.data_service.set_weather_data_source(
+                "gridded", file_path=file_path, mask_path=kwargs.get('catchment_mask_path')
+            )
         else:
             raise ValueError(f"Desteklenmeyen meteorolojik veri kaynağı: {weather_source}")
         
         logger.info("Veri kaynakları başarıyla ayarlandı")
     
-    def load_dam_data(self, dam_names: List[str] = None, days: int = 30) -> bool:
+    @traced()
+    def load_dam_data(self, dam_names: List[str] = None, days: int = 30,
+                      start_date: str = None, end_date: str = None) -> bool:
         """
         Baraj verilerini yükle
         
         Args:
             dam_names: Yüklenecek baraj isimleri (None ise tümü)
             days: Kaç günlük veri
+            start_date: Verilirse bu tarihten önceki kayıtlar atılır
+            end_date: Verilirse bu tarihten sonraki kayıtlar atılır
         
         Returns:
             bool: Yükleme başarılı mı
@@ -90,14 +236,14 @@ class IzmirDamPredictionApp:
         try:
             logger.info("Baraj verileri yükleniyor...")
             
-            if dam_names is None:
-                dam_names = settings.get_all_dam_names()
+            dam_names = _resolve_dam_names(dam_names)
             
             # Veri çek
             self.dam_data = self.data_service.fetch_dam_data(
                 dam_names=dam_names,
                 days=days
             )
+            self.dam_data = _select_records(_canonicalize_dam_names(self.dam_data), dam_names, start_date, end_date)
             
             if self.dam_data.empty:
                 logger.warning("Baraj verisi yüklenemedi")
@@ -106,6 +252,7 @@ class IzmirDamPredictionApp:
             # DamManager'a barajları ekle
             self._populate_dam_manager()
             
+            tracer.count("rows.dam", len(self.dam_data))
             logger.info(f"Baraj verileri yüklendi: {len(self.dam_data)} kayıt")
             return True
             
@@ -113,22 +260,39 @@ class IzmirDamPredictionApp:
             logger.error(f"Baraj veri yükleme hatası: {e}")
             return False
     
-    def load_weather_data(self, dam_names: List[str] = None, days: int = 30) -> bool:
+    @traced()
+    def load_weather_data(self, dam_names: List[str] = None, days: int = 30,
+                          start_date: str = None, end_date: str = None) -> bool:
         """
         Meteorolojik verileri yükle
         
         Args:
             dam_names: Hava durumu alınacak baraj isimleri
             days: Kaç günlük veri
+            start_date: Verilirse bu tarihten önceki kayıtlar atılır
+            end_date: Verilirse bu tarihten sonraki kayıtlar atılır
         
         Returns:
             bool: Yükleme başarılı mı
         """
+        from services.data_service import CSVDataSource
+        from services.gridded_data_service import GriddedDataSource
         try:
             logger.info("Meteorolojik veriler yükleniyor...")
             
-            if dam_names is None:
-                dam_names = settings.get_all_dam_names()
+            dam_names = _resolve_dam_names(dam_names)
+            
+            # Gridli kaynak tüm barajları tek geçişte havza ağırlıklı üretir; CSV dosyası doğrudan okunur
+            if isinstance(self.data_service.weather_data_source, (GriddedDataSource, CSVDataSource)):
+                self.weather_data = self.data_service.fetch_weather_data(dam_names=dam_names, days=days)
+                self.weather_data = _select_records(_canonicalize_dam_names(self.weather_data), dam_names,
+                                                    start_date, end_date)
+                if self.weather_data.empty:
+                    logger.warning("Meteorolojik veri yüklenemedi")
+                    return False
+                tracer.count("rows.weather", len(self.weather_data))
+                logger.info(f"Meteorolojik veriler yüklendi: {len(self.weather_data)} kayıt")
+                return True
             
             weather_data_list = []
             
@@ -139,7 +303,9 @@ class IzmirDamPredictionApp:
                     weather_data_list.append(dam_weather)
             
             if weather_data_list:
-                self.weather_data = pd.concat(weather_data_list, ignore_index=True)
+                self.weather_data = _select_records(pd.concat(weather_data_list, ignore_index=True),
+                                                    dam_names, start_date, end_date)
+                tracer.count("rows.weather", len(self.weather_data))
                 logger.info(f"Meteorolojik veriler yüklendi: {len(self.weather_data)} kayıt")
                 return True
             else:
@@ -177,7 +343,7 @@ class IzmirDamPredictionApp:
             )
             
             # Dam objesi oluştur
-            dam = Dam(dam_name, location, capacity)
+            dam = Dam(dam_name, location, capacity, curve=self.dam_curves.get(dam_name))
             
             # Geçmiş verileri ekle
             dam_data = self.dam_data[self.dam_data['dam_name'] == dam_name]
@@ -197,6 +363,7 @@ class IzmirDamPredictionApp:
             # DamManager'a ekle
             self.dam_manager.add_dam(dam)
     
+    @traced()
     def process_data(self) -> bool:
         """Verileri işle ve birleştir"""
         try:
@@ -218,6 +385,7 @@ class IzmirDamPredictionApp:
                 logger.warning("Veri birleştirme başarısız")
                 return False
             
+            tracer.count("rows.combined", len(self.combined_data))
             logger.info(f"Veri işleme tamamlandı: {len(self.combined_data)} kayıt")
             return True
             
@@ -225,20 +393,472 @@ class IzmirDamPredictionApp:
             logger.error(f"Veri işleme hatası: {e}")
             return False
     
+    @traced()
+    def engineer_features(self, start_date: str = None) -> pd.DataFrame:
+        """
+        Birleşik veriden lag/hareketli ortalama özelliklerini üret
+        
+        Args:
+            start_date: Verilirse yalnızca bu tarihten sonraki yeni günler hesaplanır
+        
+        Returns:
+            pd.DataFrame: Özellik sütunları eklenmiş veri
+        """
+        if self.combined_data.empty:
+            logger.warning("Özellik üretimi için birleşik veri yok")
+            return pd.DataFrame()
+        
+        if start_date is not None and not self.features.empty:
+            new_features = self.feature_engine.transform(self.combined_data, start_date=start_date)
+            kept = self.features[self.features['date'] < pd.Timestamp(start_date)]
+            self.features = pd.concat([kept, new_features], ignore_index=True)
+        else:
+            self.features = self.feature_engine.transform(self.combined_data)
+        
+        return self.features
+    
+    @traced()
+    def train_models(self, mode: str = None, n_jobs: int = None) -> Dict:
+        """
+        settings.model.model_types modellerini özellikler üzerinde eğit
+        
+        Args:
+            mode: "per_dam" (her baraj için ayrı) veya "global"
+            n_jobs: Paralel işçi sayısı
+        
+        Returns:
+            Dict: baraj -> model tipi -> TrainingResult
+        """
+        from services.training_service import ModelTrainer
+        from services.model_registry import compute_data_version
+        if self.features.empty:
+            self.engineer_features()
+        
+        if self.features.empty:
+            logger.warning("Model eğitimi için özellik verisi yok")
+            return {}
+        
+        feature_set_hash = self.feature_engine.feature_set_hash()
+        trainer = ModelTrainer(
+            mode=mode, n_jobs=n_jobs, feature_engine=self.feature_engine,
+            # tune_models ile aranmış parametreler varsa onlarla eğit
+            tuned_params=lambda key, model_type: self.model_registry.tuned_params(key, model_type, feature_set_hash)
+        )
+        self.training_results = trainer.train(self.features)
+        
+        # Eğitilen modelleri sürümlü olarak depoya yaz
+        self.model_registry.register_training_results(
+            self.training_results,
+            feature_set_hash=feature_set_hash,
+            data_version=compute_data_version(self.combined_data)
+        )
+        self.stage_cache.invalidate()
+        return self.training_results
+    
+    @traced()
+    def tune_models(self, strategy: str = None, n_jobs: int = None, **kwargs) -> Dict:
+        """
+        Hiperparametreleri ardışık yarılama / Hyperband ile ara, en iyilerini depoya yaz
+        
+        Args:
+            strategy: "successive_halving" veya "hyperband"
+            n_jobs: Paralel işçi sayısı
+            **kwargs: HyperparameterTuner parametreleri (n_candidates, search_spaces vb.)
+        
+        Returns:
+            Dict: baraj -> model tipi -> TuningResult
+        """
+        from services.model_registry import compute_data_version
+        from services.tuning_service import HyperparameterTuner
+        if self.features.empty:
+            self.engineer_features()
+        
+        if self.features.empty:
+            logger.warning("Hiperparametre araması için özellik verisi yok")
+            return {}
+        
+        tuner = HyperparameterTuner(strategy=strategy, n_jobs=n_jobs, feature_engine=self.feature_engine, **kwargs)
+        results = tuner.tune(self.features)
+        models = tuner.fit_best(self.features, results)
+        
+        self.model_registry.register_tuning_results(
+            results,
+            models,
+            feature_columns=tuner.trainer.feature_columns,
+            feature_set_hash=self.feature_engine.feature_set_hash(),
+            data_version=compute_data_version(self.combined_data)
+        )
+        self.stage_cache.invalidate()
+        return results
+    
+    @traced()
+    def backtest(self, window: str = "expanding", **kwargs):
+        """
+        Birleşik geçmiş üzerinde ileriye yürüyen geriye dönük test
+        
+        Args:
+            window: "expanding" (genişleyen) veya "sliding" (kayan) eğitim penceresi
+            **kwargs: WalkForwardBacktester parametreleri (step_days, train_days vb.)
+        
+        Returns:
+            BacktestReport: Ufuk bazlı RMSE/MAE/CRPS ve ham tahminler
+        """
+        from services.backtest_service import WalkForwardBacktester
+        if self.combined_data.empty:
+            logger.warning("Geriye dönük test için birleşik veri yok")
+            return None
+        
+        backtester = WalkForwardBacktester(window=window, feature_engine=self.feature_engine, **kwargs)
+        return backtester.run(self.combined_data)
+    
+    def enable_online_learning(self, method: str = None) -> Optional[OnlineLearner]:
+        """
+        Çevrimiçi öğrenmeyi başlat (diskteki durum varsa oradan devam et)
+        
+        Args:
+            method: "rls" veya "sgd"
+        
+        Returns:
+            Optional[OnlineLearner]: Başlatılan öğrenici
+        """
+        from services.online_learning_service import OnlineLearner
+        learner = OnlineLearner.load(feature_engine=self.feature_engine)
+        if learner is not None and (method is None or learner.method == method) and learner.models:
+            logger.info(f"Çevrimiçi model durumu diskten yüklendi: {len(learner.models)} baraj")
+            self.online_learner = learner
+            return learner
+        
+        if self.features.empty:
+            self.engineer_features()
+        if self.features.empty:
+            logger.warning("Çevrimiçi öğrenme için özellik verisi yok")
+            return None
+        
+        self.online_learner = OnlineLearner(feature_engine=self.feature_engine, method=method).initialize(self.features)
+        self.online_learner.checkpoint()
+        return self.online_learner
+    
+    @traced()
+    def refresh_data(self, dam_names: List[str] = None, days: int = 30,
+                     start_date: str = None, end_date: str = None) -> Dict[str, bool]:
+        """
+        Ayarlı kaynaklardan verileri yeniden çek ve yalnızca girdisi değişen aşamaları yenile
+        
+        Baraj ve meteorolojik veri ayrı ayrı sürümlenir. İkisi de değişmediyse
+        hiçbir aşama yeniden hesaplanmaz; önbellekteki analiz, tahmin ve
+        yüklenmiş modeller kullanılmaya devam eder. Meteorolojik veri değiştiyse
+        kuraklık indisleri ve su dengesi (daha önce hesaplandılarsa), herhangi
+        bir girdi değiştiyse klimatoloji artımlı olarak güncellenir.
+        
+        Args:
+            dam_names: Yenilenecek baraj isimleri (None ise tümü)
+            days: Kaç günlük veri
+            start_date: Verilirse bu tarihten önceki kayıtlar atılır
+            end_date: Verilirse bu tarihten sonraki kayıtlar atılır
+        
+        Returns:
+            Dict[str, bool]: Girdi adı -> değişti mi
+        
+        Raises:
+            RuntimeError: Veri çekilemezse (mevcut veriler korunur)
+        """
+        from services.model_registry import compute_data_version
+        previous = {"dam_data": self.dam_data, "weather_data": self.weather_data}
+        previous_manager = self.dam_manager
+        versions = {name: self._input_versions.get(name) or compute_data_version(frame)
+                    for name, frame in previous.items()}
+        
+        # Veri servisinin kısa süreli önbelleği yenilemeyi gölgelemesin
+        self.data_service.clear_cache()
+        if dam_names is None:
+            dam_names = settings.get_all_dam_names()
+        dam_data = _select_records(self.data_service.fetch_dam_data(dam_names=dam_names, days=days),
+                                   dam_names, start_date, end_date)
+        if dam_data.empty or not self.load_weather_data(dam_names, days, start_date, end_date):
+            self.weather_data = previous["weather_data"]
+            raise RuntimeError("Yenileme sırasında veri çekilemedi, mevcut veriler korundu")
+        
+        current = {"dam_data": compute_data_version(dam_data), "weather_data": compute_data_version(self.weather_data)}
+        changed = {name: current[name] != versions[name] for name in current}
+        if not any(changed.values()):
+            self.weather_data = previous["weather_data"]
+            self._input_versions = current
+            self.last_refresh_at = datetime.now()
+            logger.info("Yenileme: kaynak verilerde değişiklik yok, aşamalar önbellekten")
+            return changed
+        
+        try:
+            if changed["dam_data"]:
+                self.dam_data = dam_data
+                self.dam_manager = DamManager()
+                self.alert_engine.attach(self.dam_manager)
+                self._populate_dam_manager()
+                # Analiz Dam nesnelerinden okunur; birleşik veri aynı kalsa da önbellek düşer
+                self.stage_cache.invalidate()
+            if not self.process_data():
+                raise RuntimeError("birleşik veri boş")
+        except Exception as e:
+            self.dam_data, self.weather_data = previous["dam_data"], previous["weather_data"]
+            self.dam_manager = previous_manager
+            self.alert_engine.attach(previous_manager)
+            raise RuntimeError(f"Yenilenen veriler işlenemedi, mevcut veriler korundu: {e}") from e
+        self._input_versions = current
+        
+        if not self.features.empty:
+            self.engineer_features()
+        if changed["weather_data"]:
+            if self.drought_index_engine is not None:
+                self.compute_drought_indices()
+            if not self.water_balance.empty:
+                self.simulate_water_balance()
+        if self.climatology is not None:
+            self.build_climatology()
+        
+        self.last_refresh_at = datetime.now()
+        logger.info(f"Yenileme tamamlandı, değişen girdiler: {[name for name, flag in changed.items() if flag]}")
+        return changed
+    
+    @traced()
+    def refresh_with_new_readings(self, new_dam_data: pd.DataFrame,
+                                  new_weather_data: pd.DataFrame = None,
+                                  days_ahead: int = None) -> Dict:
+        """
+        Yeni İZSU okumalarıyla modelleri güncelle ve tahminleri yenile
+        
+        Tam yeniden eğitim yapılmaz: yalnızca yeni günlerin özellikleri
+        hesaplanır, çevrimiçi modeller bu satırlarla güncellenir ve tahmin
+        NumPy pencereleri üzerinden yeniden üretilir.
+        
+        Args:
+            new_dam_data: Yeni baraj okumaları (dam_name, date, fill_ratio, ...)
+            new_weather_data: Aynı günlerin meteorolojik verisi (yoksa mevcut veriden eşlenir)
+            days_ahead: Tahmin ufku
+        
+        Returns:
+            Dict: Güncel tahmin sonuçları
+        """
+        from services.forecast_service import ModelForecaster
+        if days_ahead is None:
+            days_ahead = settings.model.prediction_days
+        
+        if self.online_learner is None and self.enable_online_learning() is None:
+            logger.warning("Çevrimiçi model yok, tam tahmine dönülüyor")
+            return self.predict_future_levels(days_ahead)
+        
+        if new_weather_data is not None and not new_weather_data.empty:
+            self.weather_data = pd.concat([self.weather_data, new_weather_data], ignore_index=True)
+            self.weather_data = self.weather_data.drop_duplicates(subset=['date', 'dam_name'], keep='last')
+        self.dam_data = pd.concat([self.dam_data, new_dam_data], ignore_index=True)
+        self.dam_data = self.dam_data.drop_duplicates(subset=['date', 'dam_name'], keep='last')
+        
+        # Yalnızca yeni satırları birleştir ve özelliklerini hesapla
+        weather_columns = [col for col in self.weather_data.columns
+                           if col not in new_dam_data.columns or col in ('date', 'dam_name')]
+        new_combined = pd.merge(new_dam_data, self.weather_data[weather_columns],
+                                on=['date', 'dam_name'], how='inner')
+
+        if new_combined.empty:
+            logger.warning("Yeni okumalar için meteorolojik veri bulunamadı")
+            return self.predictions
+        
+        # Daha önce işlenmiş günleri tekrar ekleme
+        if not self.combined_data.empty:
+            known = pd.to_datetime(self.combined_data['date']).groupby(self.combined_data['dam_name']).max()
+            known_dates = new_combined['dam_name'].map(known)
+            is_new = known_dates.isna() | (pd.to_datetime(new_combined['date']) > known_dates)
+            new_combined = new_combined[is_new.to_numpy()]
+            if new_combined.empty:
+                logger.info("Yeni okumalarda işlenmemiş gün yok")
+                return self.predictions
+        
+        context = self.combined_data.groupby('dam_name', sort=False).tail(self.feature_engine.max_lookback)
+        new_features = self.feature_engine.update(context, new_combined)
+        self.combined_data = pd.concat([self.combined_data, new_combined], ignore_index=True)
+        self.features = pd.concat([self.features, new_features], ignore_index=True)
+        self.online_learner.update(new_features)
+        
+        # Dam nesnelerine yeni günleri ekle
+        for row in new_combined.itertuples(index=False):
+            dam = self.dam_manager.get_dam(row.dam_name)
+            if dam is not None:
+                dam.add_historical_data(DamData(
+                    dam_name=row.dam_name,
+                    date=pd.to_datetime(row.date),
+                    current_volume_mcm=row.current_volume_mcm,
+                    total_capacity_mcm=row.total_capacity_mcm,
+                    fill_ratio=row.fill_ratio
+                ))
+        
+        forecaster = ModelForecaster(self.feature_engine)
+        context = self.combined_data.groupby('dam_name', sort=False).tail(self.feature_engine.max_lookback)
+        paths = forecaster.forecast(self.online_learner.models, context, days_ahead)
+        
+        predictions = dict(self.predictions)
+        for dam_name, path in paths.items():
+            dam = self.dam_manager.get_dam(dam_name)
+            if dam is not None:
+                predictions[dam_name] = self._format_model_predictions(dam, path)
+        
+        self.predictions = predictions
+        return predictions
+    
+    @property
+    def dam_curves(self) -> DamCurveSet:
+        """Alan-kot-hacim eğrileri (ilk kullanımda yüklenir)"""
+        from services.bathymetry_service import DamCurveSet
+        if self._dam_curves is None:
+            self._dam_curves = DamCurveSet.from_settings()
+        return self._dam_curves
+    
+    @traced()
+    def simulate_water_balance(self, outflow=None, use_numba: bool = None) -> pd.DataFrame:
+        """
+        Meteorolojik veriden tüm barajlar için günlük su dengesini simüle et
+        
+        Başlangıç hacmi her barajın ilk gözleminden, ölçülmüş girişler baraj
+        verisindeki inflow_mcm sütunundan alınır. Buharlaşması ölçülmemiş
+        günlerin Dam kayıtlarına simülasyondaki göl buharlaşması yazılır. Yüzey
+        alanı ve su kotu barajların alan-kot-hacim eğrilerinden okunur.
+        
+        Args:
+            outflow: Günlük çekim/salım (mcm/gün); skaler veya baraj sözlüğü
+            use_numba: numba çekirdeğini zorla aç/kapat
+        
+        Returns:
+            pd.DataFrame: Günlük ET0, buharlaşma, giriş/çıkış ve depolama
+        """
+        from services.water_balance_service import WaterBalanceSimulator
+        if self.weather_data.empty:
+            logger.warning("Su dengesi için meteorolojik veri yok")
+            return pd.DataFrame()
+        
+        initial_storage = {}
+        if not self.dam_data.empty:
+            first = self.dam_data.sort_values('date').groupby('dam_name').first()
+            initial_storage = first['current_volume_mcm'].to_dict()
+        
+        simulator = WaterBalanceSimulator(use_numba=use_numba, curves=self.dam_curves)
+        self.water_balance = simulator.simulate(self.weather_data, initial_storage=initial_storage,
+                                                outflow=outflow, inflow_data=self.dam_data)
+        if self.water_balance.empty:
+            return self.water_balance
+        
+        evaporation = self.water_balance.set_index(['dam_name', 'date'])['evaporation_mcm']
+        for dam in self.dam_manager.get_all_dams():
+            for record in dam.historical_data:
+                if record.evaporation_mcm is None:
+                    value = evaporation.get((dam.name, pd.Timestamp(record.date).normalize()))
+                    if value is not None:
+                        record.evaporation_mcm = round(float(value), 4)
+        
+        self.stage_cache.invalidate()
+        logger.info(f"Su dengesi simülasyonu tamamlandı: {len(self.water_balance)} baraj-gün")
+        return self.water_balance
+    
+    @traced()
+    def compute_drought_indices(self, refit: bool = False) -> pd.DataFrame:
+        """
+        Meteorolojik geçmişten SPI/SPEI kuraklık indislerini hesapla
+        
+        Uydurulmuş parametreler bellekte veya diskte varsa yalnızca son
+        hesaplanan günden sonraki günler değerlendirilir; yoksa tüm geçmiş
+        için dağılımlar uydurulup diske yazılır.
+        
+        Args:
+            refit: Saklı parametreleri yok sayıp yeniden uydur
+        
+        Returns:
+            pd.DataFrame: dam_name, date, spi_<ay>..., spei_<ay>...
+        """
+        from services.drought_index_service import DroughtIndexEngine
+        if self.weather_data.empty:
+            logger.warning("Kuraklık indisleri için meteorolojik veri yok")
+            return pd.DataFrame()
+        
+        engine = None if refit else self.drought_index_engine
+        if engine is not None:
+            new_indices = engine.update(self.weather_data)
+            if not new_indices.empty:
+                self.drought_indices = pd.concat([self.drought_indices, new_indices], ignore_index=True)
+                engine.save()
+        elif not refit:
+            # Diskteki parametrelerle geçmiş tablo yeniden uydurmadan üretilir
+            engine = DroughtIndexEngine.load(windows=settings.model.drought_index_windows)
+            if engine is not None and engine.last_date > pd.to_datetime(self.weather_data['date']).max():
+                logger.info("Kayıtlı kuraklık indisi durumu mevcut veriden yeni, yeniden uydurulacak")
+                engine = None
+            if engine is not None:
+                self.drought_indices = engine.transform(self.weather_data)
+                if not engine.update(self.weather_data).empty:
+                    engine.save()
+        
+        if engine is None:
+            engine = DroughtIndexEngine()
+            self.drought_indices = engine.fit(self.weather_data)
+            engine.save()
+        
+        self.drought_index_engine = engine
+        self.stage_cache.invalidate()
+        return self.drought_indices
+    
+    @traced()
+    def build_climatology(self) -> Optional[ClimatologyStore]:
+        """
+        Baraj x yılın günü klimatoloji deposunu oluştur veya güncelle
+        
+        Depo bellekte ya da diskte varsa yalnızca yeni/değişen gözlemlerin
+        etkilediği günler yeniden hesaplanır.
+        
+        Returns:
+            ClimatologyStore: Doluluk oranı ve kayan toplam yağış klimatolojisi
+        """
+        from services.climatology_service import ClimatologyStore, climatology_observations
+        observations = climatology_observations(self.dam_data, self.weather_data)
+        if not observations:
+            logger.warning("Klimatoloji için veri yok")
+            return self.climatology
+        
+        if self.climatology is None:
+            self.climatology = ClimatologyStore.load() or ClimatologyStore()
+        if self.climatology.update(observations):
+            self.climatology.save()
+            self.stage_cache.invalidate()
+        return self.climatology
+    
+    @traced()
     def analyze_dams(self) -> Dict:
-        """Baraj analizi yap"""
+        """Baraj analizi yap (veri sürümü başına bir kez)"""
+        return self.stage_cache.get_or_compute(self.data_version, "analysis", self._analyze_dams)
+    
+    def _analyze_dams(self) -> Dict:
         logger.info("Baraj analizi yapılıyor...")
         
         analysis_results = {}
+        drought_indices = {}
+        if self.drought_index_engine is not None:
+            drought_indices = self.drought_index_engine.latest(self.drought_indices)
+        climatology = {}
+        if self.climatology is not None and not self.dam_data.empty:
+            climatology = self.climatology.assess("fill_ratio", self.dam_data)
         
         for dam in self.dam_manager.get_all_dams():
-            dam_analysis = {
-                "current_status": dam.get_current_status(),
-                "drought_level": dam.get_drought_level().value,
-                "trend": dam.calculate_trend().value,
-                "water_balance": dam.get_water_balance(),
-                "summary": dam.get_summary()
-            }
+            # Seviye ve trend özetten alınır, her baraj için bir kez hesaplanır
+            with tracer.span("analyze_dam", dam=dam.name):
+                summary = dam.get_summary()
+                status = summary.get("status")
+                if status is None:
+                    status = {"drought_level": dam.get_drought_level().value, "trend": dam.calculate_trend().value}
+                dam_analysis = {
+                    "current_status": dam.get_current_status(),
+                    "drought_level": status["drought_level"],
+                    "trend": status["trend"],
+                    "water_balance": dam.get_water_balance(),
+                    "summary": summary
+                }
+            if dam.name in drought_indices:
+                dam_analysis["drought_index"] = drought_indices[dam.name]
+            if dam.name in climatology:
+                dam_analysis["climatology"] = climatology[dam.name]
             analysis_results[dam.name] = dam_analysis
         
         # Genel durum
@@ -247,6 +867,74 @@ class IzmirDamPredictionApp:
         
         return analysis_results
     
+    @traced()
+    def predict_intervals(self, days_ahead: int = None, retrain: bool = False) -> Dict:
+        """
+        Tüm barajlar için P10/P50/P90 doluluk aralıklarını tek geçişte tahmin et
+        
+        Aynı özellik seti ve veri sürümü için eğitilmiş kantil modeli depoda
+        varsa yeniden kullanılır.
+        
+        Args:
+            days_ahead: Kaç gün ileriye tahmin
+            retrain: Depodaki modeli yok sayıp yeniden eğit
+        
+        Returns:
+            Dict: baraj -> [{date, p10_fill_ratio, p50_fill_ratio, p90_fill_ratio, ...}]
+        """
+        from services.training_service import GLOBAL_MODEL_KEY
+        from services.model_registry import compute_data_version
+        from services.quantile_service import QuantileForecaster, quantile_label
+        if self.features.empty:
+            self.engineer_features()
+        
+        if self.features.empty:
+            logger.warning("Aralık tahmini için özellik verisi yok")
+            return {}
+        
+        model_type = "quantile_gradient_boosting"
+        feature_set_hash = self.feature_engine.feature_set_hash()
+        data_version = compute_data_version(self.combined_data)
+        
+        loaded = None
+        if not retrain:
+            loaded = self.model_registry.load(GLOBAL_MODEL_KEY, model_type, feature_set_hash, data_version)
+        
+        if loaded is not None:
+            forecaster = loaded.model
+        else:
+            forecaster = QuantileForecaster(feature_engine=self.feature_engine).fit(self.features)
+            if not forecaster.is_fitted:
+                return {}
+            self.model_registry.save(
+                dam_name=GLOBAL_MODEL_KEY,
+                model_type=model_type,
+                model=forecaster,
+                feature_columns=self.feature_engine.feature_columns,
+                feature_set_hash=feature_set_hash,
+                data_version=data_version,
+                extra={"quantiles": forecaster.quantiles, "horizons": forecaster.horizons,
+                       "fit_seconds": forecaster.fit_seconds}
+            )
+        
+        paths = forecaster.predict(self.features, days_ahead)
+        labels = [quantile_label(q) for q in forecaster.quantiles]
+        
+        intervals = {}
+        for dam_name, path in paths.items():
+            intervals[dam_name] = [
+                {
+                    "date": row["date"].strftime("%Y-%m-%d"),
+                    **{f"{label}_fill_ratio": round(float(row[label]), 3) for label in labels}
+                }
+                for row in path.to_dict("records")
+            ]
+        
+        logger.info(f"Aralık tahmini tamamlandı: {len(intervals)} baraj ({forecaster.predict_seconds * 1000:.1f} ms)")
+        self.interval_predictions = intervals
+        return intervals
+    
+    @traced()
     def predict_future_levels(self, days_ahead: int = None) -> Dict:
         """
         Gelecek su seviyelerini tahmin et
@@ -260,62 +948,93 @@ class IzmirDamPredictionApp:
         if days_ahead is None:
             days_ahead = settings.model.prediction_days
         
+        self.predictions = self.stage_cache.get_or_compute(
+            self.data_version, "predictions", lambda: self._predict_future_levels(days_ahead), days_ahead
+        )
+        return self.predictions
+    
+    def _predict_future_levels(self, days_ahead: int) -> Dict:
         logger.info(f"{days_ahead} günlük tahmin yapılıyor...")
         
         predictions = {}
+        with tracer.span("predict_with_models"):
+            model_paths = self._predict_with_registry_models(days_ahead)
         
         for dam in self.dam_manager.get_all_dams():
-            # Basit trend bazlı tahmin
-            dam_predictions = dam.predict_water_level(days_ahead)
-            predictions[dam.name] = dam_predictions
+            with tracer.span("predict_dam", dam=dam.name):
+                if dam.name in model_paths:
+                    predictions[dam.name] = self._format_model_predictions(dam, model_paths[dam.name])
+                else:
+                    # Kayıtlı model yoksa basit trend bazlı tahmin
+                    predictions[dam.name] = dam.predict_water_level(days_ahead)
         
-        self.predictions = predictions
         return predictions
     
+    def _predict_with_registry_models(self, days_ahead: int) -> Dict[str, pd.DataFrame]:
+        """Depoda modeli olan barajlar için model tabanlı doluluk yolları"""
+        from services.training_service import GLOBAL_MODEL_KEY
+        from services.forecast_service import ModelForecaster
+        if self.combined_data.empty:
+            return {}
+        
+        feature_set_hash = self.feature_engine.feature_set_hash()
+        dam_names = [dam.name for dam in self.dam_manager.get_all_dams()]
+        models = {}
+        
+        # Global modda tek model tüm barajları toplu tahmin eder; aksi halde
+        # baraj modeli olmayanlar için yedek olarak kullanılır
+        if settings.model.training_mode != "global":
+            for dam_name in dam_names:
+                artifact = self.model_registry.best_artifact(dam_name, feature_set_hash)
+                if artifact is not None:
+                    models[dam_name] = self.model_registry.load_artifact(artifact).model
+        
+        if len(models) < len(dam_names):
+            artifact = self.model_registry.best_artifact(GLOBAL_MODEL_KEY, feature_set_hash)
+            if artifact is not None:
+                models[GLOBAL_MODEL_KEY] = self.model_registry.load_artifact(artifact).model
+        
+        if not models:
+            return {}
+        
+        try:
+            forecaster = ModelForecaster(self.feature_engine)
+            return forecaster.forecast(models, self.combined_data, days_ahead, dam_names=dam_names)
+        except Exception as e:
+            logger.error(f"Model tabanlı tahmin hatası, sezgisel tahmine dönülüyor: {e}")
+            return {}
+    
+    def _format_model_predictions(self, dam: Dam, path: pd.DataFrame) -> List[Dict]:
+        """Model tahmin yolunu Dam.predict_water_level çıktı biçimine çevir"""
+        capacity = dam.capacity.total_capacity_mcm
+        return [
+            {
+                "date": row.date.strftime("%Y-%m-%d"),
+                "predicted_volume_mcm": round(row.predicted_fill_ratio * capacity, 2),
+                "predicted_fill_ratio": round(row.predicted_fill_ratio, 3),
+                "drought_level": dam._get_drought_level_from_ratio(row.predicted_fill_ratio)
+            }
+            for row in path.itertuples(index=False)
+        ]
+    
+    @traced()
     def generate_alerts(self) -> List[Dict]:
-        """Uyarılar oluştur"""
-        alerts = []
+        """
+        Aktif uyarıları döndür
         
-        for dam in self.dam_manager.get_all_dams():
-            current_data = dam.get_current_status()
-            if not current_data:
-                continue
-            
-            drought_level = dam.get_drought_level()
-            
-            # Kritik seviye uyarıları
-            if drought_level == DroughtLevel.CRITICAL:
-                alerts.append({
-                    "type": "CRITICAL",
-                    "dam_name": dam.name,
-                    "message": f"{dam.name} barajı kritik seviyede! Doluluk oranı: {current_data.fill_ratio:.1%}",
-                    "severity": "high",
-                    "date": current_data.date.strftime('%Y-%m-%d')
-                })
-            elif drought_level == DroughtLevel.SEVERE:
-                alerts.append({
-                    "type": "SEVERE_DROUGHT",
-                    "dam_name": dam.name,
-                    "message": f"{dam.name} barajında şiddetli kuraklık! Doluluk oranı: {current_data.fill_ratio:.1%}",
-                    "severity": "medium",
-                    "date": current_data.date.strftime('%Y-%m-%d')
-                })
-            
-            # Trend uyarıları
-            trend = dam.calculate_trend()
-            if trend.value == "Azalış":
-                alerts.append({
-                    "type": "DECLINING_TREND",
-                    "dam_name": dam.name,
-                    "message": f"{dam.name} barajında düşüş trendi tespit edildi",
-                    "severity": "low",
-                    "date": current_data.date.strftime('%Y-%m-%d')
-                })
-        
-        return alerts
+        Yalnızca son değerlendirmeden beri okuması değişen barajların kuralları
+        yeniden değerlendirilir (histerezis ve tekilleştirme AlertEngine'de).
+        """
+        self.alert_engine.evaluate()
+        return self.alert_engine.active_alerts()
     
+    @traced()
     def generate_report(self) -> Dict:
-        """Kapsamlı analiz raporu oluştur"""
+        """Kapsamlı analiz raporu oluştur (aşamalar önbellekten okunur)"""
+        return self.stage_cache.get_or_compute(self.data_version, "report", self._generate_report,
+                                               settings.model.prediction_days)
+    
+    def _generate_report(self) -> Dict:
         logger.info("Analiz raporu oluşturuluyor...")
         
         # Baraj analizi
@@ -352,6 +1071,38 @@ class IzmirDamPredictionApp:
         
         return report
     
+    def start_scheduler(self, interval: float = None, **refresh_kwargs) -> RefreshScheduler:
+        """
+        Verileri settings.data.data_update_interval aralığıyla arka planda yenile
+        
+        Uygulama (önbellekler ve yüklenmiş modeller) döngüler arasında bellekte
+        kalır; son başarılı yenileme zamanı last_refresh_at ve
+        scheduler.status() ile okunur.
+        
+        Args:
+            interval: Yenileme aralığı (saniye)
+            **refresh_kwargs: refresh_data() argümanları
+        """
+        from services.scheduler_service import RefreshScheduler
+        if self.scheduler is not None and self.scheduler.running:
+            return self.scheduler
+        self.scheduler = RefreshScheduler(self, interval=interval, refresh_kwargs=refresh_kwargs)
+        return self.scheduler.start()
+    
+    def serve(self, host: str = None, port: int = None) -> None:
+        """
+        Yüklenmiş veriden yerel HTTP sorgu servisini başlat
+        
+        Durum, tahmin ve uyarılar bir kez hesaplanıp bellekte tutulur; POST
+        /refresh ile yeniden hesaplanır.
+        """
+        from services.http_service import run_service
+        run_service(self, host=host, port=port)
+    
+    def get_metrics(self) -> Dict:
+        """Aşama süreleri ve sayaçlar (HTTP servisindeki /metrics ile aynı özet)"""
+        return tracer.summary()
+    
     def _assess_data_quality(self) -> Dict:
         """Veri kalitesini değerlendir"""
         if self.combined_data.empty:
@@ -385,41 +1136,43 @@ class IzmirDamPredictionApp:
             "missing_ratio": missing_ratio
         }
     
-    def save_results(self, output_dir: str = "results") -> None:
-        """Sonuçları dosyaya kaydet"""
-        import os
-        import json
-        
-        # Çıktı dizinini oluştur
-        os.makedirs(output_dir, exist_ok=True)
-        
+    @traced()
+    def save_results(self, output_dir: str = None, table_format: str = None) -> Optional[str]:
+        """
+        Sonuçları tek bir çalıştırma dizinine atomik olarak kaydet
+
+        Birleşik veri ve tahminler Parquet (veya CSV) olarak parça parça,
+        tahminler ayrıca NDJSON, rapor JSON olarak yazılır; dizin manifest
+        ile birlikte yayınlanır.
+
+        Args:
+            output_dir: Çıktı dizini (None ise ayarlardaki results_dir)
+            table_format: "parquet" veya "csv" (None ise ayarlardaki format)
+
+        Returns:
+            Yayınlanan çalıştırma dizini
+        """
+        from services.results_writer import ResultsWriter, prediction_rows
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Verileri kaydet
-        if not self.combined_data.empty:
-            self.combined_data.to_csv(f'{output_dir}/izmir_combined_data_{timestamp}.csv', index=False)
-        
-        if self.predictions:
-            # Tahminleri DataFrame'e çevir ve kaydet
-            pred_data = []
-            for dam_name, preds in self.predictions.items():
-                for pred in preds:
-                    pred['dam_name'] = dam_name
-                    pred_data.append(pred)
-            
-            if pred_data:
-                pred_df = pd.DataFrame(pred_data)
-                pred_df.to_csv(f'{output_dir}/izmir_predictions_{timestamp}.csv', index=False)
-        
-        # Raporu kaydet
-        report = self.generate_report()
-        with open(f'{output_dir}/izmir_report_{timestamp}.json', 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
-        
-        logger.info(f"Sonuçlar kaydedildi: {output_dir}")
+        writer = ResultsWriter(output_dir, run_id=f"izmir_{timestamp}", table_format=table_format,
+                               metadata={"data_version": self.data_version})
+
+        with writer:
+            if not self.combined_data.empty:
+                writer.write_table("combined_data", self.combined_data)
+
+            if isinstance(self.predictions, dict) and self.predictions:
+                writer.write_table("predictions", prediction_rows(self.predictions))
+                writer.write_ndjson("predictions", prediction_rows(self.predictions))
+
+            writer.write_json("report", self.generate_report())
+
+        logger.info(f"Sonuçlar kaydedildi: {writer.final_dir}")
+        return str(writer.final_dir)
 
 def main():
     """Ana fonksiyon"""
+    configure_logging()
     print("=== İzmir Baraj Doluluk ve Kuraklık Riski Tahmini ===")
     print()
     
@@ -503,6 +1256,111 @@ def main():
     
     print("\nAnaliz tamamlandı! Sonuçlar 'results' klasöründe kaydedildi.")
 
+def parse_batch_args(argv: List[str] = None) -> argparse.Namespace:
+    """Toplu çalıştırma komut satırı argümanları"""
+    parser = argparse.ArgumentParser(
+        description="İzmir Baraj Doluluk ve Kuraklık Riski Tahmini - toplu (etkileşimsiz) çalıştırma"
+    )
+    parser.add_argument("--regions", nargs="+", metavar="KAYIT.json",
+                        help="Bölge baraj kayıt dosyaları (verilmezse yalnızca İzmir)")
+    parser.add_argument("--dam-source", choices=["csv", "api"], default="csv", help="Baraj veri kaynağı")
+    parser.add_argument("--weather-source", choices=["csv", "api", "gridded"], default="csv",
+                        help="Meteorolojik veri kaynağı")
+    parser.add_argument("--dam-csv", help="Baraj verileri CSV yolu")
+    parser.add_argument("--weather-csv", help="Meteorolojik veriler CSV yolu")
+    parser.add_argument("--gridded-path", help="Gridli reanaliz dosya yolu")
+    parser.add_argument("--start-date", help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--end-date", help="Bitiş tarihi (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=30, help="Başlangıç tarihi yoksa çekilecek gün sayısı")
+    parser.add_argument("--dams", nargs="+", metavar="BARAJ", help="Yalnızca bu barajlar")
+    parser.add_argument("--format", dest="table_format", choices=["parquet", "csv"],
+                        help="Tablo çıktı formatı")
+    parser.add_argument("--output-dir", default=settings.data.results_dir, help="Çıktı kök dizini")
+    parser.add_argument("--predict-days", type=int, help="Tahmin ufku (gün)")
+    parser.add_argument("--train", action="store_true", help="Tahminden önce modelleri eğit")
+    parser.add_argument("--no-save", action="store_true", help="Sonuç dosyalarını yazma")
+    parser.add_argument("--workers", type=int, help="Paralel bölge işçisi sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Tek bölgeyi bellekte tutup data_update_interval aralığıyla yenile")
+    parser.add_argument("--interval", type=float, help="Daemon yenileme aralığı (saniye)")
+    parser.add_argument("--status", metavar="BARAJ",
+                        help="Yalnızca bu barajın son durumunu yazdır (uygulama kurulmaz)")
+    parser.add_argument("--profile-import", action="store_true",
+                        help="Komutu çalıştırıp modül import sürelerini raporla")
+    args = parser.parse_args(argv)
+
+    for value in [args.start_date, args.end_date]:
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                parser.error(f"Geçersiz tarih: {value}")
+    return args
+
+def batch_main(argv: List[str] = None) -> int:
+    """
+    Etkileşimsiz toplu çalıştırma giriş noktası
+
+    Returns:
+        int: Çıkış kodu (tüm bölgeler başarılıysa 0)
+    """
+    args = parse_batch_args(argv)
+    configure_logging()
+
+    if args.status:
+        try:
+            status = dam_status(args.status, args.dam_csv)
+        except OSError as e:
+            logger.error(f"Baraj verileri okunamadı: {e}")
+            return 2
+        if status is None:
+            logger.error(f"Baraj için okuma bulunamadı: {args.status}")
+            return 1
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+        return 0
+
+    from services.batch_service import (BatchOptions, RegionConfig, DEFAULT_REGION,
+                                        run_batch, run_daemon, write_batch_summary, format_batch_summary)
+    try:
+        regions = [RegionConfig.load(path) for path in args.regions] if args.regions else \
+            [RegionConfig(name=DEFAULT_REGION)]
+    except (OSError, ValueError) as e:
+        logger.error(f"Bölge kaydı okunamadı: {e}")
+        return 2
+    names = [region.name for region in regions]
+    if len(set(names)) != len(names):
+        logger.error(f"Bölge adları benzersiz olmalı: {names}")
+        return 2
+
+    options = BatchOptions(
+        dam_source=args.dam_source, weather_source=args.weather_source,
+        dam_csv_path=args.dam_csv, weather_csv_path=args.weather_csv, gridded_path=args.gridded_path,
+        start_date=args.start_date, end_date=args.end_date, days=args.days, dam_names=args.dams,
+        table_format=args.table_format, output_dir=args.output_dir, predict_days=args.predict_days,
+        train=args.train, save=not args.no_save
+    )
+
+    if args.daemon:
+        if len(regions) != 1:
+            logger.error("Daemon modu tek bölgeyle çalışır")
+            return 2
+        run_daemon(regions[0], options, interval=args.interval)
+        return 0
+
+    started = time.perf_counter()
+    summaries = run_batch(regions, options, max_workers=args.workers)
+    wall_seconds = time.perf_counter() - started
+
+    summary_path = write_batch_summary(summaries, options, wall_seconds)
+    print(format_batch_summary(summaries, wall_seconds))
+    print(f"Özet: {summary_path}")
+    return 0 if all(summary["status"] == "ok" for summary in summaries) else 1
+
 if __name__ == "__main__":
-    main()
+    if "--profile-import" in sys.argv[1:]:
+        sys.exit(profile_imports(__file__, [arg for arg in sys.argv[1:] if arg != "--profile-import"]))
+    with instrumented_run():
+        if len(sys.argv) > 1:
+            sys.exit(batch_main())
+        main()
 
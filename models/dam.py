@@ -1,13 +1,19 @@
 """
 İzmir Baraj Veri Modeli - OOP Tabanlı Baraj Sınıfı
 """
+from __future__ import annotations
+
+import bisect
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Union
 from dataclasses import dataclass, field
 from enum import Enum
-import pandas as pd
-import numpy as np
 from pydantic import BaseModel, Field, validator
+from config.settings import settings
+from config.startup import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
 
 class DroughtLevel(Enum):
     """Kuraklık seviyesi enum"""
@@ -17,6 +23,18 @@ class DroughtLevel(Enum):
     SEVERE = "Şiddetli Kuraklık"
     CRITICAL = "Kritik Kuraklık"
 
+# Kötüleşme sırasıyla seviyeler ve aralarındaki doluluk oranı eşikleri
+DROUGHT_LEVEL_ORDER = [DroughtLevel.NORMAL, DroughtLevel.WARNING, DroughtLevel.MODERATE,
+                       DroughtLevel.SEVERE, DroughtLevel.CRITICAL]
+DROUGHT_FILL_THRESHOLDS = [0.8, 0.6, 0.4, 0.2]
+
+def drought_level_for(fill_ratio: float) -> DroughtLevel:
+    """Doluluk oranına karşılık gelen kuraklık seviyesi"""
+    for threshold, level in zip(DROUGHT_FILL_THRESHOLDS, DROUGHT_LEVEL_ORDER):
+        if fill_ratio >= threshold:
+            return level
+    return DroughtLevel.CRITICAL
+
 class TrendDirection(Enum):
     """Trend yönü enum"""
     INCREASING = "Artış"
@@ -79,10 +97,24 @@ class DamData(BaseModel):
                 raise ValueError(f"Doluluk oranı hesaplanan değerle uyuşmuyor: {v} vs {expected_ratio}")
         return v
 
+class _ReadingDates:
+    """Okuma listesinin tarih görünümü (bisect'in key parametresi Python 3.10+ gerektirir)"""
+
+    __slots__ = ("readings",)
+
+    def __init__(self, readings: List[DamData]):
+        self.readings = readings
+
+    def __len__(self) -> int:
+        return len(self.readings)
+
+    def __getitem__(self, index: int) -> datetime:
+        return self.readings[index].date
+
 class Dam:
     """İzmir Baraj Sınıfı - Ana baraj modeli"""
     
-    def __init__(self, name: str, location: DamLocation, capacity: DamCapacity):
+    def __init__(self, name: str, location: DamLocation, capacity: DamCapacity, curve=None):
         """
         Baraj sınıfı başlatıcı
         
@@ -90,18 +122,27 @@ class Dam:
             name: Baraj adı
             location: Baraj konumu
             capacity: Baraj kapasitesi
+            curve: Alan-kot-hacim eğrisi (bathymetry_service.DamCurve)
         """
         self.name = name
         self.location = location
         self.capacity = capacity
+        self.curve = curve
         self.historical_data: List[DamData] = []
         self.weather_data: List[Dict] = []
+        self.on_reading: Optional[Callable[[str], None]] = None  # DamManager tarafından bağlanır
         
     def add_historical_data(self, data: DamData) -> None:
         """Geçmiş veri ekle"""
-        self.historical_data.append(data)
-        # Tarihe göre sırala
-        self.historical_data.sort(key=lambda x: x.date)
+        # Tarihe göre sıralı tut: sırayla gelen okuma sona eklenir, eskisi
+        # yerine yerleştirilir (her eklemede tüm listeyi sıralamak O(n²))
+        if self.historical_data and data.date < self.historical_data[-1].date:
+            index = bisect.bisect_right(_ReadingDates(self.historical_data), data.date)
+            self.historical_data.insert(index, data)
+        else:
+            self.historical_data.append(data)
+        if self.on_reading is not None:
+            self.on_reading(self.name)
     
     def add_weather_data(self, weather_data: Dict) -> None:
         """Meteorolojik veri ekle"""
@@ -119,27 +160,18 @@ class Dam:
         if not current_data:
             return DroughtLevel.NORMAL
         
-        fill_ratio = current_data.fill_ratio
-        
-        if fill_ratio >= 0.8:
-            return DroughtLevel.NORMAL
-        elif fill_ratio >= 0.6:
-            return DroughtLevel.WARNING
-        elif fill_ratio >= 0.4:
-            return DroughtLevel.MODERATE
-        elif fill_ratio >= 0.2:
-            return DroughtLevel.SEVERE
-        else:
-            return DroughtLevel.CRITICAL
+        return drought_level_for(current_data.fill_ratio)
     
-    def calculate_trend(self, days: int = 30) -> TrendDirection:
-        """Trend analizi yap"""
+    def calculate_trend(self, days: int = 30, as_of: Optional[datetime] = None) -> TrendDirection:
+        """Trend analizi yap (as_of verilirse o tarihe göre, geriye dönük testler için)"""
         if len(self.historical_data) < 2:
             return TrendDirection.STABLE
         
+        reference_date = as_of or datetime.now()
+        
         # Son N günün verilerini al
         recent_data = [d for d in self.historical_data 
-                      if d.date >= datetime.now() - timedelta(days=days)]
+                      if reference_date - timedelta(days=days) <= d.date <= reference_date]
         
         if len(recent_data) < 2:
             return TrendDirection.STABLE
@@ -184,8 +216,9 @@ class Dam:
             "period_days": days
         }
     
-    def predict_water_level(self, days_ahead: int, weather_forecast: List[Dict] = None) -> List[Dict]:
-        """Su seviyesi tahmini"""
+    def predict_water_level(self, days_ahead: int, weather_forecast: List[Dict] = None,
+                            as_of: Optional[datetime] = None) -> List[Dict]:
+        """Su seviyesi tahmini (as_of verilirse tahmin o tarihten başlar)"""
         if not self.historical_data:
             return []
         
@@ -196,8 +229,9 @@ class Dam:
             return []
         
         # Basit trend bazlı tahmin
-        trend = self.calculate_trend()
+        trend = self.calculate_trend(as_of=as_of)
         current_volume = current_data.current_volume_mcm
+        reference_date = as_of or datetime.now()
         
         for day in range(1, days_ahead + 1):
             # Trend faktörü
@@ -227,7 +261,7 @@ class Dam:
             new_fill_ratio = new_volume / self.capacity.total_capacity_mcm
             
             predictions.append({
-                "date": (datetime.now() + timedelta(days=day)).strftime("%Y-%m-%d"),
+                "date": (reference_date + timedelta(days=day)).strftime("%Y-%m-%d"),
                 "predicted_volume_mcm": round(new_volume, 2),
                 "predicted_fill_ratio": round(new_fill_ratio, 3),
                 "drought_level": self._get_drought_level_from_ratio(new_fill_ratio)
@@ -280,7 +314,7 @@ class Dam:
         if not current_data:
             return {"error": "Veri bulunamadı"}
         
-        return {
+        summary = {
             "name": self.name,
             "location": {
                 "latitude": self.location.latitude,
@@ -299,20 +333,40 @@ class Dam:
                 "data_points": len(self.historical_data)
             }
         }
+        if self.curve is not None:
+            volume = current_data.current_volume_mcm
+            summary["capacity"]["water_elevation_m"] = round(float(self.curve.volume_to_elevation(volume)), 2)
+            summary["capacity"]["surface_area_km2"] = round(float(self.curve.volume_to_area(volume)), 3)
+        return summary
 
 class DamManager:
     """Baraj yönetici sınıfı - Birden fazla barajı yönetir"""
     
     def __init__(self):
         self.dams: Dict[str, Dam] = {}
+        self._reading_listeners: List[Callable[[str], None]] = []
     
     def add_dam(self, dam: Dam) -> None:
         """Baraj ekle"""
         self.dams[dam.name] = dam
+        dam.on_reading = self._notify_reading
+        self._notify_reading(dam.name)
+    
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        """Barajlara yeni okuma eklendiğinde baraj adıyla çağrılacak dinleyiciyi kaydet"""
+        if listener not in self._reading_listeners:
+            self._reading_listeners.append(listener)
+    
+    def _notify_reading(self, dam_name: str) -> None:
+        for listener in self._reading_listeners:
+            listener(dam_name)
     
     def get_dam(self, name: str) -> Optional[Dam]:
-        """Baraj getir"""
-        return self.dams.get(name)
+        """Baraj getir (takma adlar baraj kaydından çözülür)"""
+        dam = self.dams.get(name)
+        if dam is None:
+            dam = self.dams.get(settings.dam_registry.resolve(name))
+        return dam
     
     def get_all_dams(self) -> List[Dam]:
         """Tüm barajları getir"""
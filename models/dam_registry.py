@@ -0,0 +1,282 @@
+"""
+Baraj Kaydı - Dosya (JSON/CSV) veya gömülü veritabanından (SQLite) yüklenen,
+ad, takma ad, ilçe ve mekânsal hücre indeksli salt okunur baraj kataloğu
+"""
+import os
+import csv
+import json
+import math
+import sqlite3
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_DAM_FIELDS = ["latitude", "longitude", "capacity_mcm", "district", "water_source"]
+NUMERIC_DAM_FIELDS = ["latitude", "longitude", "capacity_mcm", "surface_area_km2", "catchment_area_km2"]
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+# Takma ad listelerinin CSV/SQLite sütunundaki ayırıcısı
+ALIAS_SEPARATOR = "|"
+
+_TURKISH_FOLD = str.maketrans("çğıİöşüÇĞIÖŞÜâîûÂÎÛ", "cgiiosucgiosuaiuaiu")
+_NAME_SUFFIXES = (" baraji", " baraj", " dam")
+
+def normalize_name(name: str) -> str:
+    """
+    Karşılaştırma anahtarı: Türkçe karakterler sadeleştirilir, büyük/küçük
+    harf ve boşluk farkı ile "Barajı" eki yok sayılır
+
+    "TAHTALI BARAJI", "Tahtali" ve "Tahtalı Barajı" aynı anahtara düşer.
+    """
+    folded = " ".join(str(name).translate(_TURKISH_FOLD).lower().replace("-", " ").replace("_", " ").split())
+    for suffix in _NAME_SUFFIXES:
+        if folded.endswith(suffix) and len(folded) > len(suffix):
+            return folded[:-len(suffix)]
+    return folded
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """İki nokta arasındaki büyük daire mesafesi (km)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _wrap_longitude(longitude: float) -> float:
+    """Boylamı [-180, 180) aralığına getir"""
+    return (longitude + 180.0) % 360.0 - 180.0
+
+class DamRegistry(Mapping):
+    """
+    İndeksli baraj kataloğu
+
+    Anahtarlar kanonik baraj adlarıdır (veri dosyalarındaki dam_name);
+    değerler settings'teki eski sözlükle aynı alanları taşır (name,
+    latitude, longitude, capacity_mcm, district, water_source, ...).
+    Sorgular (get, [], in) takma adları ve yazım farklarını çözer; ad,
+    ilçe ve mekânsal hücre sorguları doğrusal tarama yapmaz.
+
+    Yüklendikten sonra değiştirilmez; işçi süreçlerine bir kez aktarılıp
+    paylaşılabilir.
+    """
+
+    def __init__(self, dams: Dict[str, Dict] = None, cell_deg: float = 0.5, source: str = None):
+        """
+        Args:
+            dams: Kanonik ad -> baraj bilgisi; isteğe bağlı "aliases" listesi
+            cell_deg: Mekânsal indeks hücre boyu (derece)
+            source: Kaydın yüklendiği dosya (bilgi amaçlı)
+
+        Raises:
+            ValueError: Zorunlu alan eksikse
+        """
+        if cell_deg <= 0:
+            raise ValueError(f"Hücre boyu pozitif olmalı: {cell_deg}")
+        self.cell_deg = float(cell_deg)
+        self.source = source
+        self._dams: Dict[str, Dict] = {}
+        self._names: Dict[str, str] = {}
+        self._districts: Dict[str, List[str]] = {}
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+
+        for key, info in (dams or {}).items():
+            missing = [field for field in REQUIRED_DAM_FIELDS if info.get(field) in (None, "")]
+            if missing:
+                raise ValueError(f"{key} barajında eksik alanlar: {missing}")
+            info = dict(info)
+            info.setdefault("name", f"{key} Barajı")
+            info["aliases"] = list(info.get("aliases") or [])
+            self._dams[key] = info
+
+            for alias in [key, info["name"], *info["aliases"]]:
+                normalized = normalize_name(alias)
+                owner = self._names.setdefault(normalized, key)
+                if owner != key:
+                    logger.warning(f"Baraj adı çakışması: '{alias}' zaten {owner} barajına ait, {key} için yok sayıldı")
+
+            self._districts.setdefault(normalize_name(info["district"]), []).append(key)
+            self._cells.setdefault(self._cell(info["latitude"], info["longitude"]), []).append(key)
+
+        self._district_names = sorted({info["district"] for info in self._dams.values()})
+
+    # -- Mapping arayüzü --------------------------------------------------
+
+    def __getitem__(self, name: str) -> Dict:
+        key = self.resolve(name)
+        if key is None:
+            raise KeyError(name)
+        return self._dams[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dams)
+
+    def __len__(self) -> int:
+        return len(self._dams)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.resolve(name) is not None
+
+    def __repr__(self) -> str:
+        return f"DamRegistry({len(self)} baraj, kaynak={self.source!r})"
+
+    # -- Ad ve ilçe sorguları ---------------------------------------------
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Ad veya takma adın kanonik baraj adı (bilinmiyorsa None)"""
+        if name in self._dams:
+            return name
+        return self._names.get(normalize_name(name))
+
+    def canonical_names(self, names: Iterable[str]) -> Dict[str, str]:
+        """Kanonik addan farklı yazılmış bilinen adlar için ad -> kanonik ad eşlemesi"""
+        mapping = {}
+        for name in set(names):
+            key = self.resolve(name) if isinstance(name, str) else None
+            if key is not None and key != name:
+                mapping[name] = key
+        return mapping
+
+    def names(self) -> List[str]:
+        """Kanonik baraj adları (kayıt sırasıyla)"""
+        return list(self._dams)
+
+    def by_district(self, district: str) -> List[str]:
+        """İlçedeki barajlar"""
+        return list(self._districts.get(normalize_name(district), []))
+
+    def districts(self) -> List[str]:
+        """Kayıttaki ilçeler (alfabetik)"""
+        return list(self._district_names)
+
+    # -- Mekânsal sorgular ------------------------------------------------
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        # Boylam [-180, 180) aralığına sarılır; 180 ve -180 aynı hücreye düşer
+        return math.floor(latitude / self.cell_deg), math.floor(_wrap_longitude(longitude) / self.cell_deg)
+
+    def _lon_cells(self, west: float, east: float) -> List[int]:
+        """[west, east] boylam aralığını kapsayan hücreler; antimeridyeni aşan aralık ikiye bölünür"""
+        if east - west >= 360.0:
+            west, east = -180.0, 180.0
+        cells = set()
+        for shift in (-360.0, 0.0, 360.0):
+            low, high = max(west + shift, -180.0), min(east + shift, 180.0)
+            if low <= high:
+                cells.update(range(math.floor(low / self.cell_deg), math.floor(high / self.cell_deg) + 1))
+        return sorted(cells)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """
+        Noktaya radius_km içindeki barajlar
+
+        Yalnızca yarıçapı kapsayan hücreler taranır.
+
+        Returns:
+            (kanonik ad, mesafe km) listesi, yakından uzağa
+        """
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(abs(latitude) + lat_span, 89.0)))
+        lon_span = min(radius_km / (KM_PER_DEGREE * max(cos_lat, 1e-6)), 180.0)
+
+        lat_cells = range(math.floor((latitude - lat_span) / self.cell_deg),
+                          math.floor((latitude + lat_span) / self.cell_deg) + 1)
+        longitude = _wrap_longitude(longitude)
+        lon_cells = self._lon_cells(longitude - lon_span, longitude + lon_span)
+        if len(lat_cells) * len(lon_cells) > len(self._cells):
+            candidates = [key for keys in self._cells.values() for key in keys]
+        else:
+            candidates = [key for i in lat_cells for j in lon_cells for key in self._cells.get((i, j), [])]
+
+        found = []
+        for key in candidates:
+            info = self._dams[key]
+            distance = haversine_km(latitude, longitude, info["latitude"], info["longitude"])
+            if distance <= radius_km:
+                found.append((key, distance))
+        return sorted(found, key=lambda item: item[1])
+
+    def nearest(self, latitude: float, longitude: float,
+                max_distance_km: float = None) -> Optional[Tuple[str, float]]:
+        """
+        Noktaya en yakın baraj
+
+        Arama yarıçapı hücre boyundan başlayıp bulunana kadar ikiye katlanır.
+
+        Returns:
+            (kanonik ad, mesafe km); max_distance_km içinde baraj yoksa None
+        """
+        if not self._dams:
+            return None
+        limit = max_distance_km if max_distance_km is not None else math.pi * EARTH_RADIUS_KM
+        radius = min(self.cell_deg * KM_PER_DEGREE, limit)
+        while True:
+            found = self.within(latitude, longitude, radius)
+            if found or radius >= limit:
+                return found[0] if found else None
+            radius = min(radius * 2, limit)
+
+    # -- Yükleme ----------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str, cell_deg: float = 0.5) -> "DamRegistry":
+        """
+        Kaydı dosyadan yükle
+
+        Desteklenen biçimler:
+            .json: {"dams": {"<ad>": {...}}} veya doğrudan {"<ad>": {...}}
+            .csv: key, name, latitude, longitude, capacity_mcm, district,
+                  water_source, ..., aliases ("|" ayrılmış) sütunları
+            .db/.sqlite/.sqlite3: aynı sütunlarla "dams" tablosu
+
+        Raises:
+            OSError: Dosya okunamazsa
+            ValueError: Biçim veya zorunlu alanlar hatalıysa
+        """
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            dams = raw.get("dams", raw) if isinstance(raw, dict) else None
+            if not isinstance(dams, dict):
+                raise ValueError(f"{path}: baraj sözlüğü bekleniyordu")
+        elif suffix == ".csv":
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                dams = cls._rows_to_dams(csv.DictReader(f))
+        elif suffix in SQLITE_SUFFIXES:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                connection.row_factory = sqlite3.Row
+                dams = cls._rows_to_dams(dict(row) for row in connection.execute("SELECT * FROM dams"))
+            except sqlite3.Error as e:
+                raise ValueError(f"{path}: dams tablosu okunamadı: {e}")
+            finally:
+                connection.close()
+        else:
+            raise ValueError(f"Desteklenmeyen baraj kaydı biçimi: {path}")
+
+        registry = cls(dams, cell_deg=cell_deg, source=path)
+        logger.info(f"Baraj kaydı yüklendi: {len(registry)} baraj ({path})")
+        return registry
+
+    @staticmethod
+    def _rows_to_dams(rows: Iterable[Dict]) -> Dict[str, Dict]:
+        """Düz tablo satırlarını (CSV/SQLite) kayıt sözlüğüne çevir"""
+        dams = {}
+        for row in rows:
+            row = {column: value for column, value in row.items() if value not in (None, "")}
+            key = row.pop("key", None) or row.get("name")
+            if not key:
+                raise ValueError("Baraj satırında key/name sütunu boş")
+            for column in NUMERIC_DAM_FIELDS:
+                if column in row:
+                    row[column] = float(row[column])
+            aliases = row.get("aliases")
+            if isinstance(aliases, str):
+                row["aliases"] = [alias.strip() for alias in aliases.split(ALIAS_SEPARATOR) if alias.strip()]
+            dams[key] = row
+        return dams
@@ -0,0 +1,266 @@
+"""
+Uyarı Motoru - Yeni okumalarla tetiklenen artımlı, histerezisli ve
+tekilleştirilmiş uyarılar; durum yeniden başlatmalar arasında korunur
+"""
+import os
+import json
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+import logging
+from config.settings import settings
+from models.dam import Dam, DamData, DamManager, DroughtLevel, TrendDirection, \
+    DROUGHT_LEVEL_ORDER, DROUGHT_FILL_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+# Seviye -> (uyarı tipi, önem, mesaj şablonu)
+LEVEL_ALERTS = {
+    DroughtLevel.CRITICAL: ("CRITICAL", "high", "{dam} barajı kritik seviyede! Doluluk oranı: {fill:.1%}"),
+    DroughtLevel.SEVERE: ("SEVERE_DROUGHT", "medium", "{dam} barajında şiddetli kuraklık! Doluluk oranı: {fill:.1%}")
+}
+TREND_ALERT = ("DECLINING_TREND", "low", "{dam} barajında düşüş trendi tespit edildi")
+LEVEL_ALERT_TYPES = {alert_type for alert_type, _, _ in LEVEL_ALERTS.values()}
+STATE_VERSION = 1
+
+def hysteresis_level(fill_ratio: float, previous: Optional[int], band: float,
+                     thresholds: List[float] = DROUGHT_FILL_THRESHOLDS) -> int:
+    """
+    Histerezisli kuraklık seviyesi indisi (0 = Normal ... 4 = Kritik)
+
+    Kötüleşme eşik aşılır aşılmaz, iyileşme ise doluluk eşiğin band kadar
+    üstüne çıkınca kabul edilir; eşik çevresindeki dalgalanma seviyeyi
+    oynatmaz.
+    """
+    raw = sum(fill_ratio < threshold for threshold in thresholds)
+    if previous is None or raw >= previous:
+        return raw
+    relaxed = sum(fill_ratio < threshold + band for threshold in thresholds)
+    return max(raw, min(previous, relaxed))
+
+class AlertEngine:
+    """
+    Artımlı uyarı motoru
+
+    DamManager'a abone olur; okuma eklenen barajlar kirli olarak işaretlenir
+    ve evaluate() yalnızca bunları, son okuması gerçekten değişmişse yeniden
+    değerlendirir. Aktif uyarılar (baraj, tip) başına tektir: durum
+    sürdükçe yeniden yayınlanmaz, yalnızca açılma, seviye değişimi ve
+    kapanma olay olarak üretilir. Düşüş trendi uyarısı clear_after ardışık
+    olumlu değerlendirmeden sonra kapanır.
+
+    Durum dosyası bağlı DamManager'da olmayan barajların durumunu da taşır
+    (--dams alt kümesiyle çalışmak histerezisi sıfırlamaz), ancak
+    active_alerts() yalnızca bağlı barajları döndürür. state_ttl_days
+    gündür değerlendirilmeyen barajların durumu yüklemede silinir.
+    """
+
+    def __init__(self, hysteresis: float = None, trend_days: int = None, clear_after: int = None,
+                 state_path: str = None, history: int = None, state_ttl_days: int = None):
+        self.hysteresis = hysteresis if hysteresis is not None else settings.model.alert_hysteresis
+        self.trend_days = trend_days or settings.model.alert_trend_days
+        self.clear_after = clear_after or settings.model.alert_clear_after
+        self.state_path = state_path or settings.model.alert_state_path
+        self.state_ttl_days = state_ttl_days or settings.model.alert_state_ttl_days
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.active: Dict[str, Dict[str, Dict]] = {}
+        self.events: deque = deque(maxlen=history or settings.model.alert_event_history)
+        self.dirty: Set[str] = set()
+        self.dam_manager: Optional[DamManager] = None
+        self.stats = {"evaluated": 0, "unchanged": 0}
+        self._listeners: List[Callable[[Dict], None]] = []
+
+    # -- Abonelikler ------------------------------------------------------
+
+    def attach(self, dam_manager: DamManager) -> None:
+        """Baraj yöneticisine abone ol; mevcut barajlar bir kez kontrol edilir"""
+        self.dam_manager = dam_manager
+        dam_manager.subscribe(self.mark_dirty)
+        self.dirty.update(dam_manager.dams)
+
+    def mark_dirty(self, dam_name: str) -> None:
+        self.dirty.add(dam_name)
+
+    def subscribe(self, listener: Callable[[Dict], None]) -> None:
+        """Her uyarı olayıyla (OPENED, ESCALATED, DEESCALATED, RESOLVED) çağrılacak dinleyici"""
+        self._listeners.append(listener)
+
+    # -- Değerlendirme ----------------------------------------------------
+
+    def evaluate(self) -> List[Dict]:
+        """
+        Kirli barajların kurallarını değerlendir
+
+        Returns:
+            List[Dict]: Bu değerlendirmede üretilen olaylar
+        """
+        if not self.dirty or self.dam_manager is None:
+            return []
+
+        dirty, self.dirty = self.dirty, set()
+        events: List[Dict] = []
+        changed = False
+        for dam_name in sorted(dirty):
+            dam = self.dam_manager.get_dam(dam_name)
+            current = dam.get_current_status() if dam is not None else None
+            if current is None:
+                continue
+
+            fingerprint = [current.date.isoformat(), round(float(current.fill_ratio), 6), len(dam.historical_data)]
+            state = self.states.get(dam_name)
+            if state is not None and state["fingerprint"] == fingerprint:
+                self.stats["unchanged"] += 1
+                continue
+
+            self.stats["evaluated"] += 1
+            events.extend(self._evaluate_dam(dam, current, state, fingerprint))
+            changed = True
+
+        if changed:
+            self.save()
+        for event in events:
+            self.events.append(event)
+            logger.info(f"Uyarı olayı {event['event']}: {event['alert']['message']}")
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.error(f"Uyarı dinleyicisi hatası: {e}")
+        return events
+
+    def _evaluate_dam(self, dam: Dam, current: DamData, state: Optional[Dict],
+                      fingerprint: List) -> List[Dict]:
+        previous_level = state["level"] if state else None
+        level = hysteresis_level(current.fill_ratio, previous_level, self.hysteresis)
+
+        declining = dam.calculate_trend(days=self.trend_days, as_of=current.date) == TrendDirection.DECREASING
+        clear_streak = 0
+        if not declining and state and state["declining"]:
+            clear_streak = state["clear_streak"] + 1
+            declining = clear_streak < self.clear_after
+
+        self.states[dam.name] = {"fingerprint": fingerprint, "level": level,
+                                 "declining": declining, "clear_streak": clear_streak,
+                                 "evaluated_at": datetime.now().isoformat()}
+
+        date = current.date.strftime('%Y-%m-%d')
+        dam_alerts = self.active.setdefault(dam.name, {})
+        events = []
+
+        # Seviye uyarısı: tek aktif seviye uyarısı, tip değişince olay
+        level_spec = LEVEL_ALERTS.get(DROUGHT_LEVEL_ORDER[level])
+        previous_alert = next((dam_alerts[t] for t in list(dam_alerts) if t in LEVEL_ALERT_TYPES), None)
+        new_type = level_spec[0] if level_spec else None
+        if previous_alert is not None and previous_alert["type"] != new_type:
+            del dam_alerts[previous_alert["type"]]
+            if new_type is None:
+                events.append(self._event("RESOLVED", previous_alert, date))
+        if level_spec is not None:
+            alert = self._alert(dam.name, level_spec, current.fill_ratio, date)
+            if previous_alert is not None and previous_alert["type"] == new_type:
+                alert["since"] = previous_alert["since"]
+            elif previous_alert is not None:
+                worse = level > DROUGHT_LEVEL_ORDER.index(self._alert_level(previous_alert["type"]))
+                events.append(self._event("ESCALATED" if worse else "DEESCALATED", alert, date,
+                                          previous_type=previous_alert["type"]))
+            else:
+                events.append(self._event("OPENED", alert, date))
+            dam_alerts[new_type] = alert
+
+        # Trend uyarısı
+        trend_type = TREND_ALERT[0]
+        if declining and trend_type not in dam_alerts:
+            dam_alerts[trend_type] = self._alert(dam.name, TREND_ALERT, current.fill_ratio, date)
+            events.append(self._event("OPENED", dam_alerts[trend_type], date))
+        elif declining:
+            dam_alerts[trend_type]["date"] = date
+        elif trend_type in dam_alerts:
+            events.append(self._event("RESOLVED", dam_alerts.pop(trend_type), date))
+
+        if not dam_alerts:
+            del self.active[dam.name]
+        return events
+
+    @staticmethod
+    def _alert_level(alert_type: str) -> DroughtLevel:
+        return next(level for level, spec in LEVEL_ALERTS.items() if spec[0] == alert_type)
+
+    @staticmethod
+    def _alert(dam_name: str, spec, fill_ratio: float, date: str) -> Dict:
+        alert_type, severity, template = spec
+        return {"type": alert_type, "dam_name": dam_name,
+                "message": template.format(dam=dam_name, fill=fill_ratio),
+                "severity": severity, "date": date, "since": date}
+
+    @staticmethod
+    def _event(kind: str, alert: Dict, date: str, previous_type: str = None) -> Dict:
+        event = {"event": kind, "date": date, "alert": dict(alert)}
+        if previous_type is not None:
+            event["previous_type"] = previous_type
+        return event
+
+    def active_alerts(self) -> List[Dict]:
+        """Bağlı DamManager'daki barajların aktif uyarıları (baraj başına önce seviye, sonra trend)"""
+        present = self.dam_manager.dams if self.dam_manager is not None else {}
+        alerts = []
+        for dam_name in sorted(self.active):
+            if dam_name not in present:
+                continue
+            dam_alerts = self.active[dam_name]
+            alerts.extend(sorted(dam_alerts.values(), key=lambda a: a["type"] == TREND_ALERT[0]))
+        return alerts
+
+    # -- Kalıcılık --------------------------------------------------------
+
+    def expire(self, now: datetime = None) -> List[str]:
+        """
+        state_ttl_days gündür değerlendirilmeyen barajların durumunu ve uyarılarını sil
+
+        Returns:
+            List[str]: Silinen barajlar
+        """
+        cutoff = ((now or datetime.now()) - timedelta(days=self.state_ttl_days)).isoformat()
+        # evaluated_at alanı olmayan (eski sürüm) kayıtların yaşı bilinmez, silinmez
+        expired = [dam_name for dam_name, state in self.states.items()
+                   if state.get("evaluated_at", cutoff) < cutoff]
+        expired += [dam_name for dam_name in self.active if dam_name not in self.states]
+        for dam_name in expired:
+            self.states.pop(dam_name, None)
+            self.active.pop(dam_name, None)
+        if expired:
+            logger.info(f"Süresi dolan uyarı durumları silindi: {', '.join(sorted(expired))}")
+        return expired
+
+    def save(self, path: str = None) -> None:
+        """Durumu atomik olarak JSON'a yaz"""
+        path = path or self.state_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        payload = {"version": STATE_VERSION, "saved_at": datetime.now().isoformat(),
+                   "states": self.states, "active": self.active}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = None, **kwargs) -> "AlertEngine":
+        """Kayıtlı durumla motor oluştur; dosya yoksa veya okunamazsa boş durumla başlar"""
+        engine = cls(state_path=path, **kwargs)
+        if not os.path.exists(engine.state_path):
+            return engine
+        try:
+            with open(engine.state_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != STATE_VERSION:
+                logger.warning("Uyarı durumu sürümü farklı, boş durumla başlanıyor")
+                return engine
+            engine.states = payload["states"]
+            engine.active = payload["active"]
+            engine.expire()
+            logger.info(f"Uyarı durumu yüklendi: {len(engine.states)} baraj, "
+                        f"{sum(len(a) for a in engine.active.values())} aktif uyarı")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Uyarı durumu okunamadı, boş durumla başlanıyor: {e}")
+        return engine
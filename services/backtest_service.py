@@ -0,0 +1,360 @@
+"""
+Geriye Dönük Test Servisi - Gerçek geçmiş üzerinde ileriye yürüyen (walk-forward)
+değerlendirme ve ufuk bazlı beceri metrikleri
+"""
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+import logging
+from config.settings import settings
+from models.dam import Dam, DamLocation, DamCapacity, DamData
+from services.feature_service import FeatureEngine
+from services.forecast_service import ModelForecaster
+from services.quantile_service import QuantileForecaster
+from services.training_service import create_model, is_classifier
+
+logger = logging.getLogger(__name__)
+
+HEURISTIC_METHOD = "heuristic"
+QUANTILE_METHOD = "quantile"
+
+# İşçi süreç başına bir kez yüklenen veri (her fold için tekrar kopyalanmaz)
+_WORKER_STATE: Dict[str, Any] = {}
+
+def crps_ensemble(members: np.ndarray, observations: np.ndarray) -> np.ndarray:
+    """
+    Topluluk (ensemble) tahminleri için CRPS - vektörel
+
+    CRPS = E|X - y| - 0.5 E|X - X'|; tek üyeli (nokta) tahminde MAE'ye eşittir.
+
+    Args:
+        members: (..., m) topluluk üyeleri
+        observations: (...) gözlemler
+
+    Returns:
+        np.ndarray: (...) CRPS değerleri
+    """
+    members = np.sort(np.asarray(members, dtype=np.float64), axis=-1)
+    m = members.shape[-1]
+    skill = np.mean(np.abs(members - observations[..., None]), axis=-1)
+
+    # Sıralı üyelerle E|X - X'| = 2/m² * Σ (2i - m - 1) x_(i)
+    weights = 2 * np.arange(1, m + 1) - m - 1
+    spread = 2 * np.sum(weights * members, axis=-1) / m ** 2
+    return skill - 0.5 * spread
+
+def crps_quantiles(values: np.ndarray, quantiles: List[float], observations: np.ndarray) -> np.ndarray:
+    """
+    Kantil tahminleri için CRPS yaklaşımı - vektörel
+
+    CRPS = ∫ 2 * pinball_q(y, x_q) dq integrali verilen kantil seviyelerinde
+    ortalamayla yaklaşıklanır (seviyeler aralığı eşit örnekliyorsa yansız).
+
+    Args:
+        values: (..., k) kantil değerleri
+        quantiles: k kantil seviyesi
+        observations: (...) gözlemler
+
+    Returns:
+        np.ndarray: (...) CRPS değerleri
+    """
+    levels = np.asarray(quantiles, dtype=np.float64)
+    residual = observations[..., None] - np.asarray(values, dtype=np.float64)
+    pinball = np.maximum(levels * residual, (levels - 1) * residual)
+    return 2 * pinball.mean(axis=-1)
+
+def skill_by_horizon(predictions: np.ndarray, actuals: np.ndarray,
+                     members: Optional[np.ndarray] = None,
+                     quantiles: Optional[List[float]] = None) -> pd.DataFrame:
+    """
+    Ufuk bazlı RMSE/MAE/CRPS (tüm fold ve barajlar üzerinden tek seferde)
+
+    CRPS yalnızca olasılıksal tahminlerde hesaplanır; nokta tahmininde MAE'ye
+    eşit olacağından NaN bırakılır.
+
+    Args:
+        predictions: (fold, baraj, ufuk) nokta tahminleri
+        actuals: (fold, baraj, ufuk) gözlemler (eksikler NaN)
+        members: (fold, baraj, ufuk, m) topluluk üyeleri veya kantil değerleri
+        quantiles: members kantil değerleriyse m kantil seviyesi
+
+    Returns:
+        pd.DataFrame: horizon, rmse, mae, crps, n
+    """
+    error = predictions - actuals
+    valid = np.isfinite(error)
+    n = valid.sum(axis=(0, 1))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmse = np.sqrt(np.where(valid, error ** 2, 0).sum(axis=(0, 1)) / n)
+        mae = np.where(valid, np.abs(error), 0).sum(axis=(0, 1)) / n
+        if members is None:
+            crps = np.full(predictions.shape[-1], np.nan)
+        else:
+            if quantiles is not None:
+                scores = crps_quantiles(members, quantiles, np.nan_to_num(actuals))
+            else:
+                scores = crps_ensemble(members, np.nan_to_num(actuals))
+            scored = valid & np.isfinite(scores)
+            crps = np.where(scored, scores, 0).sum(axis=(0, 1)) / scored.sum(axis=(0, 1))
+
+    return pd.DataFrame({
+        "horizon": np.arange(1, predictions.shape[-1] + 1),
+        "rmse": rmse,
+        "mae": mae,
+        "crps": crps,
+        "n": n
+    })
+
+def _init_worker(features_path: str) -> None:
+    """İşçi süreç başlatıcı - özellik çerçevesini bir kez yükle"""
+    _WORKER_STATE["features"] = pd.read_pickle(features_path)
+
+def _heuristic_path(dam_name: str, history: pd.DataFrame, origin: pd.Timestamp,
+                    horizon: int) -> np.ndarray:
+    """Dam.predict_water_level sezgisel tahminini origin tarihinden çalıştır"""
+    dam_info = settings.get_dam_info(dam_name) or {}
+    capacity_mcm = dam_info.get("capacity_mcm") or float(history["total_capacity_mcm"].iloc[-1])
+
+    dam = Dam(
+        dam_name,
+        DamLocation(
+            latitude=dam_info.get("latitude", 0.0),
+            longitude=dam_info.get("longitude", 0.0),
+            district=dam_info.get("district", ""),
+            water_source=dam_info.get("water_source", "")
+        ),
+        DamCapacity(total_capacity_mcm=capacity_mcm, current_volume_mcm=0, fill_ratio=0.0)
+    )
+
+    # Trend yalnızca son 30 güne baktığı için tüm geçmişi nesneye çevirmeye gerek yok
+    recent = history[history["date"] > origin - timedelta(days=31)].dropna(subset=["fill_ratio"])
+    for row in recent.itertuples(index=False):
+        fill_ratio = float(np.clip(row.fill_ratio, 0, 1))
+        dam.historical_data.append(DamData(
+            dam_name=dam_name,
+            date=row.date,
+            current_volume_mcm=fill_ratio * capacity_mcm,
+            total_capacity_mcm=capacity_mcm,
+            fill_ratio=fill_ratio
+        ))
+
+    predictions = dam.predict_water_level(horizon, as_of=origin.to_pydatetime())
+    return np.array([p["predicted_fill_ratio"] for p in predictions], dtype=np.float64)
+
+def _run_backtest_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Tek bir başlangıç (origin) tarihi için tüm yöntemleri eğit ve tahmin et
+
+    Returns:
+        Dict: method -> (baraj, ufuk) tahmin dizisi ve (baraj, ufuk) gözlemler
+    """
+    features: pd.DataFrame = _WORKER_STATE["features"]
+    origin = pd.Timestamp(task["origin"])
+    horizon = task["horizon"]
+    dam_names = task["dam_names"]
+    engine = FeatureEngine(**task["feature_config"])
+    target = engine.target_column
+
+    history = features[features["date"] <= origin]
+    window_history = history
+    if task["window"] == "sliding":
+        window_history = history[history["date"] > origin - timedelta(days=task["train_days"])]
+    train = window_history.dropna(subset=engine.feature_columns + [target])
+
+    # Gözlemler (baraj, ufuk) - eksik günler NaN
+    future = features[(features["date"] > origin) & (features["date"] <= origin + timedelta(days=horizon))]
+    offsets = (future["date"] - origin).dt.days.to_numpy() - 1
+    dam_index = {name: i for i, name in enumerate(dam_names)}
+    actuals = np.full((len(dam_names), horizon), np.nan)
+    rows = future["dam_name"].map(dam_index).to_numpy()
+    actuals[rows, offsets] = future[target].to_numpy(dtype=np.float64)
+
+    outputs = {}
+    heuristic = np.full((len(dam_names), horizon), np.nan)
+    for dam_name, dam_history in history.groupby("dam_name", sort=False):
+        if dam_name in dam_index and len(dam_history) >= 2:
+            heuristic[dam_index[dam_name]] = _heuristic_path(dam_name, dam_history, origin, horizon)
+    outputs[HEURISTIC_METHOD] = heuristic
+
+    forecaster = ModelForecaster(engine)
+    for model_type in task["model_types"]:
+        models = {}
+        for dam_name, dam_train in train.groupby("dam_name", sort=False):
+            if len(dam_train) < settings.data.min_data_points:
+                continue
+            model = create_model(model_type, task["model_params"].get(model_type))
+            model.fit(dam_train[engine.feature_columns].to_numpy(dtype=np.float32),
+                      dam_train[target].to_numpy(dtype=np.float64))
+            models[dam_name] = model
+
+        predictions = np.full((len(dam_names), horizon), np.nan)
+        for dam_name, path in forecaster.forecast(models, history, horizon).items():
+            predictions[dam_index[dam_name], :len(path)] = path["predicted_fill_ratio"].to_numpy()
+        outputs[model_type] = predictions
+
+    members = {}
+    if task["quantile_levels"]:
+        quantiles = QuantileForecaster(task["quantile_levels"], task["quantile_horizons"], engine,
+                                       task["model_params"].get("quantile_gradient_boosting"))
+        values = np.full((len(dam_names), horizon, len(quantiles.quantiles)), np.nan)
+        if quantiles.fit(window_history).is_fitted:
+            result = quantiles.predict_matrix(history, horizon)
+            values[[dam_index[name] for name in result["dam_names"]]] = result["values"]
+        median = int(np.argmin(np.abs(np.array(quantiles.quantiles) - 0.5)))
+        outputs[QUANTILE_METHOD] = values[:, :, median]
+        members[QUANTILE_METHOD] = values
+
+    return {"origin": task["origin"], "actuals": actuals, "predictions": outputs, "members": members}
+
+@dataclass
+class BacktestReport:
+    """Geriye dönük test sonuçları"""
+    origins: List[pd.Timestamp]
+    dam_names: List[str]
+    actuals: np.ndarray                         # (fold, baraj, ufuk)
+    predictions: Dict[str, np.ndarray]          # method -> (fold, baraj, ufuk)
+    metrics: pd.DataFrame = field(default_factory=pd.DataFrame)
+    members: Dict[str, np.ndarray] = field(default_factory=dict)  # method -> (fold, baraj, ufuk, kantil)
+
+    def summary(self) -> pd.DataFrame:
+        """Yöntem bazlı tüm ufukların ortalama metrikleri (nokta tahminlerinde crps NaN)"""
+        if self.metrics.empty:
+            return self.metrics
+        return self.metrics.groupby("method")[["rmse", "mae", "crps"]].mean()
+
+class WalkForwardBacktester:
+    """
+    İleriye yürüyen geriye dönük test motoru
+
+    Her başlangıç tarihinde modeller yalnızca o tarihe kadar olan veriyle
+    (genişleyen veya kayan pencere) eğitilir ve sonraki horizon gün tahmin
+    edilir. Fold'lar süreç havuzunda paralel çalışır; özellik çerçevesi her
+    işçiye bir kez yüklenir. quantile_levels boş değilse her fold'da bir
+    QuantileForecaster da eğitilir; CRPS yalnızca onun kantilleriyle hesaplanır.
+    """
+
+    def __init__(self, window: str = "expanding", horizon: int = None,
+                 train_days: int = 365, step_days: int = 30,
+                 model_types: List[str] = None, n_jobs: int = None,
+                 feature_engine: FeatureEngine = None,
+                 model_params: Dict[str, Dict] = None,
+                 quantile_levels: List[float] = None):
+        if window not in ("expanding", "sliding"):
+            raise ValueError(f"Desteklenmeyen pencere tipi: {window}")
+
+        self.window = window
+        self.horizon = horizon or settings.model.prediction_days
+        self.train_days = train_days
+        self.step_days = step_days
+        self.model_types = [m for m in (model_types or settings.model.model_types) if not is_classifier(m)]
+        self.n_jobs = n_jobs if n_jobs is not None else settings.model.n_jobs
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.model_params = model_params or settings.model.model_params
+        self.quantile_levels = settings.model.quantile_levels if quantile_levels is None else quantile_levels
+
+    @property
+    def workers(self) -> int:
+        """Gerçek işçi süreç sayısı"""
+        if self.n_jobs is None or self.n_jobs < 1:
+            return os.cpu_count() or 1
+        return self.n_jobs
+
+    def origins(self, dates: pd.Series) -> List[pd.Timestamp]:
+        """Başlangıç tarihleri: ilk train_days sonrasından son horizon güne kadar"""
+        first, last = dates.min(), dates.max()
+        start = first + timedelta(days=self.train_days)
+        end = last - timedelta(days=self.horizon)
+        if start > end:
+            return []
+        return list(pd.date_range(start, end, freq=f"{self.step_days}D"))
+
+    def run(self, combined_data: pd.DataFrame) -> BacktestReport:
+        """
+        Birleşik geçmiş veri üzerinde geriye dönük testi çalıştır
+
+        Args:
+            combined_data: Baraj + meteoroloji birleşik verisi
+
+        Returns:
+            BacktestReport: Tahminler, gözlemler ve ufuk bazlı metrikler
+        """
+        features = self.feature_engine.transform(combined_data)
+        dam_names = sorted(features["dam_name"].unique())
+        origins = self.origins(features["date"])
+        if not origins:
+            logger.warning("Geriye dönük test için yeterli geçmiş yok")
+            return BacktestReport([], dam_names, np.empty((0, len(dam_names), self.horizon)), {})
+
+        tasks = [{
+            "origin": origin,
+            "horizon": self.horizon,
+            "window": self.window,
+            "train_days": self.train_days,
+            "dam_names": dam_names,
+            "model_types": self.model_types,
+            "model_params": self.model_params,
+            "quantile_levels": self.quantile_levels,
+            "quantile_horizons": [h for h in settings.model.quantile_horizons if h <= self.horizon] or [self.horizon],
+            "feature_config": {
+                "lag_features": self.feature_engine.lag_features,
+                "moving_average_windows": self.feature_engine.moving_average_windows,
+                "precipitation_windows": self.feature_engine.precipitation_windows,
+                "degree_day_base": self.feature_engine.degree_day_base,
+                "target_column": self.feature_engine.target_column
+            }
+        } for origin in origins]
+
+        logger.info(f"{len(origins)} fold x {len(dam_names)} baraj için geriye dönük test "
+                    f"({self.window}, {self.workers} işçi)")
+
+        work_dir = tempfile.mkdtemp(prefix="izmir_backtest_")
+        try:
+            features_path = os.path.join(work_dir, "features.pkl")
+            features.to_pickle(features_path)
+
+            if self.workers == 1 or len(tasks) == 1:
+                _init_worker(features_path)
+                outputs = [_run_backtest_fold(task) for task in tasks]
+                _WORKER_STATE.clear()
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)),
+                                         initializer=_init_worker,
+                                         initargs=(features_path,)) as executor:
+                    outputs = list(executor.map(_run_backtest_fold, tasks))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        actuals = np.stack([output["actuals"] for output in outputs])
+        methods = [HEURISTIC_METHOD] + self.model_types
+        if self.quantile_levels:
+            methods.append(QUANTILE_METHOD)
+        predictions = {
+            method: np.stack([output["predictions"][method] for output in outputs])
+            for method in methods
+        }
+        members = {
+            method: np.stack([output["members"][method] for output in outputs])
+            for method in outputs[0]["members"]
+        }
+
+        metrics = pd.concat([
+            skill_by_horizon(predictions[method], actuals, members.get(method),
+                             sorted(self.quantile_levels) if method in members else None).assign(method=method)
+            for method in methods
+        ], ignore_index=True)
+
+        return BacktestReport(
+            origins=[output["origin"] for output in outputs],
+            dam_names=dam_names,
+            actuals=actuals,
+            predictions=predictions,
+            metrics=metrics[["method", "horizon", "rmse", "mae", "crps", "n"]],
+            members=members
+        )
@@ -0,0 +1,311 @@
+"""
+Toplu Çalıştırma Servisi - Etkileşimsiz çok bölgeli analiz, bölge başına
+ayrı işçi süreci ve aşama süre özetleri
+"""
+import os
+import json
+import time
+import copy
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+from config.settings import settings
+from models.dam_registry import DamRegistry
+from services.instrumentation import tracer
+from services.results_writer import encode_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = "izmir"
+SUMMARY_FILE = "batch_summary.json"
+
+@dataclass
+class RegionConfig:
+    """
+    Bir bölgenin baraj kaydı ve veri kaynağı ayarları
+
+    registry boşsa ayarlardaki baraj kaydı kullanılır. Yol alanları boşsa
+    ayarlardaki varsayılanlar geçerlidir.
+    """
+    name: str
+    registry: Optional[DamRegistry] = None
+    dam_source: Optional[str] = None
+    weather_source: Optional[str] = None
+    dam_csv_path: Optional[str] = None
+    weather_csv_path: Optional[str] = None
+    gridded_path: Optional[str] = None
+    dam_curve_path: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> "RegionConfig":
+        """
+        Bölge kayıt dosyasını (JSON) oku
+
+        Beklenen biçim:
+            {"name": "manisa", "dams": {"Demirköprü": {"latitude": ..., ...}},
+             "dam_csv_path": "data/manisa_dam_data.csv", ...}
+
+        Barajlar satır içi "dams" yerine "registry_path" ile ayrı bir kayıt
+        dosyasından (JSON/CSV/SQLite) okunabilir. Göreli veri yolları
+        dosyanın bulunduğu dizine göre çözülür.
+        """
+        config_path = Path(path)
+        with open(config_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        name = raw.get("name") or config_path.stem
+        paths = {}
+        for key in ["dam_csv_path", "weather_csv_path", "gridded_path", "dam_curve_path", "registry_path"]:
+            value = raw.get(key)
+            if value is not None and not os.path.isabs(value):
+                value = str(config_path.parent / value)
+            paths[key] = value
+
+        registry_path = paths.pop("registry_path")
+        cell_deg = settings.data.dam_registry_cell_deg
+        try:
+            if registry_path:
+                registry = DamRegistry.load(registry_path, cell_deg=cell_deg)
+            elif raw.get("dams"):
+                registry = DamRegistry(raw["dams"], cell_deg=cell_deg, source=str(config_path))
+            else:
+                registry = None
+        except ValueError as e:
+            raise ValueError(f"{config_path}: {e}")
+
+        return cls(name=name, registry=registry, dam_source=raw.get("dam_source"),
+                   weather_source=raw.get("weather_source"), **paths)
+
+@dataclass
+class BatchOptions:
+    """Tüm bölgelere uygulanan çalıştırma seçenekleri"""
+    dam_source: str = "csv"
+    weather_source: str = "csv"
+    dam_csv_path: Optional[str] = None
+    weather_csv_path: Optional[str] = None
+    gridded_path: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    days: int = 30
+    dam_names: Optional[List[str]] = None
+    table_format: Optional[str] = None
+    output_dir: str = None
+    predict_days: Optional[int] = None
+    train: bool = False
+    save: bool = True
+
+    def fetch_days(self) -> int:
+        """API kaynakları için istenecek gün sayısı (başlangıç tarihi varsa ondan türetilir)"""
+        if self.start_date is None:
+            return self.days
+        end = datetime.fromisoformat(self.end_date) if self.end_date else datetime.now()
+        return max((end - datetime.fromisoformat(self.start_date)).days + 1, 1)
+
+@contextmanager
+def region_settings(region: RegionConfig, options: BatchOptions) -> Iterator[None]:
+    """
+    Bölgenin baraj kaydını ve depo yollarını ayarlara geçici olarak uygula
+
+    İşçi süreçlerinde her süreç kendi ayar kopyasına sahiptir; aynı süreçte
+    art arda çalışan bölgeler için çıkışta eski değerler geri yüklenir.
+    """
+    saved_registry = settings.dam_registry
+    saved_data = copy.copy(settings.data)
+    saved_model = copy.copy(settings.model)
+    try:
+        if region.registry is not None:
+            settings.dam_registry = region.registry
+        if region.dam_curve_path:
+            settings.data.dam_curve_path = region.dam_curve_path
+        settings.data.results_dir = os.path.join(options.output_dir or saved_data.results_dir, region.name)
+        if region.name != DEFAULT_REGION:
+            # Bölgeler aynı model deposunu paylaşmaz
+            registry_dir = os.path.join(saved_model.model_registry_dir, region.name)
+            settings.model.model_registry_dir = registry_dir
+            for key in ["online_checkpoint_path", "drought_index_cache_path", "climatology_path",
+                        "alert_state_path"]:
+                setattr(settings.model, key, os.path.join(registry_dir, os.path.basename(getattr(saved_model, key))))
+        yield
+    finally:
+        settings.dam_registry = saved_registry
+        settings.data = saved_data
+        settings.model = saved_model
+
+def create_app(region: RegionConfig, options: BatchOptions):
+    """Bölge ve seçeneklere göre veri kaynakları ayarlanmış uygulama (region_settings içinde çağrılır)"""
+    from main import IzmirDamPredictionApp
+
+    app = IzmirDamPredictionApp()
+    app.setup_data_sources(
+        dam_source=region.dam_source or options.dam_source,
+        weather_source=region.weather_source or options.weather_source,
+        dam_csv_path=region.dam_csv_path or options.dam_csv_path or settings.data.csv_dam_data_path,
+        weather_csv_path=region.weather_csv_path or options.weather_csv_path or settings.data.csv_weather_data_path,
+        gridded_path=region.gridded_path or options.gridded_path or settings.data.gridded_data_path
+    )
+    return app
+
+def load_arguments(region: RegionConfig, options: BatchOptions) -> Dict[str, Any]:
+    """load_*_data / refresh_data argümanları (baraj alt kümesi bölgeyle kesiştirilir)"""
+    registry = settings.dam_registry
+    dam_names = registry.names()
+    if options.dam_names:
+        selected = {registry.resolve(name) for name in options.dam_names}
+        unknown = sorted(name for name in options.dam_names if registry.resolve(name) is None)
+        if unknown:
+            logger.warning(f"{region.name}: bölgede bulunmayan barajlar atlandı: {unknown}")
+        dam_names = [name for name in dam_names if name in selected]
+    if not dam_names:
+        raise ValueError("Seçilen baraj alt kümesi bu bölgede boş")
+    return {"dam_names": dam_names, "days": options.fetch_days(),
+            "start_date": options.start_date, "end_date": options.end_date}
+
+def run_region(region: RegionConfig, options: BatchOptions) -> Dict[str, Any]:
+    """
+    Tek bölge için yükleme → işleme → analiz → tahmin → rapor → kayıt akışını çalıştır
+
+    İşçi süreçlerinde çağrılır; hata yükseltmez, özet içinde bildirir.
+
+    Returns:
+        Dict: Bölge adı, durum, aşama süreleri (saniye) ve çıktı dizini
+    """
+    summary: Dict[str, Any] = {"region": region.name, "status": "ok", "pid": os.getpid(), "timings": {}}
+    started = time.perf_counter()
+    counters_before = dict(tracer.counters)
+
+    def stage(name: str, func: Callable[[], Any]) -> Any:
+        stage_start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            summary["timings"][name] = round(time.perf_counter() - stage_start, 4)
+
+    try:
+        with region_settings(region, options):
+            app = create_app(region, options)
+            load_args = load_arguments(region, options)
+            if not stage("load_dam_data", lambda: app.load_dam_data(**load_args)):
+                raise RuntimeError("Baraj verileri yüklenemedi")
+            if not stage("load_weather_data", lambda: app.load_weather_data(**load_args)):
+                raise RuntimeError("Meteorolojik veriler yüklenemedi")
+            if not stage("process_data", app.process_data):
+                raise RuntimeError("Veri işleme başarısız")
+
+            if options.train:
+                stage("train_models", app.train_models)
+            analysis = stage("analyze_dams", app.analyze_dams)
+            stage("predict_future_levels", lambda: app.predict_future_levels(options.predict_days))
+            report = stage("generate_report", app.generate_report)
+            if options.save:
+                summary["output"] = stage("save_results", lambda: app.save_results(
+                    settings.data.results_dir, table_format=options.table_format))
+
+            overall = analysis.get("overall_status", {})
+            summary.update({
+                "dams": len(app.dam_manager.get_all_dams()),
+                "records": len(app.combined_data),
+                "critical_dams": overall.get("critical_dams", 0),
+                "alerts": len(report.get("alerts", []))
+            })
+            if settings.logging.trace_file:
+                # İşçi süreçlerinin izleri bölge çıktı dizinine yazılır
+                summary["trace"] = tracer.export_trace(os.path.join(settings.data.results_dir,
+                                                                    os.path.basename(settings.logging.trace_file)))
+    except Exception as e:
+        logger.error(f"{region.name} bölgesi çalıştırma hatası: {e}")
+        summary.update({"status": "failed", "error": str(e)})
+
+    summary["counters"] = {name: value - counters_before.get(name, 0)
+                           for name, value in tracer.counters.items() if value != counters_before.get(name, 0)}
+
+    summary["total_seconds"] = round(time.perf_counter() - started, 4)
+    return summary
+
+def run_daemon(region: RegionConfig, options: BatchOptions, interval: float = None) -> None:
+    """
+    Tek bölgeyi sıcak tutarak yenileme zamanlayıcısıyla ön planda çalıştır
+
+    İlk döngü verileri soğuk yükler; sonraki döngüler yalnızca değişen
+    girdilerin aşamalarını yeniler. save açıksa veri değişen her döngüden
+    sonra sonuçlar yazılır.
+    """
+    from services.scheduler_service import RefreshScheduler
+
+    with region_settings(region, options):
+        app = create_app(region, options)
+        listeners = []
+        if options.save:
+            def save_changed(status: Dict[str, Any]) -> None:
+                if any(status["last_changed"].values()):
+                    app.save_results(settings.data.results_dir, table_format=options.table_format)
+            listeners.append(save_changed)
+
+        scheduler = RefreshScheduler(app, interval=interval, refresh_kwargs=load_arguments(region, options),
+                                     listeners=listeners)
+        app.scheduler = scheduler
+        scheduler.run_forever()
+
+def run_batch(regions: List[RegionConfig], options: BatchOptions,
+              max_workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Bölgeleri bağımsız işçi süreçlerinde paralel çalıştır
+
+    Tek bölge veya tek işçide süreç havuzu açılmaz.
+
+    Returns:
+        List[Dict]: Bölge sırasıyla çalıştırma özetleri
+    """
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(regions)))
+    logger.info(f"Toplu çalıştırma: {len(regions)} bölge, {max_workers} işçi")
+
+    if max_workers == 1:
+        return [run_region(region, options) for region in regions]
+
+    # Varsayılan kayıt havuzdan önce yüklenir; fork ile başlayan işçiler
+    # onu yeniden okumadan paylaşır, bölge kayıtları ise görevle bir kez taşınır
+    settings.dam_registry
+    results: Dict[str, Dict[str, Any]] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_region, region, options): region for region in regions}
+        for future in as_completed(futures):
+            region = futures[future]
+            try:
+                results[region.name] = future.result()
+            except Exception as e:  # işçi süreci çöktü
+                logger.error(f"{region.name} işçi süreci hatası: {e}")
+                results[region.name] = {"region": region.name, "status": "failed", "error": str(e), "timings": {}}
+    return [results[region.name] for region in regions]
+
+def write_batch_summary(summaries: List[Dict[str, Any]], options: BatchOptions,
+                        wall_seconds: float) -> str:
+    """Çalıştırma özetlerini çıktı dizinine atomik olarak yaz"""
+    output_dir = options.output_dir or settings.data.results_dir
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SUMMARY_FILE)
+    payload = {"created_at": datetime.now(), "wall_seconds": round(wall_seconds, 4),
+               "options": asdict(options), "regions": summaries}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_json(payload))
+    os.replace(tmp_path, path)
+    return path
+
+def format_batch_summary(summaries: List[Dict[str, Any]], wall_seconds: float) -> str:
+    """Konsol için bölge başına süre tablosu"""
+    lines = [f"{'Bölge':<16} {'Durum':<8} {'Baraj':>5} {'Kayıt':>7} {'Süre (s)':>9}  En uzun aşama"]
+    for summary in summaries:
+        timings = summary.get("timings", {})
+        slowest = max(timings.items(), key=lambda item: item[1]) if timings else ("-", 0.0)
+        lines.append(
+            f"{summary['region']:<16} {summary['status']:<8} {summary.get('dams', 0):>5} "
+            f"{summary.get('records', 0):>7} {summary.get('total_seconds', 0.0):>9.2f}  "
+            f"{slowest[0]} ({slowest[1]:.2f}s)"
+        )
+        if summary.get("error"):
+            lines.append(f"{'':<16} hata: {summary['error']}")
+    lines.append(f"Toplam duvar süresi: {wall_seconds:.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,281 @@
+"""
+Batimetri Servisi - Baraj alan-kot-hacim eğrileri ve vektörel dönüşümler
+"""
+import os
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CURVE_QUANTITIES = ("elevation", "area", "volume")
+CURVE_TABLE_COLUMNS = {"elevation": "elevation_m", "area": "area_km2", "volume": "volume_mcm"}
+
+def _strictly_increasing(values: np.ndarray) -> np.ndarray:
+    """Yinelenen düğümleri ayıklamak için kesin artan maske"""
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = np.diff(values) > 0
+    return keep
+
+class DamCurve:
+    """
+    Tek baraj için alan-kot-hacim eğrisi
+
+    Düğümler kota göre sıralanır; alan ve hacim kotla azalmayan olmalıdır.
+    Parçalı doğrusal enterpolasyon monoton olduğundan her yönde tersinir
+    dönüşüm sağlar. Her dönüşüm için (x, y) düğüm çiftleri kurulumda bir kez
+    hazırlanır, çağrılar yalnızca np.interp'tir ve her şekilde diziyi
+    (zaman serisi, topluluk) kabul eder. Aralık dışı değerler uçlara kırpılır.
+    """
+
+    def __init__(self, dam_name: str, elevation: np.ndarray, area: np.ndarray, volume: np.ndarray,
+                 source: str = "table"):
+        elevation = np.asarray(elevation, dtype=np.float64)
+        area = np.asarray(area, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        if not (len(elevation) == len(area) == len(volume)):
+            raise ValueError(f"{dam_name}: eğri sütunlarının uzunlukları farklı")
+        if len(elevation) < 2:
+            raise ValueError(f"{dam_name}: eğri için en az 2 düğüm gerekli")
+        if not (np.isfinite(elevation).all() and np.isfinite(area).all() and np.isfinite(volume).all()):
+            raise ValueError(f"{dam_name}: eğri düğümlerinde eksik değer var")
+
+        order = np.argsort(elevation, kind="stable")
+        elevation, area, volume = elevation[order], area[order], volume[order]
+        if np.any(np.diff(area) < 0) or np.any(np.diff(volume) < 0):
+            raise ValueError(f"{dam_name}: alan ve hacim kotla birlikte artmalı")
+        if volume[0] < 0 or area[0] < 0:
+            raise ValueError(f"{dam_name}: alan ve hacim negatif olamaz")
+
+        self.dam_name = dam_name
+        self.source = source
+        self.knots = {"elevation": elevation, "area": area, "volume": volume}
+
+        # Her (kaynak, hedef) için kaynağa göre kesin artan düğüm çiftleri
+        self._pairs: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        for x_name in CURVE_QUANTITIES:
+            keep = _strictly_increasing(self.knots[x_name])
+            for y_name in CURVE_QUANTITIES:
+                if x_name != y_name:
+                    self._pairs[(x_name, y_name)] = (
+                        np.ascontiguousarray(self.knots[x_name][keep]),
+                        np.ascontiguousarray(self.knots[y_name][keep])
+                    )
+
+    @property
+    def capacity_mcm(self) -> float:
+        return float(self.knots["volume"][-1])
+
+    @property
+    def full_area_km2(self) -> float:
+        return float(self.knots["area"][-1])
+
+    @property
+    def elevation_range(self) -> Tuple[float, float]:
+        return float(self.knots["elevation"][0]), float(self.knots["elevation"][-1])
+
+    def knot_pair(self, source: str, target: str) -> Tuple[np.ndarray, np.ndarray]:
+        """source -> target dönüşümünün düğümleri"""
+        if (source, target) not in self._pairs:
+            raise ValueError(f"Geçersiz eğri dönüşümü: {source} -> {target}")
+        return self._pairs[(source, target)]
+
+    def convert(self, values, source: str, target: str) -> np.ndarray:
+        """Herhangi şekildeki diziyi source biriminden target birimine çevir"""
+        xp, fp = self.knot_pair(source, target)
+        return np.interp(values, xp, fp)
+
+    def volume_to_area(self, volume) -> np.ndarray:
+        """Hacim (mcm) -> yüzey alanı (km²)"""
+        return self.convert(volume, "volume", "area")
+
+    def volume_to_elevation(self, volume) -> np.ndarray:
+        """Hacim (mcm) -> su kotu (m)"""
+        return self.convert(volume, "volume", "elevation")
+
+    def elevation_to_volume(self, elevation) -> np.ndarray:
+        """Su kotu (m) -> hacim (mcm)"""
+        return self.convert(elevation, "elevation", "volume")
+
+    def elevation_to_area(self, elevation) -> np.ndarray:
+        """Su kotu (m) -> yüzey alanı (km²)"""
+        return self.convert(elevation, "elevation", "area")
+
+    def area_to_volume(self, area) -> np.ndarray:
+        """Yüzey alanı (km²) -> hacim (mcm)"""
+        return self.convert(area, "area", "volume")
+
+    def area_to_elevation(self, area) -> np.ndarray:
+        """Yüzey alanı (km²) -> su kotu (m)"""
+        return self.convert(area, "area", "elevation")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Eğri tablosu şemasında düğümler"""
+        frame = pd.DataFrame({CURVE_TABLE_COLUMNS[q]: self.knots[q] for q in CURVE_QUANTITIES})
+        frame.insert(0, "dam_name", self.dam_name)
+        return frame
+
+def synthetic_curve(dam_name: str, capacity_mcm: float, surface_area_km2: float,
+                    n_knots: int = None, base_elevation: float = 0.0) -> DamCurve:
+    """
+    Batimetri tablosu olmayan baraj için koni biçimli eğri
+
+    V = V_kap * (h / H)^3 ve A = A_dolu * (h / H)^2 alınır; bu, su dengesindeki
+    A ~ V^(2/3) güç yasasıyla aynı geometridir. Derinlik H = 3 V_kap / A_dolu
+    (mcm / km² -> m) çıkar. Kotlar base_elevation'a göre görecelidir.
+    """
+    if n_knots is None:
+        n_knots = settings.data.synthetic_curve_knots
+    if capacity_mcm <= 0 or surface_area_km2 <= 0:
+        raise ValueError(f"{dam_name}: sentetik eğri için kapasite ve yüzey alanı pozitif olmalı")
+
+    depth = 3 * capacity_mcm / surface_area_km2
+    ratio = np.linspace(0.0, 1.0, n_knots)
+    return DamCurve(dam_name,
+                    elevation=base_elevation + depth * ratio,
+                    area=surface_area_km2 * ratio ** 2,
+                    volume=capacity_mcm * ratio ** 3,
+                    source="synthetic")
+
+def load_curve_table(path: str) -> Dict[str, DamCurve]:
+    """
+    CSV eğri tablosunu oku (dam_name, elevation_m, area_km2, volume_mcm)
+
+    Geçersiz eğriler atlanır ve loglanır.
+    """
+    table = pd.read_csv(path)
+    missing = {"dam_name", *CURVE_TABLE_COLUMNS.values()} - set(table.columns)
+    if missing:
+        raise ValueError(f"Eğri tablosunda eksik sütunlar: {sorted(missing)}")
+
+    curves = {}
+    for dam_name, group in table.groupby("dam_name", sort=False):
+        try:
+            curves[dam_name] = DamCurve(
+                dam_name,
+                elevation=group[CURVE_TABLE_COLUMNS["elevation"]].to_numpy(),
+                area=group[CURVE_TABLE_COLUMNS["area"]].to_numpy(),
+                volume=group[CURVE_TABLE_COLUMNS["volume"]].to_numpy()
+            )
+        except ValueError as e:
+            logger.error(f"Eğri tablosu satırları geçersiz: {e}")
+    logger.info(f"{len(curves)} baraj eğrisi yüklendi: {path}")
+    return curves
+
+class CurveInterpolator:
+    """
+    Çok barajlı tek çağrılık eğri enterpolatörü
+
+    Her barajın düğümleri kendinden öncekilerin üstüne kaydırılarak tek bir
+    sıralı diziye dizilir; böylece (baraj, ...) şeklindeki bir dizi, her
+    satırı kendi eğrisiyle, tek searchsorted ve üç indeksleme ile çevrilir.
+    Barajlar arasında Python döngüsü yoktur. Parça eğimleri önceden hesaplanır.
+    """
+
+    def __init__(self, curves: List[DamCurve], source: str, target: str):
+        pairs = [curve.knot_pair(source, target) for curve in curves]
+        lengths = np.array([len(xp) for xp, _ in pairs])
+        if np.any(lengths < 2):
+            raise ValueError(f"{source} -> {target} için en az 2 farklı düğüm gerekli")
+
+        self.dam_names = [curve.dam_name for curve in curves]
+        self.lower = np.array([xp[0] for xp, _ in pairs])
+        self.upper = np.array([xp[-1] for xp, _ in pairs])
+        spans = self.upper - self.lower + 1.0
+        self.offsets = np.concatenate([[0.0], np.cumsum(spans)[:-1]]) - self.lower
+
+        self.x = np.concatenate([xp + offset for (xp, _), offset in zip(pairs, self.offsets)])
+        self.y = np.concatenate([fp for _, fp in pairs])
+        self.slope = np.append(np.diff(self.y) / np.diff(self.x), 0.0)
+
+        ends = np.cumsum(lengths)
+        self.first_segment = ends - lengths
+        self.last_segment = ends - 2
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            values: (baraj, ...) dizi; ilk eksen yapıcıdaki baraj sırasıdır
+
+        Returns:
+            np.ndarray: Aynı şekilde dönüştürülmüş değerler
+        """
+        values = np.asarray(values, dtype=np.float64)
+        expand = (slice(None),) + (None,) * (values.ndim - 1)
+        shifted = np.clip(values, self.lower[expand], self.upper[expand]) + self.offsets[expand]
+        segment = np.searchsorted(self.x, shifted, side="right") - 1
+        segment = np.clip(segment, self.first_segment[expand], self.last_segment[expand])
+        return self.y[segment] + (shifted - self.x[segment]) * self.slope[segment]
+
+class DamCurveSet:
+    """
+    Barajların alan-kot-hacim eğrileri
+
+    Tablodan yüklenen eğriler önceliklidir; tablosu olmayan barajlar için
+    kapasite ve dolu yüzey alanından sentetik eğri üretilir. Çok barajlı
+    enterpolatörler baraj sırası ve dönüşüm başına önbelleğe alınır.
+    """
+
+    def __init__(self, curves: Dict[str, DamCurve]):
+        self.curves = dict(curves)
+        self._interpolators: Dict[Tuple, CurveInterpolator] = {}
+
+    @classmethod
+    def from_settings(cls, path: Optional[str] = None, dam_info: Dict[str, Dict] = None) -> "DamCurveSet":
+        """Eğri tablosu + eksik barajlar için sentetik eğriler"""
+        path = path if path is not None else settings.data.dam_curve_path
+        dam_info = dam_info if dam_info is not None else settings.dam_registry
+
+        curves: Dict[str, DamCurve] = {}
+        if path and os.path.exists(path):
+            try:
+                curves = load_curve_table(path)
+            except Exception as e:
+                logger.error(f"Eğri tablosu okunamadı ({path}): {e}")
+
+        for dam_name, info in dam_info.items():
+            if dam_name in curves:
+                continue
+            try:
+                curves[dam_name] = synthetic_curve(dam_name, info.get("capacity_mcm", 0.0),
+                                                   info.get("surface_area_km2", 0.0))
+            except ValueError as e:
+                logger.warning(f"Eğri oluşturulamadı: {e}")
+        return cls(curves)
+
+    def __contains__(self, dam_name: str) -> bool:
+        return dam_name in self.curves
+
+    def get(self, dam_name: str) -> Optional[DamCurve]:
+        return self.curves.get(dam_name)
+
+    def interpolator(self, dam_names: List[str], source: str, target: str) -> CurveInterpolator:
+        """Verilen baraj sırası için önbellekli çok barajlı enterpolatör"""
+        key = (tuple(dam_names), source, target)
+        if key not in self._interpolators:
+            missing = [name for name in dam_names if name not in self.curves]
+            if missing:
+                raise ValueError(f"Eğrisi olmayan barajlar: {missing}")
+            self._interpolators[key] = CurveInterpolator([self.curves[name] for name in dam_names],
+                                                         source, target)
+        return self._interpolators[key]
+
+    def convert(self, dam_names: List[str], values: np.ndarray, source: str, target: str) -> np.ndarray:
+        """(baraj, ...) diziyi her satırın kendi eğrisiyle çevir"""
+        return self.interpolator(dam_names, source, target)(values)
+
+    def area_function(self, dam_names: List[str]):
+        """Su dengesi entegrasyonu için (hacim, kapasite, dolu alan) -> alan fonksiyonu"""
+        interpolate = self.interpolator(dam_names, "volume", "area")
+
+        def area(storage, capacity=None, full_area=None):
+            return interpolate(storage)
+
+        return area
+
+    def to_frame(self) -> pd.DataFrame:
+        """Tüm eğriler tablo şemasında"""
+        frames = [curve.to_frame() for curve in self.curves.values()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,316 @@
+"""
+Klimatoloji Servisi - Baraj ve yılın günü bazında yüzdelik normaller, anomali ve
+yüzdelik sıra sorguları
+"""
+import os
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+import joblib
+from config.settings import settings
+from models.dam import DroughtLevel
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365
+PERCENTILE_GRID = np.linspace(0.0, 100.0, 101)
+
+def day_of_year_index(dates) -> np.ndarray:
+    """0 tabanlı 365 günlük takvim indisi; 29 Şubat sorgularda 28 Şubat'a eşlenir"""
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    doy = dates.dayofyear.to_numpy() - 1
+    return doy - (dates.is_leap_year & (doy >= 59)).astype(np.int64)
+
+def drought_level_from_percentile(rank: float, thresholds: List[float] = None) -> DroughtLevel:
+    """Yüzdelik sıradan göreli kuraklık seviyesi (eşikler azalan sırada)"""
+    thresholds = thresholds or settings.model.climatology_alert_percentiles
+    if rank is None or not np.isfinite(rank):
+        return DroughtLevel.NORMAL
+    levels = [DroughtLevel.WARNING, DroughtLevel.MODERATE, DroughtLevel.SEVERE, DroughtLevel.CRITICAL]
+    result = DroughtLevel.NORMAL
+    for threshold, level in zip(thresholds, levels):
+        if rank <= threshold:
+            result = level
+    return result
+
+def _row_percentiles(samples: np.ndarray, min_samples: int) -> np.ndarray:
+    """
+    Satır başına PERCENTILE_GRID yüzdelikleri (doğrusal enterpolasyon, NaN hariç)
+
+    np.nanpercentile yerine tek sıralama + take_along_axis kullanılır.
+    """
+    ordered = np.sort(samples, axis=1)  # NaN'lar sona gider
+    n = np.isfinite(ordered).sum(axis=1)
+    position = PERCENTILE_GRID[None, :] / 100 * np.maximum(n - 1, 0)[:, None]
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(n - 1, 0)[:, None])
+    weight = position - lower
+    low_values = np.take_along_axis(ordered, lower, axis=1)
+    high_values = np.take_along_axis(ordered, upper, axis=1)
+    grid = low_values + (high_values - low_values) * weight
+    grid[n < min_samples] = np.nan
+    return grid
+
+class ClimatologyStore:
+    """
+    Baraj x yılın günü klimatoloji deposu
+
+    Her değişken için ham gözlemler (baraj, yıl, gün) matrisinde tutulur;
+    her (baraj, gün) için ±half_window günlük pencerede, tüm yıllar üzerinden
+    0-100 yüzdelik ızgarası, ortalama ve standart sapma önceden hesaplanır.
+    Sorgular baraj ve gün indisiyle doğrudan dizi okumasıdır. Yeni veya
+    değişen gözlemler yalnızca etkiledikleri günlerin pencerelerini yeniden
+    hesaplatır.
+    """
+
+    def __init__(self, half_window: int = None, min_samples: int = None):
+        self.half_window = half_window if half_window is not None else settings.model.climatology_half_window
+        self.min_samples = min_samples if min_samples is not None else settings.model.climatology_min_samples
+
+        self.dam_names: List[str] = []
+        self.first_year: Optional[int] = None
+        self.values: Dict[str, np.ndarray] = {}
+        self.grid: Dict[str, np.ndarray] = {}
+        self.mean: Dict[str, np.ndarray] = {}
+        self.std: Dict[str, np.ndarray] = {}
+
+    @property
+    def variables(self) -> List[str]:
+        return list(self.values)
+
+    @property
+    def n_years(self) -> int:
+        return next(iter(self.values.values())).shape[1] if self.values else 0
+
+    def _dam_index(self, dam_names) -> np.ndarray:
+        """Baraj adlarını indise çevir; bilinmeyenler -1"""
+        lookup = {name: i for i, name in enumerate(self.dam_names)}
+        return np.array([lookup.get(name, -1) for name in dam_names], dtype=np.int64)
+
+    def _ensure_shape(self, dam_names: List[str], years: np.ndarray) -> None:
+        """Yeni barajlar ve yıllar için tüm değişken dizilerini genişlet"""
+        new_dams = [name for name in pd.unique(np.asarray(dam_names)) if name not in self.dam_names]
+        if self.first_year is None:
+            self.first_year = int(years.min())
+        pad_before = max(self.first_year - int(years.min()), 0)
+        pad_after = max(int(years.max()) - (self.first_year + self.n_years - 1), 0) if self.values else 0
+        self.first_year -= pad_before
+        self.dam_names.extend(new_dams)
+
+        for variable in self.values:
+            self.values[variable] = np.pad(self.values[variable], ((0, len(new_dams)), (pad_before, pad_after), (0, 0)),
+                                           constant_values=np.nan)
+            for store in (self.grid, self.mean, self.std):
+                pad = ((0, len(new_dams)),) + ((0, 0),) * (store[variable].ndim - 1)
+                store[variable] = np.pad(store[variable], pad, constant_values=np.nan)
+
+    def _create_variable(self, variable: str, n_years: int) -> None:
+        n_dams = len(self.dam_names)
+        n_years = max(n_years, self.n_years)
+        self.values[variable] = np.full((n_dams, n_years, DAYS_PER_YEAR), np.nan)
+        self.grid[variable] = np.full((n_dams, DAYS_PER_YEAR, len(PERCENTILE_GRID)), np.nan)
+        self.mean[variable] = np.full((n_dams, DAYS_PER_YEAR), np.nan)
+        self.std[variable] = np.full((n_dams, DAYS_PER_YEAR), np.nan)
+
+    def _refresh(self, variable: str, dam: int, days: np.ndarray) -> None:
+        """Tek baraj için verilen günlerin pencere istatistiklerini yeniden hesapla"""
+        offsets = np.arange(-self.half_window, self.half_window + 1)
+        columns = (days[:, None] + offsets[None, :]) % DAYS_PER_YEAR
+        # (yıl, gün, pencere) -> (gün, yıl * pencere)
+        samples = self.values[variable][dam][:, columns].transpose(1, 0, 2).reshape(len(days), -1)
+        counts = np.isfinite(samples).sum(axis=1)
+        enough = counts >= self.min_samples
+
+        self.grid[variable][dam, days] = _row_percentiles(samples, self.min_samples)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean[variable][dam, days] = np.where(enough, np.nanmean(samples, axis=1), np.nan)
+            self.std[variable][dam, days] = np.where(enough, np.nanstd(samples, axis=1), np.nan)
+
+    def update(self, observations: Dict[str, pd.DataFrame]) -> int:
+        """
+        Gözlemleri depoya ekle ve yalnızca etkilenen günleri yeniden hesapla
+
+        Args:
+            observations: değişken -> (dam_name, date, value) çerçevesi; tüm geçmiş
+                verilebilir, yalnızca yeni veya değişen hücreler işlenir
+
+        Returns:
+            int: Yeniden hesaplanan (değişken, baraj, gün) sayısı
+        """
+        refreshed = 0
+        for variable, frame in observations.items():
+            frame = frame.dropna(subset=["value"])
+            dates = pd.to_datetime(frame["date"])
+            # 29 Şubat 28 Şubat hücresinin üzerine yazmasın diye depoya alınmaz
+            leap_day = ((dates.dt.month == 2) & (dates.dt.day == 29)).to_numpy()
+            frame, dates = frame[~leap_day], dates[~leap_day]
+            if frame.empty:
+                continue
+            years = dates.dt.year.to_numpy()
+            self._ensure_shape(frame["dam_name"].tolist(), years)
+            if variable not in self.values:
+                self._create_variable(variable, int(years.max()) - self.first_year + 1)
+
+            dams = self._dam_index(frame["dam_name"])
+            year_index = years - self.first_year
+            days = day_of_year_index(dates)
+            values = frame["value"].to_numpy(dtype=np.float64)
+
+            stored = self.values[variable][dams, year_index, days]
+            changed = ~np.isclose(stored, values, rtol=0, atol=1e-12) | np.isnan(stored)
+            if not changed.any():
+                continue
+            self.values[variable][dams[changed], year_index[changed], days[changed]] = values[changed]
+
+            # Değişen günün penceresindeki tüm günler etkilenir
+            offsets = np.arange(-self.half_window, self.half_window + 1)
+            for dam in np.unique(dams[changed]):
+                changed_days = np.unique(days[changed][dams[changed] == dam])
+                affected = np.unique((changed_days[:, None] + offsets[None, :]) % DAYS_PER_YEAR)
+                self._refresh(variable, dam, affected)
+                refreshed += len(affected)
+
+        if refreshed:
+            logger.info(f"Klimatoloji güncellendi: {refreshed} baraj-gün yeniden hesaplandı")
+        return refreshed
+
+    def _lookup(self, variable: str, dam_names, dates):
+        if variable not in self.values:
+            raise ValueError(f"Klimatolojide olmayan değişken: {variable}")
+        dams = self._dam_index(dam_names)
+        days = day_of_year_index(dates)
+        known = dams >= 0
+        return np.where(known, dams, 0), days, known
+
+    def percentile_rank(self, variable: str, dam_names, dates, values) -> np.ndarray:
+        """
+        Değerlerin kendi barajı ve takvim günündeki yüzdelik sırası (0-100)
+
+        Eşit değerler (ör. kuru günlerde sıfır yağış) için orta sıra verilir.
+        """
+        dams, days, known = self._lookup(variable, dam_names, dates)
+        values = np.asarray(values, dtype=np.float64)
+        grid = self.grid[variable][dams, days]
+
+        below = (grid < values[:, None]).sum(axis=1)
+        at_or_below = (grid <= values[:, None]).sum(axis=1)
+        last = len(PERCENTILE_GRID) - 1
+
+        # Izgara noktaları arasında doğrusal enterpolasyon
+        upper = np.clip(below, 1, last)
+        low_values = np.take_along_axis(grid, (upper - 1)[:, None], axis=1)[:, 0]
+        high_values = np.take_along_axis(grid, upper[:, None], axis=1)[:, 0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.clip((values - low_values) / (high_values - low_values), 0.0, 1.0)
+        rank = PERCENTILE_GRID[upper - 1] + np.nan_to_num(fraction) * (PERCENTILE_GRID[1] - PERCENTILE_GRID[0])
+        rank = np.where(below == 0, 0.0, np.where(below > last, 100.0, rank))
+
+        tied = at_or_below > below
+        tied_rank = (PERCENTILE_GRID[np.minimum(below, last)] + PERCENTILE_GRID[np.maximum(at_or_below - 1, 0)]) / 2
+        rank = np.where(tied, tied_rank, rank)
+
+        invalid = ~known | np.isnan(grid[:, 0]) | np.isnan(values)
+        return np.where(invalid, np.nan, rank)
+
+    def anomaly(self, variable: str, dam_names, dates, values) -> Dict[str, np.ndarray]:
+        """Klimatolojik ortalamadan fark ve standartlaştırılmış anomali"""
+        dams, days, known = self._lookup(variable, dam_names, dates)
+        values = np.asarray(values, dtype=np.float64)
+        mean = np.where(known, self.mean[variable][dams, days], np.nan)
+        std = np.where(known, self.std[variable][dams, days], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            standardized = np.where(std > 0, (values - mean) / std, np.nan)
+        return {"anomaly": values - mean, "standardized_anomaly": standardized}
+
+    def normals(self, variable: str, dam_name: str, dates, percentiles: List[float] = None) -> pd.DataFrame:
+        """Bir baraj için verilen tarihlerde klimatolojik yüzdelik bantlar"""
+        percentiles = percentiles or settings.model.climatology_percentiles
+        dates = pd.DatetimeIndex(pd.to_datetime(dates))
+        dams, days, known = self._lookup(variable, [dam_name] * len(dates), dates)
+        grid = self.grid[variable][dams, days]
+        frame = pd.DataFrame({"date": dates})
+        for percentile in percentiles:
+            column = np.interp(percentile, PERCENTILE_GRID, np.arange(len(PERCENTILE_GRID)))
+            lower = int(np.floor(column))
+            upper = min(lower + 1, len(PERCENTILE_GRID) - 1)
+            weight = column - lower
+            frame[f"p{int(percentile)}"] = np.where(known, grid[:, lower] * (1 - weight) + grid[:, upper] * weight,
+                                                     np.nan)
+        frame["mean"] = np.where(known, self.mean[variable][dams, days], np.nan)
+        return frame
+
+    def assess(self, variable: str, frame: pd.DataFrame, value_column: str = None) -> Dict[str, Dict]:
+        """Her barajın son gözlemi için yüzdelik sıra, anomali ve göreli kuraklık seviyesi"""
+        value_column = value_column or variable
+        if frame.empty or variable not in self.values:
+            return {}
+        latest = frame.dropna(subset=[value_column]).sort_values("date").groupby("dam_name").tail(1)
+        names, dates = latest["dam_name"].tolist(), latest["date"]
+        values = latest[value_column].to_numpy(dtype=np.float64)
+        ranks = self.percentile_rank(variable, names, dates, values)
+        anomalies = self.anomaly(variable, names, dates, values)
+        return {
+            name: {
+                "date": pd.Timestamp(date),
+                "value": float(value),
+                "percentile_rank": None if np.isnan(rank) else round(float(rank), 1),
+                "anomaly": None if np.isnan(anomaly) else round(float(anomaly), 4),
+                "standardized_anomaly": None if np.isnan(z) else round(float(z), 2),
+                "relative_drought_level": drought_level_from_percentile(rank).value
+            }
+            for name, date, value, rank, anomaly, z in zip(names, dates, values, ranks,
+                                                           anomalies["anomaly"],
+                                                           anomalies["standardized_anomaly"])
+        }
+
+    def save(self, path: str = None) -> str:
+        """Depoyu atomik olarak diske yaz"""
+        path = path or settings.model.climatology_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        joblib.dump(self.__dict__, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = None) -> Optional["ClimatologyStore"]:
+        """Kayıtlı depoyu yükle; dosya yoksa veya pencere ayarı farklıysa None"""
+        path = path or settings.model.climatology_path
+        if not os.path.exists(path):
+            return None
+        state = joblib.load(path)
+        store = cls()
+        if (state.get("half_window"), state.get("min_samples")) != (store.half_window, store.min_samples):
+            logger.info("Klimatoloji ayarları değişmiş, depo yeniden oluşturulacak")
+            return None
+        store.__dict__.update(state)
+        return store
+
+def climatology_observations(dam_data: pd.DataFrame, weather_data: pd.DataFrame,
+                             precipitation_window: int = None) -> Dict[str, pd.DataFrame]:
+    """
+    Depo değişkenlerini uzun biçimde hazırla: doluluk oranı ve kayan toplam yağış
+
+    Tek günlük yağış çoğunlukla sıfır olduğundan yağış klimatolojisi
+    precipitation_window günlük toplam üzerinden tutulur.
+    """
+    precipitation_window = precipitation_window or settings.model.climatology_precipitation_window
+    observations = {}
+    if not dam_data.empty and "fill_ratio" in dam_data.columns:
+        observations["fill_ratio"] = pd.DataFrame({
+            "dam_name": dam_data["dam_name"].to_numpy(),
+            "date": pd.to_datetime(dam_data["date"]).to_numpy(),
+            "value": dam_data["fill_ratio"].to_numpy(dtype=np.float64)
+        })
+
+    if not weather_data.empty and "precipitation" in weather_data.columns:
+        weather = weather_data[["dam_name", "date", "precipitation"]].copy()
+        weather["date"] = pd.to_datetime(weather["date"]).dt.normalize()
+        panel = weather.pivot_table(index="date", columns="dam_name", values="precipitation", aggfunc="mean")
+        panel = panel.reindex(pd.date_range(panel.index.min(), panel.index.max(), freq="D"))
+        totals = panel.rolling(precipitation_window, min_periods=precipitation_window).sum()
+        long = totals.stack().rename("value").reset_index()
+        long.columns = ["date", "dam_name", "value"]
+        observations[f"precipitation_{precipitation_window}d"] = long[["dam_name", "date", "value"]]
+    return observations
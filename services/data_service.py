@@ -11,6 +11,7 @@ import logging
 from pathlib import Path
 import time
 from config.settings import settings
+from services.instrumentation import instrument_session, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,7 @@ class APIDataSource(DataSource):
     def __init__(self, base_url: str, api_key: Optional[str] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session())
         self.session.headers.update({
             'User-Agent': 'IzmirDamPrediction/1.0',
             'Content-Type': 'application/json'
@@ -343,6 +344,17 @@ class DataService:
         elif source_type == "csv":
             file_path = kwargs.get('file_path', settings.data.csv_weather_data_path)
             self.weather_data_source = CSVDataSource(file_path)
+        elif source_type == "gridded":
+            from services.gridded_data_service import GriddedDataSource
+            file_path = kwargs.get('file_path', settings.data.gridded_data_path)
+            if not file_path:
+                raise ValueError("Gridli veri dosya yolu belirtilmemiş")
+            self.weather_data_source = GriddedDataSource(
+                file_path,
+                mask_path=kwargs.get('mask_path'),
+                variable_map=kwargs.get('variable_map'),
+                precipitation_accumulated=kwargs.get('precipitation_accumulated')
+            )
         else:
             raise ValueError(f"Desteklenmeyen veri kaynağı: {source_type}")
     
@@ -355,9 +367,11 @@ class DataService:
         cache_key = f"dam_data_{hash(str(kwargs))}"
         if self._is_cache_valid(cache_key):
             logger.info("Baraj verisi cache'den döndürülüyor")
+            tracer.count("data_cache.hits")
             return self.cache[cache_key]
         
         # Veri çek
+        tracer.count("data_cache.misses")
         data = self.dam_data_source.fetch_data(**kwargs)
         
         # Validasyon
@@ -377,9 +391,11 @@ class DataService:
         cache_key = f"weather_data_{hash(str(kwargs))}"
         if self._is_cache_valid(cache_key):
             logger.info("Meteorolojik veri cache'den döndürülüyor")
+            tracer.count("data_cache.hits")
             return self.cache[cache_key]
         
         # Veri çek
+        tracer.count("data_cache.misses")
         data = self.weather_data_source.fetch_data(**kwargs)
         
         # Validasyon
@@ -0,0 +1,452 @@
+"""
+Kuraklık İndisi Servisi - Standartlaştırılmış yağış (SPI) ve yağış-evapotranspirasyon
+(SPEI) indisleri
+"""
+import os
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+import joblib
+from scipy.special import gammainc, ndtri
+from config.settings import settings
+from models.dam import DroughtLevel
+from services.weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_MONTH = 30.4375
+PROBABILITY_EPSILON = 1e-6
+INDEX_NAMES = ("spi", "spei")
+CDF_KNOTS = 129
+KNOT_MIN_ALPHA = 3.0
+
+def window_days(months: int) -> int:
+    """Ay cinsinden pencereyi günlük birikim penceresine çevir"""
+    return int(round(months * DAYS_PER_MONTH))
+
+def rolling_sums(values: np.ndarray, windows: List[int]) -> np.ndarray:
+    """
+    (seri, gün) matris için tüm pencerelerde kayan toplam
+
+    Kümülatif toplam farkıyla (float64) hesaplanır, sonuç float32 saklanır;
+    penceresi eksik gün içeren veya henüz dolmamış konumlar NaN'dır.
+
+    Returns:
+        np.ndarray: (pencere, seri, gün) float32
+    """
+    n_series, n_days = values.shape
+    valid = np.isfinite(values)
+    cumulative = np.zeros((n_series, n_days + 1))
+    np.cumsum(np.where(valid, values, 0.0), axis=1, out=cumulative[:, 1:])
+    counts = np.zeros((n_series, n_days + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    result = np.full((len(windows), n_series, n_days), np.nan, dtype=np.float32)
+    for w, window in enumerate(windows):
+        if window > n_days:
+            continue
+        sums = cumulative[:, window:] - cumulative[:, :-window]
+        complete = (counts[:, window:] - counts[:, :-window]) == window
+        result[w, :, window - 1:] = np.where(complete, sums, np.nan)
+    return result
+
+def fit_gamma(samples: np.ndarray, min_samples: int) -> Dict[str, np.ndarray]:
+    """
+    Satır başına sıfır şişirilmiş gamma dağılımı (Thom 1958 ML yaklaşımı)
+
+    Args:
+        samples: (seri, örnek) NaN içerebilen birikimler
+
+    Returns:
+        Dict: alpha, beta, zero_prob (seri,); yetersiz veride NaN
+    """
+    valid = np.isfinite(samples)
+    positive = valid & (samples > 0)
+    n_valid = valid.sum(axis=1)
+    n_positive = positive.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        safe = np.where(positive, samples, 1.0)
+        mean = np.where(positive, samples, 0.0).sum(axis=1) / n_positive
+        mean_log = np.log(safe).sum(axis=1) / n_positive
+        a = np.maximum(np.log(mean) - mean_log, 1e-8)
+        alpha = (1 + np.sqrt(1 + 4 * a / 3)) / (4 * a)
+        beta = mean / alpha
+        zero_prob = (n_valid - n_positive) / n_valid
+
+    enough = n_positive >= min_samples
+    return {
+        "alpha": np.where(enough, alpha, np.nan),
+        "beta": np.where(enough, beta, np.nan),
+        "zero_prob": np.where(enough, zero_prob, np.nan)
+    }
+
+def fit_log_logistic(samples: np.ndarray, min_samples: int) -> Dict[str, np.ndarray]:
+    """
+    Satır başına log-lojistik dağılım; L-momentlerle genelleştirilmiş lojistik
+    (Hosking) parametrizasyonu. Yağış - ET0 dengesi yaz aylarında sola çarpık
+    olduğundan iki yönlü çarpıklığı destekleyen bu biçim kullanılır.
+
+    Args:
+        samples: (seri, örnek) NaN içerebilen birikimler
+
+    Returns:
+        Dict: xi (konum), alpha (ölçek), k (şekil) (seri,); yetersiz veride NaN
+    """
+    ordered = np.sort(samples, axis=1)  # NaN'lar sona gider
+    n = np.isfinite(ordered).sum(axis=1)[:, None]
+    rank = np.arange(ordered.shape[1])[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        filled = np.where(rank < n, ordered, 0.0)
+        b0 = filled.sum(axis=1) / n[:, 0]
+        b1 = (rank / (n - 1) * filled).sum(axis=1) / n[:, 0]
+        b2 = (rank * (rank - 1) / ((n - 1) * (n - 2)) * filled).sum(axis=1) / n[:, 0]
+        l2 = 2 * b1 - b0
+        l3 = 6 * b2 - 6 * b1 + b0
+
+        k = -l3 / l2
+        small = np.abs(k) < 1e-6
+        kpi = np.where(small, 1.0, k * np.pi)
+        alpha = np.where(small, l2, l2 * np.sin(kpi) / kpi)
+        xi = np.where(small, b0, b0 - alpha * (1 / np.where(small, 1.0, k) - np.pi / np.sin(kpi)))
+
+    enough = (n[:, 0] >= min_samples) & (l2 > 0) & (np.abs(k) < 1)
+    return {
+        "xi": np.where(enough, xi, np.nan),
+        "alpha": np.where(enough, alpha, np.nan),
+        "k": np.where(enough, k, np.nan)
+    }
+
+def gamma_cdf(values: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """Sıfır şişirilmiş gamma birikimli olasılığı"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scaled = np.maximum(values, 0.0) / params["beta"]
+        return params["zero_prob"] + (1 - params["zero_prob"]) * gammainc(params["alpha"], scaled)
+
+def log_logistic_cdf(values: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """Genelleştirilmiş lojistik birikimli olasılık; destek dışı değerler 0 veya 1"""
+    k = params["k"]
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        scaled = (values - params["xi"]) / params["alpha"]
+        inside = 1 - k * scaled
+        small = np.abs(k) < 1e-6
+        y = np.where(small, scaled, -np.log(np.where(inside > 0, inside, np.nan)) / np.where(small, 1.0, k))
+        probability = 1 / (1 + np.exp(-y))
+    outside = np.isfinite(values) & np.isfinite(k) & ~small & (inside <= 0)
+    return np.where(outside, (k > 0).astype(probability.dtype), probability)
+
+def standardize(probability: np.ndarray) -> np.ndarray:
+    """Birikimli olasılığı standart normal değere çevir"""
+    return ndtri(np.clip(probability, PROBABILITY_EPSILON, 1 - PROBABILITY_EPSILON))
+
+def gamma_standardized(values: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    (seri, gün) birikimlerin standartlaştırılmış gamma indisi; params (seri,)
+
+    Şekil parametresi KNOT_MIN_ALPHA'dan büyük ve gün sayısı düğümlerden fazla
+    olan serilerde CDF yalnızca serinin pozitif değer aralığına yayılan
+    CDF_KNOTS düğümde tam hesaplanır, günler küp kök ölçeğinde doğrusal
+    interpolasyonla değerlendirilir (Wilson-Hilferty: standart normal değer
+    x^(1/3)'e neredeyse doğrusal bağlıdır; hata 1e-3'ün altında). Böylece
+    pahalı gammainc çağrısı gün sayısından bağımsız kalır; diğer seriler tam
+    hesaplanır.
+    """
+    columns = {key: value[:, None] for key, value in params.items()}
+    result = np.full(values.shape, np.nan, dtype=values.dtype)
+    positive = np.isfinite(values) & (values > 0)
+    knotted = (params["alpha"] >= KNOT_MIN_ALPHA) & (positive.sum(axis=1) > 2 * CDF_KNOTS)
+
+    exact = ~knotted
+    if exact.any():
+        result[exact] = standardize(gamma_cdf(values[exact], {key: value[exact] for key, value in columns.items()}))
+    if knotted.any():
+        block = values[knotted]
+        local = {key: value[knotted] for key, value in columns.items()}
+        with np.errstate(invalid="ignore"):
+            roots = np.cbrt(block)
+            low = np.nanmin(np.where(positive[knotted], roots, np.nan), axis=1, keepdims=True)
+            step = (np.nanmax(roots, axis=1, keepdims=True) - low) / (CDF_KNOTS - 1)
+            knots = standardize(gamma_cdf((low + np.arange(CDF_KNOTS, dtype=values.dtype) * step) ** 3, local))
+            position = np.clip((roots - low) / step, 0, CDF_KNOTS - 1)
+        floor = np.minimum(np.floor(np.nan_to_num(position)), CDF_KNOTS - 2)
+        fraction = position - floor
+        lower = floor.astype(np.intp)
+        below = np.take_along_axis(knots, lower, axis=1)
+        interpolated = below + (np.take_along_axis(knots, lower + 1, axis=1) - below) * fraction
+        # Sıfır birikim yalnızca kuru gün olasılığına karşılık gelir
+        dry = np.broadcast_to(standardize(local["zero_prob"]), block.shape)
+        result[knotted] = np.where(block > 0, interpolated, np.where(np.isfinite(block), dry, np.nan))
+    return result
+
+def drought_level_from_index(value: float, thresholds: List[float] = None) -> DroughtLevel:
+    """SPI/SPEI değerinden kuraklık seviyesi (eşikler azalan sırada)"""
+    thresholds = thresholds or settings.model.drought_index_thresholds
+    if value is None or not np.isfinite(value):
+        return DroughtLevel.NORMAL
+    levels = [DroughtLevel.WARNING, DroughtLevel.MODERATE, DroughtLevel.SEVERE, DroughtLevel.CRITICAL]
+    result = DroughtLevel.NORMAL
+    for threshold, level in zip(thresholds, levels):
+        if value <= threshold:
+            result = level
+    return result
+
+class DroughtIndexEngine:
+    """
+    Tüm barajlar ve pencereler için toplu SPI/SPEI hesaplayıcı
+
+    Günlük yağış (SPI) ve yağış - ET0 su dengesi (SPEI) kayan pencerelerle
+    biriktirilir; dağılımlar pencere bitiş gününün takvim ayına göre, tüm
+    (pencere, baraj) serileri için tek seferde uydurulur (SPI: gamma, SPEI:
+    log-lojistik). Uydurulan parametreler ve en uzun pencere kadar geçmiş
+    kuyruk saklanır; update() yalnızca yeni günler için CDF değerlendirir.
+    """
+
+    def __init__(self, windows: List[int] = None, min_samples: int = None,
+                 weather_service: WeatherService = None):
+        self.windows = sorted(windows or settings.model.drought_index_windows)
+        self.min_samples = min_samples if min_samples is not None else settings.model.drought_index_min_samples
+        self.weather_service = weather_service or WeatherService()
+        self.window_days = [window_days(months) for months in self.windows]
+
+        self.dam_names: List[str] = []
+        self.params: Dict[str, Dict[str, np.ndarray]] = {}
+        self.last_date: Optional[pd.Timestamp] = None
+        self._tails: Dict[str, np.ndarray] = {}
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.params)
+
+    @property
+    def index_columns(self) -> List[str]:
+        return [f"{name}_{months}" for name in INDEX_NAMES for months in self.windows]
+
+    def _daily_panels(self, weather_data: pd.DataFrame, dam_names: List[str],
+                      dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+        """(baraj, gün) yağış ve yağış - ET0 matrisleri"""
+        frame = weather_data.copy()
+        frame["date"] = pd.to_datetime(frame["date"]).dt.normalize()
+        try:
+            frame["balance"] = frame["precipitation"] - self.weather_service.calculate_evaporation_estimate(frame)
+        except KeyError as e:
+            logger.warning(f"ET0 için eksik sütun ({e}), SPEI hesaplanamıyor")
+            frame["balance"] = np.nan
+
+        # Aynı (baraj, gün) için birden çok kayıt ortalanır; bincount pivot_table'dan çok daha hızlı
+        codes = pd.Categorical(frame["dam_name"], categories=dam_names).codes.astype(np.int64)
+        days = ((frame["date"] - dates[0]) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        keep = (codes >= 0) & (days >= 0) & (days < len(dates))
+        flat = codes[keep] * len(dates) + days[keep]
+        size = len(dam_names) * len(dates)
+
+        panels = {}
+        for index_name, column in (("spi", "precipitation"), ("spei", "balance")):
+            values = frame[column].to_numpy(dtype=np.float64)[keep]
+            finite = np.isfinite(values)
+            totals = np.bincount(flat[finite], weights=values[finite], minlength=size)
+            counts = np.bincount(flat[finite], minlength=size)
+            with np.errstate(invalid="ignore"):
+                panels[index_name] = (totals / counts).reshape(len(dam_names), len(dates))
+        return panels
+
+    def _evaluate(self, index_name: str, accumulated: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """
+        (pencere, baraj, gün) birikimleri takvim ayı parametreleriyle standartlaştır
+
+        Günler bir kez takvim ayına göre sıralanır ve her ay bitişik bir dilim
+        olarak (float32) değerlendirilir; parametreler gün boyutuna yayılmaz
+        ve uydurulamamış serilerde CDF hiç hesaplanmaz.
+        """
+        n_windows, n_dams, _ = accumulated.shape
+        fitted = {key: value.reshape(n_windows * n_dams, 12) for key, value in self.params[index_name].items()}
+        order = np.argsort(months, kind="stable")
+        bounds = np.searchsorted(months[order], np.arange(13))
+        flat = accumulated.reshape(n_windows * n_dams, -1)[:, order]
+        standardized = np.full(flat.shape, np.nan, dtype=np.float32)
+
+        for month in range(12):
+            start, stop = bounds[month], bounds[month + 1]
+            params = {key: value[:, month].astype(np.float32) for key, value in fitted.items()}
+            rows = np.isfinite(next(iter(params.values())))
+            if start == stop or not rows.any():
+                continue
+            block = flat[rows, start:stop]
+            params = {key: value[rows] for key, value in params.items()}
+            if index_name == "spi":
+                values = gamma_standardized(block, params)
+            else:
+                values = standardize(log_logistic_cdf(block, {key: value[:, None] for key, value in params.items()}))
+            standardized[rows, start:stop] = values
+
+        result = np.empty_like(standardized)
+        result[:, order] = standardized
+        return result.reshape(accumulated.shape)
+
+    def _to_frame(self, values: Dict[str, np.ndarray], dates: pd.DatetimeIndex) -> pd.DataFrame:
+        """(pencere, baraj, gün) indisleri uzun çerçeveye çevir"""
+        n_days = len(dates)
+        frame = pd.DataFrame({
+            "dam_name": np.repeat(self.dam_names, n_days),
+            "date": np.tile(dates.to_numpy(), len(self.dam_names))
+        })
+        for index_name in INDEX_NAMES:
+            for w, months in enumerate(self.windows):
+                frame[f"{index_name}_{months}"] = values[index_name][w].ravel()
+        return frame.dropna(subset=self.index_columns, how="all").reset_index(drop=True)
+
+    def fit(self, weather_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Dağılımları uydur ve tüm geçmiş için indisleri hesapla
+
+        Args:
+            weather_data: WeatherService şemasında günlük meteorolojik veri
+
+        Returns:
+            pd.DataFrame: dam_name, date, spi_<ay>..., spei_<ay>...
+        """
+        if weather_data.empty:
+            return pd.DataFrame()
+
+        dates_all = pd.to_datetime(weather_data["date"]).dt.normalize()
+        dates = pd.date_range(dates_all.min(), dates_all.max(), freq="D")
+        self.dam_names = list(pd.unique(weather_data["dam_name"]))
+        panels = self._daily_panels(weather_data, self.dam_names, dates)
+        months = dates.month.to_numpy() - 1
+
+        values = {}
+        self.params = {}
+        for index_name in INDEX_NAMES:
+            accumulated = rolling_sums(panels[index_name], self.window_days)
+            n_windows, n_dams, _ = accumulated.shape
+            fitter = fit_gamma if index_name == "spi" else fit_log_logistic
+
+            # Takvim ayı başına tüm (pencere, baraj) serileri tek çağrıda
+            fitted: Dict[str, np.ndarray] = {}
+            for month in range(12):
+                samples = accumulated[:, :, months == month].reshape(n_windows * n_dams, -1).astype(np.float64)
+                for key, param in fitter(samples, self.min_samples).items():
+                    fitted.setdefault(key, np.full((n_windows, n_dams, 12), np.nan))
+                    fitted[key][:, :, month] = param.reshape(n_windows, n_dams)
+            self.params[index_name] = fitted
+            values[index_name] = self._evaluate(index_name, accumulated, months)
+
+            # Güncellemeler için en uzun pencere - 1 günlük kuyruk
+            self._tails[index_name] = panels[index_name][:, -(max(self.window_days) - 1):]
+
+        self.last_date = dates[-1]
+        unfitted = np.isnan(self.params["spi"]["alpha"]).mean()
+        if unfitted > 0:
+            logger.warning(f"SPI parametrelerinin %{unfitted * 100:.0f}'i yetersiz veri nedeniyle uydurulamadı")
+        logger.info(f"Kuraklık indisleri hesaplandı: {len(self.dam_names)} baraj, {len(self.windows)} pencere, "
+                    f"{len(dates)} gün")
+        return self._to_frame(values, dates)
+
+    def transform(self, weather_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Saklı parametrelerle verilen dönemin indislerini yeniden uydurmadan hesapla
+
+        Güncelleme kuyruğu değişmez; diskten yüklenen parametrelerle geçmiş
+        tabloyu yeniden üretmek içindir.
+        """
+        if not self.is_fitted:
+            raise ValueError("Kuraklık indisi parametreleri henüz uydurulmadı")
+        if weather_data.empty:
+            return pd.DataFrame()
+
+        dates_all = pd.to_datetime(weather_data["date"]).dt.normalize()
+        dates = pd.date_range(dates_all.min(), dates_all.max(), freq="D")
+        panels = self._daily_panels(weather_data, self.dam_names, dates)
+        months = dates.month.to_numpy() - 1
+        values = {
+            index_name: self._evaluate(index_name, rolling_sums(panels[index_name], self.window_days), months)
+            for index_name in INDEX_NAMES
+        }
+        return self._to_frame(values, dates)
+
+    def update(self, new_weather: pd.DataFrame) -> pd.DataFrame:
+        """
+        Saklı parametrelerle yalnızca yeni günlerin indislerini hesapla
+
+        Args:
+            new_weather: Son hesaplanan günden sonraki meteorolojik veriler
+
+        Returns:
+            pd.DataFrame: Yeni günler için dam_name, date, spi_<ay>..., spei_<ay>...
+        """
+        if not self.is_fitted:
+            raise ValueError("Kuraklık indisi parametreleri henüz uydurulmadı")
+        if new_weather.empty:
+            return pd.DataFrame()
+
+        frame = new_weather.copy()
+        frame["date"] = pd.to_datetime(frame["date"]).dt.normalize()
+        frame = frame[(frame["date"] > self.last_date) & frame["dam_name"].isin(self.dam_names)]
+        if frame.empty:
+            logger.info("Kuraklık indisi için yeni gün yok")
+            return pd.DataFrame()
+
+        dates = pd.date_range(self.last_date + pd.Timedelta(days=1), frame["date"].max(), freq="D")
+        panels = self._daily_panels(frame, self.dam_names, dates)
+        months = dates.month.to_numpy() - 1
+        history = max(self.window_days) - 1
+
+        values = {}
+        for index_name in INDEX_NAMES:
+            extended = np.concatenate([self._tails[index_name], panels[index_name]], axis=1)
+            accumulated = rolling_sums(extended, self.window_days)[:, :, -len(dates):]
+            values[index_name] = self._evaluate(index_name, accumulated, months)
+            self._tails[index_name] = extended[:, -history:]
+
+        self.last_date = dates[-1]
+        return self._to_frame(values, dates)
+
+    def save(self, path: str = None) -> str:
+        """Parametreleri ve kuyruğu atomik olarak diske yaz"""
+        path = path or settings.model.drought_index_cache_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        state = {
+            "windows": self.windows,
+            "min_samples": self.min_samples,
+            "dam_names": self.dam_names,
+            "params": self.params,
+            "last_date": self.last_date,
+            "tails": self._tails
+        }
+        tmp_path = f"{path}.tmp"
+        joblib.dump(state, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = None, windows: List[int] = None) -> Optional["DroughtIndexEngine"]:
+        """Kayıtlı parametreleri yükle; dosya yoksa veya pencereler farklıysa None"""
+        path = path or settings.model.drought_index_cache_path
+        if not os.path.exists(path):
+            return None
+        state = joblib.load(path)
+        engine = cls(windows=state["windows"], min_samples=state["min_samples"])
+        if windows is not None and sorted(windows) != engine.windows:
+            logger.info("Kayıtlı kuraklık indisi pencereleri farklı, yeniden uydurulacak")
+            return None
+        engine.dam_names = state["dam_names"]
+        engine.params = state["params"]
+        engine.last_date = state["last_date"]
+        engine._tails = state["tails"]
+        return engine
+
+    def latest(self, indices: pd.DataFrame, column: str = None) -> Dict[str, Dict]:
+        """Barajların son indis değeri ve buna karşılık gelen kuraklık seviyesi"""
+        column = column or f"spi_{self.windows[min(1, len(self.windows) - 1)]}"
+        if indices.empty or column not in indices.columns:
+            return {}
+        last = indices.dropna(subset=[column]).sort_values("date").groupby("dam_name").tail(1)
+        return {
+            row.dam_name: {
+                "date": row.date,
+                "index": column,
+                "value": float(getattr(row, column)),
+                "drought_level": drought_level_from_index(getattr(row, column)).value
+            }
+            for row in last.itertuples(index=False)
+        }
@@ -0,0 +1,342 @@
+"""
+Özellik Mühendisliği Servisi - settings.model ayarlarına göre lag/hareketli
+ortalama ve meteorolojik birikim özellikleri
+"""
+import hashlib
+import json
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+from config.settings import settings
+from models.dam_registry import normalize_name
+
+logger = logging.getLogger(__name__)
+
+def _grouped_shift(values: np.ndarray, position: np.ndarray, lag: int) -> np.ndarray:
+    """Grup (baraj) sınırlarını aşmadan diziyi lag satır kaydır"""
+    out = np.full(len(values), np.nan)
+    if lag < len(values):
+        out[lag:] = values[:len(values) - lag]
+    out[position < lag] = np.nan
+    return out
+
+def _grouped_rolling_sum(values: np.ndarray, position: np.ndarray,
+                         window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grup içi kayan toplam (kümülatif toplam farkı ile, O(n))
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (toplam, geçerli gözlem sayısı)
+    """
+    finite = np.isfinite(values)
+    cumsum = np.concatenate([[0.0], np.cumsum(np.where(finite, values, 0.0))])
+    cumcount = np.concatenate([[0], np.cumsum(finite)])
+
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    total = cumsum[end] - cumsum[start]
+    count = cumcount[end] - cumcount[start]
+
+    # Pencere grubun başına taşıyorsa değer üretme
+    incomplete = position < window - 1
+    total[incomplete] = np.nan
+    count[incomplete] = 0
+    return total, count
+
+# Global (çok barajlı) modelde özelliklere eklenen statik baraj ortak değişkenleri
+STATIC_FEATURE_COLUMNS = ["capacity_mcm", "latitude", "longitude", "district_code"]
+# İlçe kodlama şeması; değişirse feature_set_hash de değişir, eski modeller yüklenmez
+DISTRICT_ENCODING = "sha256-24"
+
+def district_code(district: str) -> int:
+    """
+    İlçenin kararlı kodu: normalize edilmiş adın SHA-256 özetinin ilk 24 biti
+
+    Kod yüklü kayıttaki diğer ilçelerden bağımsızdır; ilçe eklemek veya
+    bölge kaydıyla çalışmak kayıtlı modellerin ortak değişkenlerini
+    değiştirmez. 24 bit float32'de tam temsil edilir.
+    """
+    digest = hashlib.sha256(normalize_name(district).encode("utf-8")).digest()
+    return int.from_bytes(digest[:3], "big")
+
+def static_dam_features(dam_names: Sequence[str], dam_info: Dict[str, Dict] = None) -> np.ndarray:
+    """
+    Barajların statik ortak değişken matrisi
+
+    İlçe district_code() ile kodlanır. Bilgisi olmayan barajlar, NaN kabul
+    etmeyen modeller bozulmasın diye bilinen barajların ortalamasıyla
+    doldurulur.
+
+    Returns:
+        np.ndarray: (baraj, len(STATIC_FEATURE_COLUMNS)) float32 matris
+    """
+    dam_info = dam_info if dam_info is not None else settings.dam_registry
+
+    def covariates(info: Dict) -> List[float]:
+        return [info["capacity_mcm"], info["latitude"], info["longitude"], district_code(info["district"])]
+
+    matrix = np.empty((len(dam_names), len(STATIC_FEATURE_COLUMNS)), dtype=np.float32)
+    fallback = None
+    for row, dam_name in enumerate(dam_names):
+        info = dam_info.get(dam_name)
+        if info is None:
+            # Ortalama yalnızca bilinmeyen baraj varsa (bir kez) hesaplanır
+            if fallback is None:
+                known = [covariates(info) for info in dam_info.values()]
+                fallback = np.mean(known, axis=0) if known else np.zeros(len(STATIC_FEATURE_COLUMNS))
+            matrix[row] = fallback
+        else:
+            matrix[row] = covariates(info)
+    return matrix
+
+def static_features_for_rows(dam_names: pd.Series) -> np.ndarray:
+    """Satır başına statik ortak değişkenler (her baraj bir kez hesaplanır)"""
+    codes, uniques = pd.factorize(dam_names)
+    return static_dam_features(list(uniques))[codes]
+
+class FeatureEngine:
+    """
+    Birleştirilmiş baraj + meteoroloji verisi için vektörel özellik motoru
+
+    Tüm barajlar tek bir sıralı dizi üzerinde, baraj sınırları konum indeksiyle
+    maskelenerek tek geçişte işlenir. Her baraj önce ilk gününden son gününe
+    günlük takvime açılır; lag ve pencereler satır değil gün sayar, eksik
+    günler NaN olarak pencereye girer.
+    """
+
+    def __init__(self, lag_features: List[int] = None,
+                 moving_average_windows: List[int] = None,
+                 precipitation_windows: List[int] = None,
+                 degree_day_base: float = None,
+                 target_column: str = "fill_ratio"):
+        self.lag_features = sorted(lag_features or settings.model.lag_features)
+        self.moving_average_windows = sorted(moving_average_windows or settings.model.moving_average_windows)
+        self.precipitation_windows = sorted(precipitation_windows or settings.model.precipitation_windows)
+        self.degree_day_base = (degree_day_base if degree_day_base is not None
+                                else settings.model.degree_day_base)
+        self.target_column = target_column
+
+    @property
+    def max_lookback(self) -> int:
+        """Bir satırın özelliklerini hesaplamak için gereken geçmiş gün sayısı"""
+        return max(self.lag_features + self.moving_average_windows + self.precipitation_windows)
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """Üretilen özellik sütunlarının adları (sabit sırada)"""
+        columns = [f"{self.target_column}_lag_{lag}" for lag in self.lag_features]
+        columns += [f"{self.target_column}_ma_{window}" for window in self.moving_average_windows]
+        columns += [f"precipitation_sum_{window}" for window in self.precipitation_windows]
+        columns += [f"degree_days_{window}" for window in self.precipitation_windows]
+        columns += ["temp_mean", "day_of_year_sin", "day_of_year_cos"]
+        return columns
+
+    def feature_set_hash(self) -> str:
+        """Özellik seti tanımının kısa özeti (model sürümlemesi için)"""
+        definition = {
+            "columns": self.feature_columns,
+            "target": self.target_column,
+            "degree_day_base": self.degree_day_base,
+            "static_columns": STATIC_FEATURE_COLUMNS,
+            "district_encoding": DISTRICT_ENCODING
+        }
+        payload = json.dumps(definition, sort_keys=True).encode("utf-8")
+        return hashlib.sha1(payload).hexdigest()[:12]
+
+    def _prepare(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Baraj ve tarihe göre sırala, tarih tipini düzelt"""
+        frame = data.copy()
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.sort_values(["dam_name", "date"], kind="stable").reset_index(drop=True)
+
+    @staticmethod
+    def _calendar(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sıralı satırların günlük baraj takvimindeki yeri
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (satır başına takvim indeksi,
+            takvim günü başına baraj içindeki gün numarası)
+        """
+        codes = pd.factorize(frame["dam_name"])[0]
+        days = frame["date"].dt.normalize()
+        first = days.groupby(codes).transform("min")
+        offset = ((days - first) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        spans = np.maximum.reduceat(offset, starts) + 1
+        base = np.r_[0, np.cumsum(spans)[:-1]]
+        slot = np.repeat(base, np.diff(np.r_[starts, len(codes)])) + offset
+        position = np.arange(spans.sum()) - np.repeat(base, spans)
+        return slot, position
+
+    def _compute(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Sıralı çerçeve için tüm özellik dizilerini (günlük takvim üzerinde) hesapla"""
+        slot, position = self._calendar(frame)
+        features = {}
+
+        def column(name: str) -> np.ndarray:
+            grid = np.full(len(position), np.nan)
+            grid[slot] = frame[name].to_numpy(dtype=np.float64)
+            return grid
+
+        if self.target_column in frame.columns:
+            target = column(self.target_column)
+
+            for lag in self.lag_features:
+                features[f"{self.target_column}_lag_{lag}"] = _grouped_shift(target, position, lag)
+
+            # Hareketli ortalama dünkü değere kadar (hedef sızıntısı olmaması için)
+            lagged = _grouped_shift(target, position, 1)
+            lagged_position = position - 1
+            for window in self.moving_average_windows:
+                total, count = _grouped_rolling_sum(lagged, lagged_position, window)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    features[f"{self.target_column}_ma_{window}"] = np.where(count == window, total / window, np.nan)
+
+        if "precipitation" in frame.columns:
+            precipitation = column("precipitation")
+            for window in self.precipitation_windows:
+                total, count = _grouped_rolling_sum(precipitation, position, window)
+                features[f"precipitation_sum_{window}"] = np.where(count > 0, total, np.nan)
+
+        if "temp_max" in frame.columns and "temp_min" in frame.columns:
+            temp_mean = (column("temp_max") + column("temp_min")) / 2
+            features["temp_mean"] = temp_mean
+
+            degree_days = np.maximum(temp_mean - self.degree_day_base, 0.0)
+            degree_days[np.isnan(temp_mean)] = np.nan
+            for window in self.precipitation_windows:
+                total, count = _grouped_rolling_sum(degree_days, position, window)
+                features[f"degree_days_{window}"] = np.where(count > 0, total, np.nan)
+
+        # Takvimden satırlara geri dön
+        features = {name: values[slot] for name, values in features.items()}
+        day_angle = 2 * np.pi * frame["date"].dt.dayofyear.to_numpy() / 365.25
+        features["day_of_year_sin"] = np.sin(day_angle)
+        features["day_of_year_cos"] = np.cos(day_angle)
+
+        return features
+
+    def latest_features(self, target: np.ndarray, precipitation: np.ndarray,
+                        temp_mean: np.ndarray, dates: np.ndarray,
+                        n_observed: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pencere matrislerinden yalnızca son günün özelliklerini hesapla
+
+        transform ile aynı tanımları kullanır; çok adımlı tahminde her adımda
+        DataFrame kurmadan (baraj x gün) dizileri üzerinde çalışmak içindir.
+
+        Args:
+            target: (baraj, L) hedef geçmişi, son sütun tahmin edilen gün (NaN olabilir)
+            precipitation: (baraj, L) günlük yağış
+            temp_mean: (baraj, L) günlük ortalama sıcaklık
+            dates: (baraj,) son günün tarihleri
+            n_observed: (baraj,) pencerenin sonundaki gerçek (dolgu olmayan) gün
+                sayısı; verilirse eksik pencereler transform'daki gibi NaN olur
+
+        Returns:
+            np.ndarray: (baraj, özellik) float32 matris, feature_columns sırasında
+        """
+        n_dams, length = target.shape
+        if n_observed is None:
+            n_observed = np.full(n_dams, length)
+        columns = []
+
+        for lag in self.lag_features:
+            columns.append(target[:, -1 - lag] if lag < length else np.full(n_dams, np.nan))
+
+        for window in self.moving_average_windows:
+            if window < length:
+                # Herhangi bir gün eksikse NaN (transform'daki count == window koşulu)
+                columns.append(target[:, -1 - window:-1].mean(axis=1))
+            else:
+                columns.append(np.full(n_dams, np.nan))
+
+        for window in self.precipitation_windows:
+            block = precipitation[:, -window:]
+            complete = (n_observed >= window) & np.isfinite(block).any(axis=1)
+            columns.append(np.where(complete, np.nansum(block, axis=1), np.nan))
+
+        degree_days = np.maximum(temp_mean - self.degree_day_base, 0.0)
+        degree_days[np.isnan(temp_mean)] = np.nan
+        for window in self.precipitation_windows:
+            block = degree_days[:, -window:]
+            complete = (n_observed >= window) & np.isfinite(block).any(axis=1)
+            columns.append(np.where(complete, np.nansum(block, axis=1), np.nan))
+
+        columns.append(temp_mean[:, -1])
+        day_angle = 2 * np.pi * pd.DatetimeIndex(dates).dayofyear.to_numpy() / 365.25
+        columns.append(np.sin(day_angle))
+        columns.append(np.cos(day_angle))
+
+        return np.column_stack(columns).astype(np.float32)
+
+    def transform(self, data: pd.DataFrame, start_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Birleştirilmiş veriye özellik sütunlarını ekle
+
+        Args:
+            data: Baraj + meteoroloji birleşik verisi (dam_name, date zorunlu)
+            start_date: Verilirse artımlı mod - yalnızca bu tarihten itibaren
+                satırlar hesaplanır, öncesinden sadece max_lookback gün okunur
+
+        Returns:
+            pd.DataFrame: Orijinal sütunlar + float32 özellik sütunları
+        """
+        if data.empty:
+            return data.copy()
+
+        missing_columns = [col for col in ["dam_name", "date"] if col not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Özellik üretimi için eksik sütunlar: {missing_columns}")
+
+        frame = self._prepare(data)
+
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            is_new = (frame["date"] >= start).to_numpy()
+
+            # Her barajın ilk yeni gününden max_lookback gün geriye git
+            first_new = frame["date"].where(is_new).groupby(frame["dam_name"]).transform("min")
+            needed = (frame["date"].dt.normalize() >= first_new.dt.normalize()
+                      - pd.Timedelta(days=self.max_lookback)).to_numpy()
+            frame = frame[needed].reset_index(drop=True)
+            is_new = is_new[needed]
+        else:
+            is_new = None
+
+        features = self._compute(frame)
+        feature_frame = pd.DataFrame(
+            {name: values.astype(np.float32) for name, values in features.items()},
+            index=frame.index
+        )
+        result = pd.concat([frame.drop(columns=[c for c in feature_frame.columns if c in frame.columns]),
+                            feature_frame], axis=1)
+
+        if is_new is not None:
+            result = result[is_new].reset_index(drop=True)
+
+        log = logger.debug if start_date is not None else logger.info
+        log(f"Özellik üretimi tamamlandı: {len(result)} satır, {len(feature_frame.columns)} özellik")
+        return result
+
+    def update(self, history: pd.DataFrame, new_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Yeni gelen günler için özellikleri artımlı hesapla
+
+        Args:
+            history: Önceki birleşik veri (yalnızca son max_lookback günü kullanılır)
+            new_data: Yeni gelen satırlar
+
+        Returns:
+            pd.DataFrame: Sadece yeni satırların özellikleri
+        """
+        if new_data.empty:
+            return new_data.copy()
+
+        start_date = pd.to_datetime(new_data["date"]).min()
+        history = history[pd.to_datetime(history["date"]) < start_date]
+        combined = pd.concat([history, new_data], ignore_index=True)
+        return self.transform(combined, start_date=start_date)
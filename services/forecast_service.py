@@ -0,0 +1,185 @@
+"""
+Tahmin Servisi - Eğitilmiş modellerle özyinelemeli (recursive) çok günlük doluluk tahmini
+"""
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List
+import logging
+from config.settings import settings
+from services.feature_service import FeatureEngine, static_dam_features
+from services.training_service import GLOBAL_MODEL_KEY
+
+logger = logging.getLogger(__name__)
+
+class ModelForecaster:
+    """
+    Model tabanlı çok adımlı tahmin
+
+    Her barajın son max_lookback günü (baraj x gün) dizilerine alınır; her
+    adımda FeatureEngine.latest_features ile yalnızca yeni günün özellikleri
+    hesaplanır ve tahmin edilen doluluk bir sonraki günün lag değeri olarak
+    pencereye eklenir. Gelecek hava durumu bilinmediğinden son climate_window
+    günün ortalaması kullanılır.
+
+    models içinde GLOBAL_MODEL_KEY varsa kendi modeli olmayan tüm barajlar bu
+    modelle, her adımda tek bir (baraj x özellik + statik) matris çağrısıyla
+    tahmin edilir. Başlangıç özellikleri eksik (NaN) kalan barajlar, modeller
+    yalnızca eksiksiz satırlarla eğitildiği için tahmine alınmaz.
+    """
+
+    def __init__(self, feature_engine: FeatureEngine = None, climate_window: int = 30):
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.climate_window = climate_window
+
+    def _windows(self, history: pd.DataFrame, dam_names: List[str]) -> Dict[str, np.ndarray]:
+        """Her barajın son max_lookback takvim gününü (baraj, L) dizilerine yerleştir"""
+        length = self.feature_engine.max_lookback + 1
+        target = self.feature_engine.target_column
+
+        frame = history[history["dam_name"].isin(dam_names)].copy()
+        frame["date"] = pd.to_datetime(frame["date"]).dt.normalize()
+        frame = frame.sort_values(["dam_name", "date"], kind="stable")
+
+        # Sağa hizala: her barajın son günü L-2 sütununda, L-1 tahmin günü;
+        # sütun tarih farkından gelir, eksik günler NaN kalır
+        grouped = frame.groupby("dam_name", sort=False)["date"]
+        last_date = grouped.transform("max")
+        cols = length - 2 - ((last_date - frame["date"]) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        inside = cols >= 0
+        frame, cols = frame[inside], cols[inside]
+
+        dam_index = {name: i for i, name in enumerate(dam_names)}
+        rows = frame["dam_name"].map(dam_index).to_numpy()
+
+        def to_window(values: np.ndarray) -> np.ndarray:
+            window = np.full((len(dam_names), length), np.nan)
+            window[rows, cols] = values
+            return window
+
+        def column(name: str) -> np.ndarray:
+            if name in frame.columns:
+                return frame[name].to_numpy(dtype=np.float64)
+            return np.full(len(frame), np.nan)
+
+        # İlk gözlemden bu yana geçen gün sayısı, pencereyle sınırlı (transform'daki takvim konumu)
+        first, last = grouped.min().reindex(dam_names), grouped.max().reindex(dam_names)
+        span = ((last - first) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64) + 1
+        return {
+            "target": to_window(column(target)),
+            "precipitation": to_window(column("precipitation")),
+            "temp_mean": to_window((column("temp_max") + column("temp_min")) / 2),
+            "last_date": last.to_numpy(),
+            "n_observed": np.minimum(span, length - 1)
+        }
+
+    def _step_features(self, target: np.ndarray, precipitation: np.ndarray, temp_mean: np.ndarray,
+                       last_dates: pd.DatetimeIndex, n_observed: np.ndarray, step: int) -> np.ndarray:
+        """
+        Pencerelerin son (tahmin) sütununu hazırla ve o günün özellik matrisini hesapla
+
+        Gelecek gün için iklimsel değer kullanılır: pencerenin son
+        climate_window gününün ortalaması. Diziler yerinde değiştirilir.
+        """
+        with np.errstate(invalid="ignore"):
+            precipitation[:, -1] = np.nanmean(precipitation[:, -1 - self.climate_window:-1], axis=1)
+            temp_mean[:, -1] = np.nanmean(temp_mean[:, -1 - self.climate_window:-1], axis=1)
+        target[:, -1] = np.nan
+
+        step_dates = last_dates + pd.Timedelta(days=step + 1)
+        return self.feature_engine.latest_features(target, precipitation, temp_mean, step_dates,
+                                                   n_observed=np.minimum(n_observed + step + 1, target.shape[1]))
+
+    def forecast_matrix(self, models: Dict[str, Any], history: pd.DataFrame,
+                        days_ahead: int = None, dam_names: List[str] = None) -> Dict[str, Any]:
+        """
+        Tüm barajların tahmin yollarını (baraj, ufuk) matrisi olarak üret
+
+        Args:
+            models: baraj adı (veya GLOBAL_MODEL_KEY) -> predict() destekleyen model
+            history: Birleşik baraj + meteoroloji verisi
+            days_ahead: Tahmin ufku (gün)
+            dam_names: Tahmin edilecek barajlar (varsayılan: modeli olan / global modelde tümü)
+
+        Returns:
+            Dict: dam_names, dates (baraj, ufuk), fill_ratio (baraj, ufuk)
+        """
+        if days_ahead is None:
+            days_ahead = settings.model.prediction_days
+
+        global_model = models.get(GLOBAL_MODEL_KEY)
+        available = set(history["dam_name"])
+        candidates = dam_names if dam_names is not None else pd.unique(history["dam_name"])
+        dam_names = [name for name in candidates
+                     if name in available and (name in models or global_model is not None)]
+        if not dam_names:
+            return {"dam_names": [], "dates": np.empty((0, days_ahead)), "fill_ratio": np.empty((0, days_ahead))}
+
+        windows = self._windows(history, dam_names)
+        target = windows["target"]
+        precipitation = windows["precipitation"]
+        temp_mean = windows["temp_mean"]
+        last_dates = pd.DatetimeIndex(windows["last_date"])
+        n_observed = windows["n_observed"]
+
+        # Modeller eksiksiz özellikli satırlarla eğitildi; geçmişi en uzun
+        # pencereden kısa ya da boşluklu barajlar modelle tahmin edilmez
+        # (çağıran sezgisel tahmine döner)
+        probe = self._step_features(target.copy(), precipitation.copy(), temp_mean.copy(),
+                                    last_dates, n_observed, 0)
+        complete = ~np.isnan(probe).any(axis=1)
+        if not complete.all():
+            skipped = [name for name, ok in zip(dam_names, complete) if not ok]
+            logger.warning(f"Eksik özellikli barajlar model tahmininden çıkarıldı: {', '.join(skipped)}")
+            dam_names = [name for name, ok in zip(dam_names, complete) if ok]
+            target, precipitation, temp_mean = target[complete], precipitation[complete], temp_mean[complete]
+            last_dates, n_observed = last_dates[complete], n_observed[complete]
+            if not dam_names:
+                return {"dam_names": [], "dates": np.empty((0, days_ahead)),
+                        "fill_ratio": np.empty((0, days_ahead))}
+
+        own_models = [(i, models[name]) for i, name in enumerate(dam_names) if name in models]
+        uses_global = np.array([name not in models for name in dam_names])
+        static = static_dam_features([name for name in dam_names if name not in models]) \
+            if uses_global.any() else None
+
+        paths = np.empty((len(dam_names), days_ahead))
+        for step in range(days_ahead):
+            X = self._step_features(target, precipitation, temp_mean, last_dates, n_observed, step)
+
+            if static is not None:
+                paths[uses_global, step] = global_model.predict(np.hstack([X[uses_global], static]))
+            for i, model in own_models:
+                paths[i, step] = model.predict(X[i:i + 1])[0]
+            paths[:, step] = np.clip(paths[:, step], 0.0, 1.0)
+
+            # Tahmini pencereye yaz ve pencereyi bir gün kaydır
+            target[:, -1] = paths[:, step]
+            target = np.roll(target, -1, axis=1)
+            precipitation = np.roll(precipitation, -1, axis=1)
+            temp_mean = np.roll(temp_mean, -1, axis=1)
+
+        dates = np.array([last_dates + pd.Timedelta(days=step + 1) for step in range(days_ahead)]).T
+        return {"dam_names": dam_names, "dates": dates, "fill_ratio": paths}
+
+    def forecast(self, models: Dict[str, Any], history: pd.DataFrame,
+                 days_ahead: int = None, dam_names: List[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Barajlar için model tabanlı doluluk oranı yolu üret
+
+        Args:
+            models: baraj adı (veya GLOBAL_MODEL_KEY) -> predict() destekleyen model
+            history: Birleşik baraj + meteoroloji verisi
+            days_ahead: Tahmin ufku (gün)
+            dam_names: Tahmin edilecek barajlar
+
+        Returns:
+            Dict[str, pd.DataFrame]: baraj -> (date, predicted_fill_ratio)
+        """
+        result = self.forecast_matrix(models, history, days_ahead, dam_names)
+        return {
+            name: pd.DataFrame({
+                "date": pd.DatetimeIndex(result["dates"][i]),
+                "predicted_fill_ratio": result["fill_ratio"][i]
+            })
+            for i, name in enumerate(result["dam_names"])
+        }
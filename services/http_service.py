@@ -0,0 +1,376 @@
+"""
+HTTP Sorgu Servisi - Önceden hesaplanmış bellek içi anlık görüntüden yerel
+asyncio HTTP servisi (standart kütüphane; orjson varsa JSON kodlama için)
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import logging
+import pandas as pd
+from config.settings import settings
+from services.instrumentation import tracer
+from services.results_writer import encode_json
+from services.push_service import PushBroker, Subscriber, dam_states
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+MAX_HEADER_BYTES = 16384
+
+def parse_request_head(head: bytes) -> Tuple[str, str, str, Dict[str, str], int]:
+    """
+    İstek satırını ve başlıkları ayrıştır
+
+    Returns:
+        Tuple: method, target, version, headers (küçük harf adlar), gövde uzunluğu
+
+    Raises:
+        ValueError: İstek satırı veya Content-Length geçersizse
+    """
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise ValueError("Geçersiz istek satırı") from None
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise ValueError("Geçersiz Content-Length") from None
+    if length < 0:
+        raise ValueError("Geçersiz Content-Length")
+    return method, target, version, headers, length
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Bir yenilemenin değişmez sonucu
+
+    Sabit uç noktaların yanıtları oluşturulurken JSON'a kodlanır; okuma
+    isteği yalnızca sözlük erişimi ve soket yazımıdır. Parametreli sorguların
+    sonuçları anlık görüntüye bağlı küçük bir LRU'da tutulur.
+    """
+    version: int
+    data_version: str
+    created_at: datetime
+    responses: Dict[str, bytes]
+    history: Dict[str, pd.DataFrame]
+    dam_states: Dict[str, Dict] = field(default_factory=dict, compare=False)
+    computed: "OrderedDict[str, bytes]" = field(default_factory=OrderedDict, compare=False)
+
+def build_snapshot(app, version: int) -> Snapshot:
+    """
+    Uygulama durumundan anlık görüntü oluştur
+
+    Args:
+        app: IzmirDamPredictionApp (veya aynı arayüzde nesne)
+        version: Artan anlık görüntü numarası
+    """
+    from services.model_registry import compute_data_version
+
+    started = time.perf_counter()
+    analysis = app.analyze_dams()
+    predictions = app.predict_future_levels()
+    alerts = app.generate_alerts()
+    created_at = datetime.now()
+    data_version = compute_data_version(app.combined_data)
+
+    dams = {dam.name: dam for dam in app.dam_manager.get_all_dams()}
+    summaries = {name: dam.get_summary() for name, dam in dams.items()}
+    meta = {"snapshot_version": version, "data_version": data_version, "created_at": created_at,
+            "last_refresh_at": getattr(app, "last_refresh_at", None)}
+
+    responses = {
+        "/health": encode_json({"status": "ok", **meta}),
+        "/status": encode_json({**meta, "overall_status": analysis.get("overall_status", {})}),
+        "/dams": encode_json({**meta, "dams": summaries}),
+        "/predictions": encode_json({**meta, "predictions": predictions}),
+        "/alerts": encode_json({**meta, "alerts": alerts})
+    }
+    for name in dams:
+        responses[f"/dams/{name}"] = encode_json({**meta, "dam": summaries[name],
+                                                  "analysis": analysis.get(name, {})})
+        responses[f"/predictions/{name}"] = encode_json({**meta, "dam_name": name,
+                                                         "predictions": predictions.get(name, [])})
+        dam_alerts = [alert for alert in alerts if alert.get("dam_name") == name]
+        responses[f"/alerts/{name}"] = encode_json({**meta, "dam_name": name, "alerts": dam_alerts})
+
+    history = {name: dam.to_dataframe() for name, dam in dams.items()}
+    states = dam_states(analysis, predictions, getattr(app, "interval_predictions", None))
+    logger.info(f"Anlık görüntü {version} oluşturuldu ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    return Snapshot(version, data_version, created_at, responses, history, states)
+
+class DamQueryService:
+    """
+    Yerel, uzun süre çalışan asyncio HTTP servisi
+
+    Okuma sorguları o anki anlık görüntüden yanıtlanır. Yenileme ağır işi
+    iş parçacığı havuzunda yapar ve bitince yeni anlık görüntüyü tek
+    referans atamasıyla yerine koyar; süren istekler eski görüntüyü
+    tamamlar. Aynı anda gelen özdeş istekler (aynı yöntem, yol, sorgu ve
+    anlık görüntü) tek hesaplamayı paylaşır.
+
+    Uç noktalar:
+        GET  /health, /status, /dams, /dams/<ad>, /predictions, /predictions/<ad>,
+             /alerts, /alerts/<ad>, /dams/<ad>/history?days=N
+        GET  /metrics — aşama süreleri ve sayaçlar (anlık görüntüden bağımsız)
+        POST /refresh
+        GET  /events (SSE), /ws (WebSocket) — ?dams=A,B&events=drought_level,trend,
+             breach_probability,alert; yenilemede değişen durumlar ve uyarı olayları itilir
+    """
+
+    def __init__(self, app, host: str = None, port: int = None,
+                 loader: Optional[Callable[[Any], None]] = None, history_cache_size: int = None):
+        """
+        Args:
+            app: IzmirDamPredictionApp
+            host, port: Dinlenecek adres (varsayılan yalnızca yerel)
+            loader: Yenilemede anlık görüntüden önce çağrılır (ör. verileri yeniden yükle)
+            history_cache_size: Anlık görüntü başına saklanan parametreli yanıt sayısı
+        """
+        self.app = app
+        self.host = host or settings.api.service_host
+        self.port = port if port is not None else settings.api.service_port
+        self.loader = loader
+        self.history_cache_size = history_cache_size or settings.api.service_cache_size
+
+        self.snapshot: Optional[Snapshot] = None
+        self._version = 0
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.stats = {"requests": 0, "coalesced": 0, "refreshes": 0}
+        self.broker = PushBroker()
+        alert_engine = getattr(app, "alert_engine", None)
+        if alert_engine is not None:
+            alert_engine.subscribe(self.broker.publish_alert)
+
+    # -- Anlık görüntü yönetimi -------------------------------------------
+
+    def _rebuild(self) -> Snapshot:
+        """İş parçacığında çalışır: veriyi yükle ve yeni görüntüyü oluştur"""
+        if self.loader is not None:
+            self.loader(self.app)
+        return build_snapshot(self.app, self._version + 1)
+
+    async def refresh(self) -> Snapshot:
+        """Yeni anlık görüntü oluştur ve atomik olarak değiştir (eşzamanlı çağrılar birleşir)"""
+        async def rebuild():
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, self._rebuild)
+            previous, self.snapshot = self.snapshot, snapshot
+            self._version = snapshot.version
+            self.stats["refreshes"] += 1
+            if previous is not None:
+                self.broker.publish_changes(previous.dam_states, snapshot.dam_states, snapshot.version)
+            return snapshot
+
+        self.broker.bind(asyncio.get_running_loop())
+        return await self._coalesce(("POST", "/refresh"), rebuild)
+
+    async def _coalesce(self, key: Tuple, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Aynı anahtarla süren bir hesaplama varsa onun sonucunu bekle"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    # -- İstek işleme -----------------------------------------------------
+
+    def _history(self, snapshot: Snapshot, dam_name: str, days: Optional[int]) -> bytes:
+        history = snapshot.history[dam_name]
+        if days is not None and not history.empty:
+            history = history.tail(days)
+        records = history.to_dict(orient="records")
+        return encode_json({"snapshot_version": snapshot.version, "dam_name": dam_name, "history": records})
+
+    async def handle(self, method: str, target: str) -> Tuple[int, bytes]:
+        """
+        Tek isteği yanıtla
+
+        Returns:
+            Tuple[int, bytes]: HTTP durum kodu ve JSON gövde
+        """
+        self.stats["requests"] += 1
+        parts = urlsplit(target)
+        path = unquote(parts.path).rstrip("/") or "/"
+
+        if method == "POST" and path == "/refresh":
+            snapshot = await self.refresh()
+            return 200, encode_json({"snapshot_version": snapshot.version, "data_version": snapshot.data_version})
+        if method != "GET":
+            return 405, encode_json({"error": f"Desteklenmeyen yöntem: {method}"})
+        if path == "/metrics":
+            return 200, encode_json(tracer.summary())
+
+        snapshot = self.snapshot  # istek boyunca tek görüntü kullanılır
+        if snapshot is None:
+            return 503, encode_json({"error": "Anlık görüntü henüz hazır değil"})
+
+        body = snapshot.responses.get(path)
+        if body is not None:
+            return 200, body
+
+        segments = path.strip("/").split("/")
+        if len(segments) >= 2 and segments[0] in ("dams", "predictions", "alerts"):
+            # Takma adla (ör. "TAHTALI BARAJI") gelen istekler kanonik ada yönlendirilir
+            canonical = settings.dam_registry.resolve(segments[1])
+            if canonical is not None and canonical != segments[1]:
+                segments[1] = canonical
+                path = "/" + "/".join(segments)
+                body = snapshot.responses.get(path)
+                if body is not None:
+                    return 200, body
+        if len(segments) == 3 and segments[0] == "dams" and segments[2] == "history":
+            dam_name = segments[1]
+            if dam_name not in snapshot.history:
+                return 404, encode_json({"error": f"Baraj bulunamadı: {dam_name}"})
+            query = parse_qs(parts.query)
+            try:
+                days = int(query["days"][0]) if "days" in query else None
+            except ValueError:
+                return 400, encode_json({"error": "days tamsayı olmalı"})
+            if days is not None and days < 0:
+                return 400, encode_json({"error": "days negatif olamaz"})
+
+            cache_key = f"{path}?days={days}"
+            cached = snapshot.computed.get(cache_key)
+            if cached is not None:
+                snapshot.computed.move_to_end(cache_key)
+                return 200, cached
+
+            async def compute():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self._history, snapshot, dam_name, days)
+
+            body = await self._coalesce(("GET", snapshot.version, cache_key), compute)
+            snapshot.computed[cache_key] = body
+            while len(snapshot.computed) > self.history_cache_size:
+                snapshot.computed.popitem(last=False)
+            return 200, body
+
+        return 404, encode_json({"error": f"Bilinmeyen yol: {path}"})
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """HTTP/1.1 bağlantısı; keep-alive desteklenir"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+
+                try:
+                    method, target, version, headers, length = parse_request_head(head)
+                except ValueError as e:
+                    # Gövde sınırı bilinmediğinden bağlantı kapatılır
+                    status, body, keep_alive = 400, encode_json({"error": str(e)}), False
+                else:
+                    if length:
+                        await reader.readexactly(length)
+                    path, _, query = target.partition("?")
+                    if method.upper() == "GET" and path in ("/events", "/ws"):
+                        stream = self.broker.stream_sse if path == "/events" else self.broker.stream_websocket
+                        initial = self.snapshot.dam_states if self.snapshot is not None else None
+                        await stream(reader, writer, query, headers, initial)
+                        break
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                    try:
+                        status, body = await self.handle(method.upper(), target)
+                    except Exception as e:
+                        logger.error(f"İstek işlenemedi ({method} {target}): {e}")
+                        status, body = 500, encode_json({"error": "Sunucu hatası"})
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    # -- Yaşam döngüsü ----------------------------------------------------
+
+    async def start(self) -> None:
+        """İlk anlık görüntüyü oluştur ve dinlemeye başla"""
+        if self.snapshot is None:
+            await self.refresh()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Sorgu servisi dinliyor: http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Dinlemeyi bırak, açık bağlantıları kapat ve işleyicilerin bitmesini bekle"""
+        if self._server is None:
+            return
+        self._server.close()
+        for subscriber in list(self.broker.subscribers.values()):
+            self.broker.unsubscribe(subscriber)
+        tasks = list(self._connections)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+class LocalClient:
+    """
+    Süreç içi test istemcisi: servisin handle() metodunu soketsiz çağırır
+
+    Dönen gövde JSON olarak çözülür.
+    """
+
+    def __init__(self, service: DamQueryService):
+        self.service = service
+
+    async def get(self, target: str) -> Tuple[int, Any]:
+        status, body = await self.service.handle("GET", target)
+        return status, json.loads(body)
+
+    async def post(self, target: str) -> Tuple[int, Any]:
+        status, body = await self.service.handle("POST", target)
+        return status, json.loads(body)
+
+    def subscribe(self, dams: List[str] = None, events: List[str] = None) -> Subscriber:
+        """Soketsiz abone; olaylar await subscriber.next() ile alınır"""
+        return self.service.broker.subscribe(dams, events)
+
+def run_service(app, host: str = None, port: int = None, loader: Callable = None) -> None:
+    """Servisi mevcut iş parçacığında çalıştır (Ctrl+C ile durur)"""
+    service = DamQueryService(app, host=host, port=port, loader=loader)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Sorgu servisi durduruldu")
@@ -0,0 +1,260 @@
+"""
+Enstrümantasyon - İç içe aşama zaman aralıkları, sayaçlar, isteğe bağlı
+cProfile/tracemalloc profili ve JSON iz (Chrome trace) dışa aktarımı
+"""
+import os
+import json
+import time
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class Tracer:
+    """
+    Süreç içi hafif iz toplayıcı
+
+    span() iç içe zaman aralıkları üretir (iş parçacığı başına yığın);
+    biten her aralık ad bazında toplanır (adet, toplam, en uzun) ve olay
+    tamponuna (en fazla max_spans) eklenir. count() adlandırılmış sayaçları
+    artırır. Ayarlar ilk kullanımda settings.logging'den okunur; kapalıyken
+    span() yalnızca bir bayrak kontrolü yapar.
+    """
+
+    def __init__(self, enabled: bool = None, max_spans: int = None):
+        self._enabled = enabled
+        self._max_spans = max_spans
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiler = None
+        self._memory: Optional[Dict[str, Any]] = None
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = settings.logging.instrumentation_enabled
+        return self._enabled
+
+    def configure(self, enabled: bool = None, max_spans: int = None) -> None:
+        """Ayarları değiştir (None verilenler ayarlardan yeniden okunur)"""
+        self._enabled = enabled
+        self._max_spans = max_spans
+        self.reset()
+
+    def reset(self) -> None:
+        """Toplanan aralık ve sayaçları sıfırla"""
+        with self._lock:
+            self.origin = time.perf_counter()
+            self.started_at = datetime.now()
+            # Tampon ilk kayıtta oluşturulur; import anında ayarlar okunmaz
+            self.events: Optional[deque] = None
+            self.aggregates: Dict[str, List[float]] = {}
+            self.counters: Dict[str, float] = {}
+            self.dropped = 0
+
+    # -- Aralıklar ve sayaçlar --------------------------------------------
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """
+        Zaman aralığı
+
+        Args:
+            name: Aralık adı (ör. "load_dam_data", "analyze_dam")
+            **attrs: İz olayına eklenecek öznitelikler (ör. dam="Tahtalı")
+        """
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            self._record(name, start, duration, len(stack), attrs)
+
+    def _record(self, name: str, start: float, duration: float, depth: int, attrs: Dict) -> None:
+        with self._lock:
+            if self.events is None:
+                self.events = deque(maxlen=self._max_spans or settings.logging.trace_max_spans)
+            aggregate = self.aggregates.get(name)
+            if aggregate is None:
+                self.aggregates[name] = [1, duration, duration]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += duration
+                if duration > aggregate[2]:
+                    aggregate[2] = duration
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append((name, start - self.origin, duration, depth, threading.get_ident(), attrs))
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Sayacı artır (ör. "rows.dam", "http.requests", "stage_cache.hits")"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # -- Profil -----------------------------------------------------------
+
+    def start_profiling(self, cpu: bool = None, memory: bool = None) -> None:
+        """Ayarlarda açıksa cProfile ve/veya tracemalloc profilini başlat"""
+        cpu = settings.logging.profile_cpu if cpu is None else cpu
+        memory = settings.logging.profile_memory if memory is None else memory
+        if cpu and self._profiler is None:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def stop_profiling(self, output: str = None, top: int = None) -> None:
+        """Profili durdur; CPU profili pstats dosyasına, bellek özeti summary()'ye yazılır"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            output = output or settings.logging.profile_output
+            directory = os.path.dirname(output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._profiler.dump_stats(output)
+            self._profiler = None
+            logger.info(f"CPU profili yazıldı: {output} (python -m pstats {output})")
+
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics("lineno")
+            tracemalloc.stop()
+            self._memory = {
+                "current_mb": round(current / 1e6, 3),
+                "peak_mb": round(peak / 1e6, 3),
+                "top_allocations": [
+                    {"location": str(stat.traceback[0]), "size_mb": round(stat.size / 1e6, 3), "count": stat.count}
+                    for stat in statistics[:top or settings.logging.profile_memory_top]
+                ]
+            }
+
+    # -- Dışa aktarım -----------------------------------------------------
+
+    def summary(self, top: int = None) -> Dict[str, Any]:
+        """
+        Toplu özet
+
+        Returns:
+            Dict: spans (ad -> adet, toplam/ortalama/en uzun süre; toplam
+            süreye göre azalan), counters, isteğe bağlı memory
+        """
+        with self._lock:
+            aggregates = sorted(self.aggregates.items(), key=lambda item: -item[1][1])
+            counters = dict(sorted(self.counters.items()))
+            dropped = self.dropped
+        spans = {
+            name: {"count": int(n), "total_seconds": round(total, 6),
+                   "mean_seconds": round(total / n, 6), "max_seconds": round(longest, 6)}
+            for name, (n, total, longest) in aggregates[:top]
+        }
+        result = {"started_at": self.started_at.isoformat(),
+                  "uptime_seconds": round(time.perf_counter() - self.origin, 3),
+                  "spans": spans, "counters": counters, "dropped_spans": dropped}
+        if self._memory is not None:
+            result["memory"] = self._memory
+        return result
+
+    def export_trace(self, path: str) -> str:
+        """
+        Aralıkları Chrome trace biçiminde (chrome://tracing, Perfetto) atomik yaz
+
+        Returns:
+            str: Yazılan dosya yolu
+        """
+        with self._lock:
+            events = list(self.events or [])
+        pid = os.getpid()
+        trace_events = [
+            {"name": name, "ph": "X", "ts": round(start * 1e6, 1), "dur": round(duration * 1e6, 1),
+             "pid": pid, "tid": tid, "args": {"depth": depth, **attrs}}
+            for name, start, duration, depth, tid, attrs in events
+        ]
+        payload = {"traceEvents": trace_events, "displayTimeUnit": "ms", "metadata": self.summary()}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def finish(self, trace_file: str = None, top: int = 5) -> Optional[str]:
+        """
+        Giriş noktası sonu: profili durdur, en uzun aşamaları logla ve
+        ayarlanmışsa iz dosyasını yaz
+
+        Returns:
+            Yazılan iz dosyası yolu (yoksa None)
+        """
+        self.stop_profiling()
+        if not self.enabled:
+            return None
+        summary = self.summary(top=top)
+        if summary["spans"]:
+            hot_spots = ", ".join(f"{name} {stats['total_seconds']:.2f}s" for name, stats in summary["spans"].items())
+            logger.info(f"En uzun aşamalar: {hot_spots}")
+        trace_file = trace_file or settings.logging.trace_file
+        if trace_file:
+            self.export_trace(trace_file)
+            logger.info(f"İz dosyası yazıldı: {trace_file}")
+            return trace_file
+        return None
+
+# Süreç genelinde paylaşılan iz toplayıcı
+tracer = Tracer()
+
+@contextmanager
+def instrumented_run() -> Iterator[Tracer]:
+    """Giriş noktası sarmalayıcısı: ayarlara göre profili başlatır, çıkışta finish() çağırır"""
+    tracer.start_profiling()
+    try:
+        yield tracer
+    finally:
+        tracer.finish()
+
+def traced(name: str = None) -> Callable:
+    """Fonksiyonu adlandırılmış zaman aralığıyla sar (varsayılan ad: fonksiyon adı)"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count_http_response(response, *args, **kwargs) -> None:
+    """requests yanıt kancası: HTTP çağrı ve hata sayaçları"""
+    tracer.count("http.requests")
+    tracer.count("http.seconds", response.elapsed.total_seconds())
+    if response.status_code >= 400:
+        tracer.count("http.errors")
+
+def instrument_session(session):
+    """requests.Session'ın tüm yanıtlarını HTTP sayaçlarına bağla"""
+    session.hooks["response"].append(count_http_response)
+    return session
@@ -6,10 +6,11 @@ import requests
 import json
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import time
 from config.settings import settings
+from services.instrumentation import instrument_session
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,7 @@ class IZSUAPIService:
     
     def __init__(self):
         self.base_url = settings.api.izsu_base_url
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session())
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -89,7 +90,9 @@ class IZSUAPIService:
                     cells = row.find_all(['td', 'th'])
                     if len(cells) >= 4:  # En az 4 sütun olmalı
                         try:
-                            dam_name = cells[0].get_text(strip=True)
+                            # Sayfadaki yazım (ör. "TAHTALI BARAJI") kayıttaki kanonik ada çevrilir
+                            page_name = cells[0].get_text(strip=True)
+                            dam_name = settings.dam_registry.resolve(page_name) or page_name
                             current_volume = float(cells[1].get_text(strip=True).replace(',', '.'))
                             total_capacity = float(cells[2].get_text(strip=True).replace(',', '.'))
                             fill_ratio = current_volume / total_capacity if total_capacity > 0 else 0
@@ -167,42 +170,11 @@ class IZSUAPIService:
             days: Kaç günlük veri
             
         Returns:
-            pd.DataFrame: Örnek baraj verileri
+            pd.DataFrame: Örnek baraj verileri (kayıttaki tüm barajlar)
         """
-        import numpy as np
-        
-        dams = settings.get_all_dam_names()
-        dam_data = []
-        
-        for i in range(days):
-            date = datetime.now() - timedelta(days=i)
-            
-            for dam_name in dams:
-                dam_info = settings.get_dam_info(dam_name)
-                if not dam_info:
-                    continue
-                
-                # Gerçekçi doluluk oranları
-                base_ratio = 0.6 + np.random.normal(0, 0.1)
-                base_ratio = max(0.1, min(0.95, base_ratio))
-                
-                # Mevsimsel etki
-                seasonal_effect = 0.1 * np.sin(2 * np.pi * i / 365)
-                base_ratio += seasonal_effect
-                base_ratio = max(0.05, min(0.98, base_ratio))
-                
-                dam_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'dam_name': dam_name,
-                    'current_volume_mcm': dam_info['capacity_mcm'] * base_ratio,
-                    'total_capacity_mcm': dam_info['capacity_mcm'],
-                    'fill_ratio': base_ratio,
-                    'inflow_mcm': np.random.uniform(1.0, 3.0),
-                    'outflow_mcm': np.random.uniform(1.0, 2.5),
-                    'evaporation_mcm': np.random.uniform(0.1, 0.5)
-                })
-        
-        return pd.DataFrame(dam_data)
+        from services.synthetic_data import shared_sample_panel
+
+        return shared_sample_panel(days)[0]
     
     def get_dam_status(self, dam_name: str) -> Optional[Dict]:
         """
@@ -0,0 +1,273 @@
+"""
+Model Deposu - Eğitilmiş modellerin sürümlü, bellek eşlemeli (mmap) saklanması
+"""
+import os
+import json
+import hashlib
+import time
+import pandas as pd
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+
+def compute_data_version(data: pd.DataFrame) -> str:
+    """
+    Eğitim verisinin sürüm özeti
+
+    Satır içerikleri hash'lenir; aynı veriyle tekrar eğitim aynı sürümü üretir.
+    """
+    if data.empty:
+        return "empty"
+    row_hashes = pd.util.hash_pandas_object(data.reset_index(drop=True), index=False).to_numpy()
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:12]
+
+def _safe_name(name: str) -> str:
+    """Dosya sistemi için güvenli dizin adı"""
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+
+@dataclass
+class ModelArtifact:
+    """Depodaki bir model sürümünün metadata bilgisi"""
+    dam_name: str
+    model_type: str
+    feature_set_hash: str
+    data_version: str
+    feature_columns: List[str]
+    path: str
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    metrics: Dict[str, float] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        """Sürüm anahtarı"""
+        return f"{self.dam_name}/{self.model_type}/{self.feature_set_hash}/{self.data_version}"
+
+@dataclass
+class LoadedModel:
+    """Belleğe yüklenmiş model ve metadata'sı"""
+    artifact: ModelArtifact
+    model: Any
+    load_seconds: float
+
+class ModelRegistry:
+    """
+    Sürümlü model deposu
+
+    Modeller joblib ile sıkıştırmasız yazılır; yüklemede mmap_mode='r'
+    kullanıldığı için büyük numpy dizileri (ağaç düğümleri vb.) kopyalanmaz,
+    aynı dosyayı açan işçi süreçler işletim sistemi sayfalarını paylaşır.
+    Yüklenen modeller küçük bir LRU önbellekte tutulur.
+    """
+
+    def __init__(self, root: Optional[str] = None, cache_size: Optional[int] = None):
+        self.root = Path(root or settings.model.model_registry_dir)
+        self.cache_size = cache_size if cache_size is not None else settings.model.model_cache_size
+        self._cache: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._index: Optional[Dict[str, Dict]] = None
+        self._index_mtime: Optional[float] = None
+
+    # Index yönetimi
+    def _index_path(self) -> Path:
+        return self.root / INDEX_FILE
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Index dosyasını oku (değişmediyse bellekteki kopyayı kullan)"""
+        path = self._index_path()
+        if not path.exists():
+            self._index, self._index_mtime = {}, None
+            return self._index
+
+        mtime = path.stat().st_mtime
+        if self._index is None or mtime != self._index_mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+
+    def _write_index(self, index: Dict[str, Dict]) -> None:
+        """Index'i atomik olarak yaz"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path().with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._index_path())
+        self._index = index
+        self._index_mtime = self._index_path().stat().st_mtime
+
+    # Kaydetme
+    def save(self, dam_name: str, model_type: str, model: Any, feature_columns: List[str],
+             feature_set_hash: str, data_version: str, metrics: Dict[str, float] = None,
+             extra: Dict[str, Any] = None) -> ModelArtifact:
+        """
+        Modeli depoya yeni bir sürüm olarak kaydet
+
+        Returns:
+            ModelArtifact: Kaydedilen sürümün metadata'sı
+        """
+        import joblib
+
+        version_dir = (self.root / _safe_name(dam_name) / _safe_name(model_type) /
+                       f"{feature_set_hash}_{data_version}")
+        version_dir.mkdir(parents=True, exist_ok=True)
+
+        artifact = ModelArtifact(
+            dam_name=dam_name,
+            model_type=model_type,
+            feature_set_hash=feature_set_hash,
+            data_version=data_version,
+            feature_columns=list(feature_columns),
+            path=str(version_dir.relative_to(self.root)),
+            metrics=metrics or {},
+            extra=extra or {}
+        )
+
+        # Sıkıştırma mmap yüklemeyi engeller, bu yüzden compress=0
+        tmp_model = version_dir / f"{MODEL_FILE}.tmp"
+        joblib.dump(model, tmp_model, compress=0)
+        os.replace(tmp_model, version_dir / MODEL_FILE)
+        with open(version_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+            json.dump(asdict(artifact), f, ensure_ascii=False, indent=2)
+
+        index = dict(self._load_index())
+        index[artifact.key] = asdict(artifact)
+        self._write_index(index)
+
+        self._cache.pop(artifact.key, None)
+        logger.info(f"Model kaydedildi: {artifact.key}")
+        return artifact
+
+    def register_training_results(self, results: Dict[str, Dict[str, Any]],
+                                  feature_set_hash: str, data_version: str) -> List[ModelArtifact]:
+        """ModelTrainer.train sonuçlarını depoya kaydet"""
+        artifacts = []
+        for dam_name, models in results.items():
+            for model_type, result in models.items():
+                if result.model is None:
+                    continue
+                artifacts.append(self.save(
+                    dam_name=dam_name,
+                    model_type=model_type,
+                    model=result.model,
+                    feature_columns=result.feature_columns,
+                    feature_set_hash=feature_set_hash,
+                    data_version=data_version,
+                    metrics=result.mean_metrics,
+                    extra={"n_samples": result.n_samples}
+                ))
+        return artifacts
+
+    def register_tuning_results(self, results: Dict[str, Dict[str, Any]], models: Dict[str, Dict[str, Any]],
+                                feature_columns: List[str], feature_set_hash: str,
+                                data_version: str) -> List[ModelArtifact]:
+        """HyperparameterTuner sonuçlarını (en iyi parametreler + eğitilmiş model) depoya kaydet"""
+        artifacts = []
+        for dam_name, tuned in results.items():
+            for model_type, result in tuned.items():
+                model = models.get(dam_name, {}).get(model_type)
+                if model is None:
+                    continue
+                artifacts.append(self.save(
+                    dam_name=dam_name,
+                    model_type=model_type,
+                    model=model,
+                    feature_columns=feature_columns,
+                    feature_set_hash=feature_set_hash,
+                    data_version=data_version,
+                    metrics=result.mean_metrics,
+                    extra={
+                        "params": result.best_params,
+                        "tuning": {
+                            "score": result.best_score,
+                            "n_trials": result.n_trials,
+                            "n_fold_fits": result.n_fold_fits
+                        }
+                    }
+                ))
+        return artifacts
+
+    # Sorgulama
+    def list_artifacts(self, dam_name: str = None, model_type: str = None,
+                       feature_set_hash: str = None) -> List[ModelArtifact]:
+        """Filtreye uyan sürümleri (eskiden yeniye) listele"""
+        artifacts = []
+        for entry in self._load_index().values():
+            if dam_name is not None and entry["dam_name"] != dam_name:
+                continue
+            if model_type is not None and entry["model_type"] != model_type:
+                continue
+            if feature_set_hash is not None and entry["feature_set_hash"] != feature_set_hash:
+                continue
+            artifacts.append(ModelArtifact(**entry))
+        return sorted(artifacts, key=lambda a: a.created_at)
+
+    def find(self, dam_name: str, model_type: str, feature_set_hash: str = None,
+             data_version: str = None) -> Optional[ModelArtifact]:
+        """Verilen anahtara uyan en yeni sürümü bul"""
+        candidates = self.list_artifacts(dam_name, model_type, feature_set_hash)
+        if data_version is not None:
+            candidates = [a for a in candidates if a.data_version == data_version]
+        return candidates[-1] if candidates else None
+
+    def best_artifact(self, dam_name: str, feature_set_hash: str = None,
+                      metric: str = "rmse") -> Optional[ModelArtifact]:
+        """Baraj için metriği en iyi (en düşük) olan en yeni sürümleri karşılaştır"""
+        latest: Dict[str, ModelArtifact] = {}
+        for artifact in self.list_artifacts(dam_name, feature_set_hash=feature_set_hash):
+            latest[artifact.model_type] = artifact
+
+        scored = [a for a in latest.values() if metric in a.metrics]
+        if not scored:
+            return None
+        return min(scored, key=lambda a: a.metrics[metric])
+
+    def tuned_params(self, dam_name: str, model_type: str,
+                     feature_set_hash: str = None) -> Optional[Dict[str, Any]]:
+        """Baraj ve model tipi için en son aranmış en iyi hiperparametreler"""
+        for artifact in reversed(self.list_artifacts(dam_name, model_type, feature_set_hash)):
+            if "params" in artifact.extra:
+                return artifact.extra["params"]
+        return None
+
+    # Yükleme
+    def load_artifact(self, artifact: ModelArtifact) -> LoadedModel:
+        """Sürümü yükle (önbellekte varsa doğrudan döndür)"""
+        cached = self._cache.get(artifact.key)
+        if cached is not None:
+            self._cache.move_to_end(artifact.key)
+            return cached
+
+        import joblib
+
+        started = time.perf_counter()
+        model = joblib.load(self.root / artifact.path / MODEL_FILE, mmap_mode="r")
+        loaded = LoadedModel(artifact=artifact, model=model, load_seconds=time.perf_counter() - started)
+
+        self._cache[artifact.key] = loaded
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        logger.debug(f"Model yüklendi: {artifact.key} ({loaded.load_seconds * 1000:.1f} ms)")
+        return loaded
+
+    def load(self, dam_name: str, model_type: str, feature_set_hash: str = None,
+             data_version: str = None) -> Optional[LoadedModel]:
+        """Anahtara uyan en yeni sürümü yükle"""
+        artifact = self.find(dam_name, model_type, feature_set_hash, data_version)
+        if artifact is None:
+            return None
+        return self.load_artifact(artifact)
+
+    def clear_cache(self) -> None:
+        """Yüklü model önbelleğini temizle"""
+        self._cache.clear()
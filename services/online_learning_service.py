@@ -0,0 +1,281 @@
+"""
+Çevrimiçi Öğrenme Servisi - Günlük yeni gözlemlerle tam yeniden eğitim
+yapmadan model güncelleme (RLS / partial_fit)
+"""
+import os
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+from config.settings import settings
+from services.feature_service import FeatureEngine
+
+logger = logging.getLogger(__name__)
+
+ONLINE_METHODS = ["rls", "sgd"]
+
+class RecursiveLeastSquares:
+    """
+    Unutma faktörlü özyinelemeli en küçük kareler (RLS) regresyonu
+
+    Her yeni gözlem O(p^2) maliyetle ağırlıkları günceller; geçmiş veri
+    saklanmaz. Özellikler ilk fit'te belirlenen ortalama/ölçek ile
+    standartlaştırılır, böylece P matrisi iyi koşullu kalır.
+    """
+
+    def __init__(self, forgetting_factor: float = 0.995, delta: float = 100.0):
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError(f"Unutma faktörü (0, 1] aralığında olmalı: {forgetting_factor}")
+        self.forgetting_factor = forgetting_factor
+        self.delta = delta
+        self.mean_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+        self.coef_: Optional[np.ndarray] = None
+        self.P_: Optional[np.ndarray] = None
+        self.n_samples_seen_ = 0
+
+    def _design(self, X: np.ndarray) -> np.ndarray:
+        """Standartlaştırılmış özellikler + sabit terim sütunu"""
+        Z = (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+        return np.column_stack([Z, np.ones(len(Z))])
+
+    def _init_state(self, n_features: int) -> None:
+        self.coef_ = np.zeros(n_features + 1)
+        self.P_ = np.eye(n_features + 1) * self.delta
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "RecursiveLeastSquares":
+        """
+        Toplu başlangıç (warm start)
+
+        Ağırlıklı en küçük kareler kapalı çözümü, aynı satırları sırayla
+        partial_fit'e vermekle aynı sonucu verir.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.mean_ = X.mean(axis=0)
+        scale = X.std(axis=0)
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+
+        A = self._design(X)
+        n_samples = len(y)
+        weights = self.forgetting_factor ** np.arange(n_samples - 1, -1, -1)
+        precision = (A.T * weights) @ A + np.eye(A.shape[1]) * (self.forgetting_factor ** n_samples / self.delta)
+
+        self.P_ = np.linalg.inv(precision)
+        self.P_ = (self.P_ + self.P_.T) / 2
+        self.coef_ = self.P_ @ (A.T @ (weights * y))
+        self.n_samples_seen_ = n_samples
+        return self
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> "RecursiveLeastSquares":
+        """Yeni satırlarla ağırlıkları sırayla güncelle"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        if self.mean_ is None:
+            self.mean_ = np.zeros(X.shape[1])
+            self.scale_ = np.ones(X.shape[1])
+        if self.coef_ is None:
+            self._init_state(X.shape[1])
+
+        for a, target in zip(self._design(X), y):
+            Pa = self.P_ @ a
+            gain = Pa / (self.forgetting_factor + a @ Pa)
+            self.coef_ = self.coef_ + gain * (target - a @ self.coef_)
+            self.P_ = (self.P_ - np.outer(gain, Pa)) / self.forgetting_factor
+            self.P_ = (self.P_ + self.P_.T) / 2
+
+        self.n_samples_seen_ += len(y)
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Tahmin"""
+        return self._design(np.atleast_2d(X)) @ self.coef_
+
+class ScaledSGDRegressor:
+    """
+    StandardScaler + SGDRegressor ikilisi (ikisi de partial_fit destekler)
+
+    sklearn Pipeline partial_fit sunmadığı için küçük bir sarmalayıcı.
+    """
+
+    def __init__(self, **params):
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        params.setdefault("random_state", 42)
+        self.scaler = StandardScaler()
+        self.regressor = SGDRegressor(**params)
+
+    def fit(self, X: np.ndarray, y: np.ndarray, epochs: int = 5) -> "ScaledSGDRegressor":
+        """Toplu başlangıç - geçmiş üzerinde birkaç partial_fit turu"""
+        self.scaler.partial_fit(X)
+        Z = self.scaler.transform(X)
+        for _ in range(epochs):
+            self.regressor.partial_fit(Z, y)
+        return self
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> "ScaledSGDRegressor":
+        """Ölçekleyici ve regresörü yeni satırlarla güncelle"""
+        self.scaler.partial_fit(X)
+        self.regressor.partial_fit(self.scaler.transform(X), y)
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Tahmin"""
+        return self.regressor.predict(self.scaler.transform(X))
+
+def create_online_model(method: str, params: Optional[Dict] = None):
+    """Çevrimiçi öğrenme yönteminden model oluştur"""
+    params = dict(params or {})
+    if method == "rls":
+        params.setdefault("forgetting_factor", settings.model.online_forgetting_factor)
+        return RecursiveLeastSquares(**params)
+    elif method == "sgd":
+        return ScaledSGDRegressor(**params)
+    else:
+        raise ValueError(f"Desteklenmeyen çevrimiçi öğrenme yöntemi: {method}")
+
+class OnlineLearner:
+    """
+    Baraj başına çevrimiçi doluluk modelleri
+
+    initialize() mevcut özellik geçmişiyle bir kez başlatır; sonraki her
+    update() yalnızca her barajın son görülen tarihinden yeni satırlarını
+    kullanır. Her checkpoint_interval güncellemede durum diske atomik yazılır.
+    """
+
+    def __init__(self, feature_engine: FeatureEngine = None, method: str = None,
+                 params: Optional[Dict] = None, checkpoint_path: str = None,
+                 checkpoint_interval: int = None):
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.method = method or settings.model.online_method
+        self.params = params or {}
+        self.checkpoint_path = Path(checkpoint_path or settings.model.online_checkpoint_path)
+        self.checkpoint_interval = checkpoint_interval or settings.model.online_checkpoint_interval
+
+        if self.method not in ONLINE_METHODS:
+            raise ValueError(f"Desteklenmeyen çevrimiçi öğrenme yöntemi: {self.method}")
+
+        self.models: Dict[str, Any] = {}
+        self.last_dates: Dict[str, pd.Timestamp] = {}
+        self.n_updates = 0
+
+    def _usable(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Özellikleri ve hedefi tam olan satırlar, tarihe göre sıralı"""
+        columns = self.feature_engine.feature_columns
+        target = self.feature_engine.target_column
+        usable = features.dropna(subset=columns + [target]).copy()
+        usable["date"] = pd.to_datetime(usable["date"])
+        return usable.sort_values(["dam_name", "date"], kind="stable")
+
+    def initialize(self, features: pd.DataFrame) -> "OnlineLearner":
+        """
+        Modelleri mevcut geçmişle başlat
+
+        Args:
+            features: FeatureEngine.transform çıktısı
+        """
+        columns = self.feature_engine.feature_columns
+        target = self.feature_engine.target_column
+
+        for dam_name, group in self._usable(features).groupby("dam_name", sort=False):
+            if len(group) < settings.data.min_data_points:
+                logger.warning(f"Çevrimiçi model için yetersiz veri: {dam_name} ({len(group)} satır)")
+                continue
+            model = create_online_model(self.method, self.params)
+            model.fit(group[columns].to_numpy(dtype=np.float64), group[target].to_numpy(dtype=np.float64))
+            self.models[dam_name] = model
+            self.last_dates[dam_name] = group["date"].iloc[-1]
+
+        logger.info(f"Çevrimiçi modeller başlatıldı: {len(self.models)} baraj ({self.method})")
+        return self
+
+    def update(self, new_features: pd.DataFrame) -> Dict[str, int]:
+        """
+        Yeni günlerin özellikleriyle modelleri güncelle
+
+        Args:
+            new_features: Yeni satırların özellikleri (FeatureEngine.update çıktısı)
+
+        Returns:
+            Dict[str, int]: baraj -> kullanılan yeni satır sayısı
+        """
+        if new_features.empty:
+            return {}
+
+        columns = self.feature_engine.feature_columns
+        target = self.feature_engine.target_column
+        used = {}
+
+        for dam_name, group in self._usable(new_features).groupby("dam_name", sort=False):
+            model = self.models.get(dam_name)
+            if model is None:
+                continue
+            last_date = self.last_dates.get(dam_name)
+            if last_date is not None:
+                group = group[group["date"] > last_date]
+            if group.empty:
+                continue
+
+            model.partial_fit(group[columns].to_numpy(dtype=np.float64), group[target].to_numpy(dtype=np.float64))
+            self.last_dates[dam_name] = group["date"].iloc[-1]
+            used[dam_name] = len(group)
+
+        if used:
+            self.n_updates += 1
+            if self.n_updates % self.checkpoint_interval == 0:
+                self.checkpoint()
+
+        logger.debug(f"Çevrimiçi güncelleme: {used}")
+        return used
+
+    def checkpoint(self, path: str = None) -> Path:
+        """Model durumunu diske atomik olarak yaz"""
+        import joblib
+
+        path = Path(path) if path else self.checkpoint_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "method": self.method,
+            "feature_set_hash": self.feature_engine.feature_set_hash(),
+            "models": self.models,
+            "last_dates": self.last_dates,
+            "n_updates": self.n_updates
+        }
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Çevrimiçi model durumu kaydedildi: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str = None, feature_engine: FeatureEngine = None) -> Optional["OnlineLearner"]:
+        """
+        Kaydedilmiş durumu yükle
+
+        Returns:
+            Optional[OnlineLearner]: Dosya yoksa veya özellik seti değiştiyse None
+        """
+        import joblib
+
+        learner = cls(feature_engine=feature_engine, checkpoint_path=path)
+        if not learner.checkpoint_path.exists():
+            return None
+
+        try:
+            state = joblib.load(learner.checkpoint_path)
+        except Exception as e:
+            logger.error(f"Çevrimiçi model durumu okunamadı: {e}")
+            return None
+
+        if state.get("feature_set_hash") != learner.feature_engine.feature_set_hash():
+            logger.warning("Çevrimiçi model durumu farklı bir özellik setine ait, yok sayılıyor")
+            return None
+
+        learner.method = state["method"]
+        learner.models = state["models"]
+        learner.last_dates = state["last_dates"]
+        learner.n_updates = state["n_updates"]
+        return learner
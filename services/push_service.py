@@ -0,0 +1,404 @@
+"""
+Anlık Bildirim Servisi - Kuraklık seviyesi, trend ve tahmin eşik aşımı
+olasılığı değişimlerinin SSE/WebSocket ile abonelere iletilmesi
+"""
+import os
+import asyncio
+import base64
+import hashlib
+import struct
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qs
+import logging
+from config.settings import settings
+from services.results_writer import encode_json
+from services.quantile_service import breach_probability
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ["drought_level", "trend", "breach_probability", "alert"]
+OVERFLOW_POLICIES = ["drop_oldest", "disconnect"]
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+def dam_states(analysis: Dict[str, Dict], predictions: Dict[str, List[Dict]],
+               intervals: Dict[str, List[Dict]] = None, threshold: float = None) -> Dict[str, Dict]:
+    """
+    Bildirim konusu baraj durumları
+
+    Eşik aşımı olasılığı kantil aralıkları varsa onlardan, yoksa nokta
+    tahmininden (eşik altına inen gün varsa 1, yoksa 0) hesaplanır.
+    """
+    threshold = threshold if threshold is not None else settings.model.drought_threshold
+    intervals = intervals or {}
+    states = {}
+    for dam_name, dam_analysis in analysis.items():
+        if dam_name == "overall_status":
+            continue
+        if intervals.get(dam_name):
+            probability = breach_probability(intervals[dam_name], threshold)
+        else:
+            path = predictions.get(dam_name, [])
+            probability = float(any(row.get("predicted_fill_ratio", 1.0) < threshold for row in path))
+        states[dam_name] = {"drought_level": dam_analysis.get("drought_level"),
+                            "trend": dam_analysis.get("trend"),
+                            "breach_probability": round(probability, 3)}
+    return states
+
+class PushEvent:
+    """Tek olay; kodlanmış SSE/WebSocket çerçeveleri ilk ihtiyaçta bir kez üretilip tüm abonelerle paylaşılır"""
+
+    __slots__ = ("id", "name", "dam_name", "payload", "_sse", "_ws")
+
+    def __init__(self, event_id: int, name: str, dam_name: Optional[str], payload: Dict[str, Any]):
+        self.id = event_id
+        self.name = name
+        self.dam_name = dam_name
+        self.payload = payload
+        self._sse: Optional[bytes] = None
+        self._ws: Optional[bytes] = None
+
+    @property
+    def body(self) -> bytes:
+        return encode_json({**self.payload, "id": self.id, "event": self.name, "dam_name": self.dam_name})
+
+    def sse(self) -> bytes:
+        if self._sse is None:
+            self._sse = b"id: %d\nevent: %s\ndata: %s\n\n" % (self.id, self.name.encode(), self.body)
+        return self._sse
+
+    def ws(self) -> bytes:
+        if self._ws is None:
+            self._ws = ws_frame(self.body)
+        return self._ws
+
+class Subscriber:
+    """
+    Sınırlı kuyruklu abone
+
+    Kuyruk dolunca drop_oldest politikasında en eski olay atılır ve bir
+    sonraki teslimattan önce "resync" olayı gönderilir (istemci /status ile
+    durumu yeniden okur); disconnect politikasında abone kapatılır.
+    """
+
+    def __init__(self, subscriber_id: int, dams: Optional[Set[str]], events: Optional[Set[str]],
+                 maxsize: int, policy: str):
+        self.id = subscriber_id
+        self.dams = dams
+        self.events = events
+        self.policy = policy
+        self.queue: deque = deque()
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.delivered = 0
+        self.closed = False
+        self._lagged = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    def wants(self, event: PushEvent) -> bool:
+        return (self.events is None or event.name in self.events) and \
+            (self.dams is None or event.dam_name is None or event.dam_name in self.dams)
+
+    def visible(self, states: Dict[str, Any]) -> Dict[str, Any]:
+        """Durum sözlüğünün abonenin barajlarına düşen kısmı"""
+        if self.dams is None:
+            return states
+        return {name: state for name, state in states.items() if name in self.dams}
+
+    def offer(self, event: PushEvent) -> bool:
+        """Olayı kuyruğa koy (döngü iş parçacığında, beklemeden)"""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.maxsize:
+            if self.policy == "disconnect":
+                logger.warning(f"Abone {self.id} yetişemiyor, bağlantı kapatılıyor")
+                self.close()
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+            self._lagged = True
+        self.queue.append(event)
+        self._wake()
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next(self, timeout: float = None) -> Optional[PushEvent]:
+        """
+        Sıradaki olay
+
+        Returns:
+            PushEvent; zaman aşımında veya abone kapandıysa None
+        """
+        if not self.queue and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self._waiter = None
+        if not self.queue:
+            return None
+        if self._lagged:
+            self._lagged = False
+            return PushEvent(0, "resync", None, {"dropped": self.dropped})
+        self.delivered += 1
+        return self.queue.popleft()
+
+class PushBroker:
+    """
+    Olay yayıncısı
+
+    Yayın, eşleşen her abonenin kuyruğuna beklemeden ekleme yapar; soket
+    yazımı ve ağ tıkanıklığı bağlantı başına görevlerde kalır. Boşta bekleyen
+    abone yalnızca bir future tutar, bu yüzden tek asyncio döngüsünde binlerce
+    bağlantı taşınabilir. Son olaylar yeniden bağlanan SSE istemcileri
+    (Last-Event-ID) için halka tamponda tutulur.
+    """
+
+    def __init__(self, queue_size: int = None, policy: str = None, replay_size: int = None,
+                 max_subscribers: int = None, probability_step: float = None):
+        self.queue_size = queue_size or settings.api.push_queue_size
+        self.policy = policy or settings.api.push_overflow_policy
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Desteklenmeyen taşma politikası: {self.policy}. Desteklenenler: {OVERFLOW_POLICIES}")
+        self.max_subscribers = max_subscribers or settings.api.push_max_subscribers
+        self.probability_step = probability_step if probability_step is not None \
+            else settings.api.push_breach_probability_step
+        self.subscribers: Dict[int, Subscriber] = {}
+        self.replay: deque = deque(maxlen=replay_size or settings.api.push_replay_size)
+        self._ids = itertools.count(1)
+        self._event_ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.stats = {"published": 0, "deliveries": 0}
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Başka iş parçacıklarından yayın için döngüyü kaydet (döngü iş parçacığında çağrılır)"""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    # -- Abonelik ---------------------------------------------------------
+
+    def subscribe(self, dams: Iterable[str] = None, events: Iterable[str] = None,
+                  last_event_id: int = None) -> Subscriber:
+        """
+        Yeni abone
+
+        Args:
+            dams: Yalnızca bu barajların olayları (None ise tümü; takma adlar çözülür)
+            events: Yalnızca bu olay tipleri (None ise tümü)
+            last_event_id: Verilirse tampondaki sonraki olaylar önce teslim edilir
+        """
+        if len(self.subscribers) >= self.max_subscribers:
+            raise RuntimeError(f"Abone sınırına ulaşıldı: {self.max_subscribers}")
+        if dams:
+            dams = {settings.dam_registry.resolve(name) or name for name in dams}
+        subscriber = Subscriber(next(self._ids), set(dams) if dams else None,
+                                set(events) if events else None, self.queue_size, self.policy)
+        self.subscribers[subscriber.id] = subscriber
+        if last_event_id is not None:
+            for event in self.replay:
+                if event.id > last_event_id and subscriber.wants(event):
+                    subscriber.offer(event)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        self.subscribers.pop(subscriber.id, None)
+
+    # -- Yayın ------------------------------------------------------------
+
+    def publish(self, name: str, dam_name: Optional[str], payload: Dict[str, Any]) -> Optional[PushEvent]:
+        """Olayı eşleşen abonelere dağıt (döngü dışından çağrılırsa döngüye aktarılır)"""
+        if self._loop is not None and threading.get_ident() != self._loop_thread and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self.publish, name, dam_name, payload)
+            return None
+
+        event = PushEvent(next(self._event_ids), name, dam_name, payload)
+        self.replay.append(event)
+        self.stats["published"] += 1
+        for subscriber in list(self.subscribers.values()):
+            if subscriber.closed:
+                self.subscribers.pop(subscriber.id, None)
+            elif subscriber.wants(event) and subscriber.offer(event):
+                self.stats["deliveries"] += 1
+        return event
+
+    def publish_changes(self, previous: Dict[str, Dict], current: Dict[str, Dict],
+                        snapshot_version: int = None) -> List[PushEvent]:
+        """
+        İki durum sözlüğü arasındaki değişimleri yayınla
+
+        Eşik aşımı olasılığı probability_step kadar değişmedikçe olay üretilmez.
+        """
+        events = []
+        at = datetime.now()
+        for dam_name, state in current.items():
+            before = previous.get(dam_name)
+            if before is None:
+                continue
+            for key in ["drought_level", "trend", "breach_probability"]:
+                old, new = before.get(key), state.get(key)
+                if old == new:
+                    continue
+                if key == "breach_probability" and old is not None and new is not None \
+                        and abs(new - old) < self.probability_step:
+                    continue
+                event = self.publish(key, dam_name, {"previous": old, "current": new,
+                                                     "snapshot_version": snapshot_version, "at": at})
+                if event is not None:
+                    events.append(event)
+        return events
+
+    def publish_alert(self, alert_event: Dict) -> None:
+        """AlertEngine olay dinleyicisi (OPENED/ESCALATED/... action alanında)"""
+        payload = {"action": alert_event["event"], "date": alert_event["date"], "alert": alert_event["alert"]}
+        if "previous_type" in alert_event:
+            payload["previous_type"] = alert_event["previous_type"]
+        self.publish("alert", alert_event["alert"].get("dam_name"), payload)
+
+    # -- Akışlar ----------------------------------------------------------
+
+    def _parse_filters(self, query: str, headers: Dict[str, str]):
+        params = parse_qs(query)
+        dams = [d for value in params.get("dams", []) for d in value.split(",") if d] or None
+        events = [e for value in params.get("events", []) for e in value.split(",") if e] or None
+        unknown = sorted(set(events or []) - set(EVENT_TYPES))
+        if unknown:
+            raise ValueError(f"Bilinmeyen olay tipleri: {unknown}")
+        last_event_id = headers.get("last-event-id") or (params.get("last_event_id") or [None])[0]
+        return dams, events, int(last_event_id) if last_event_id else None
+
+    async def stream_sse(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         query: str, headers: Dict[str, str], initial: Dict[str, Any] = None) -> None:
+        """Server-Sent Events akışı; bağlantı kapanana kadar sürer"""
+        subscriber = self._open(writer, query, headers)
+        if subscriber is None:
+            return
+        # İstemci bağlantıyı kapatınca (EOF) abonelik hemen düşer
+        watcher = asyncio.ensure_future(reader.read(1))
+        watcher.add_done_callback(lambda _: subscriber.close())
+        heartbeat = settings.api.push_heartbeat_seconds
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            if initial is not None:
+                writer.write(PushEvent(0, "state", None, subscriber.visible(initial)).sse())
+            await writer.drain()
+            while not subscriber.closed:
+                event = await subscriber.next(timeout=heartbeat)
+                writer.write(event.sse() if event is not None else b": ping\n\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            watcher.cancel()
+            self.unsubscribe(subscriber)
+
+    async def stream_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                               query: str, headers: Dict[str, str], initial: Dict[str, Any] = None) -> None:
+        """WebSocket akışı (yalnızca sunucudan istemciye metin mesajları; ping/close işlenir)"""
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            writer.write(_plain_response(400, encode_json({"error": "WebSocket el sıkışması bekleniyor"})))
+            await writer.drain()
+            return
+        subscriber = self._open(writer, query, headers)
+        if subscriber is None:
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        if initial is not None:
+            writer.write(ws_frame(PushEvent(0, "state", None, subscriber.visible(initial)).body))
+
+        async def read_frames():
+            try:
+                while True:
+                    opcode, payload = await read_ws_frame(reader)
+                    if opcode == WS_CLOSE:
+                        break
+                    if opcode == WS_PING:
+                        writer.write(ws_frame(payload, WS_PONG))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            subscriber.close()
+
+        reader_task = asyncio.ensure_future(read_frames())
+        heartbeat = settings.api.push_heartbeat_seconds
+        try:
+            await writer.drain()
+            while not subscriber.closed:
+                event = await subscriber.next(timeout=heartbeat)
+                if event is not None:
+                    writer.write(event.ws())
+                elif not subscriber.closed:
+                    writer.write(ws_frame(b"", WS_PING))
+                await writer.drain()
+            writer.write(ws_frame(b"", WS_CLOSE))
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            reader_task.cancel()
+            self.unsubscribe(subscriber)
+
+    def _open(self, writer: asyncio.StreamWriter, query: str, headers: Dict[str, str]) -> Optional[Subscriber]:
+        try:
+            dams, events, last_event_id = self._parse_filters(query, headers)
+            return self.subscribe(dams, events, last_event_id)
+        except ValueError as e:
+            writer.write(_plain_response(400, encode_json({"error": str(e)})))
+        except RuntimeError as e:
+            writer.write(_plain_response(503, encode_json({"error": str(e)})))
+        return None
+
+def _plain_response(status: int, body: bytes) -> bytes:
+    reason = {400: "Bad Request", 503: "Service Unavailable"}.get(status, "")
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body
+
+def ws_frame(payload: bytes, opcode: int = WS_TEXT, mask: bool = False) -> bytes:
+    """Tek parçalı WebSocket çerçevesi (istemciler mask=True kullanır)"""
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, length)
+    if not mask:
+        return header + payload
+    key = os.urandom(4)
+    return header + key + _apply_mask(payload, key)
+
+async def read_ws_frame(reader: asyncio.StreamReader):
+    """Tek WebSocket çerçevesi oku: (opcode, yük)"""
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    key = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if key is not None:
+        payload = _apply_mask(payload, key)
+    return opcode, payload
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    return bytes(b ^ key[i % 4] for i, b in enumerate(payload))
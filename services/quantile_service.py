@@ -0,0 +1,192 @@
+"""
+Kantil Tahmin Servisi - Histogram tabanlı gradient boosting ile ufuk bazlı
+P10/P50/P90 doluluk aralıkları
+"""
+import time
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional
+import logging
+from config.settings import settings
+from services.feature_service import FeatureEngine, static_features_for_rows
+
+logger = logging.getLogger(__name__)
+
+def quantile_label(quantile: float) -> str:
+    """0.1 -> 'p10'"""
+    return f"p{int(round(quantile * 100))}"
+
+def breach_probability(rows: List[Dict], threshold: float) -> float:
+    """
+    Ufuk boyunca en kötü günde P(doluluk < eşik)
+
+    Her günün kantil noktaları (p10_fill_ratio, ...) arasında doğrusal
+    enterpolasyon yapılır; en düşük kantilin altı 0, en yüksek kantilin
+    üstü 1 kabul edilir (kaba ama monoton bir kestirim).
+    """
+    keys = sorted((k for k in (rows[0] if rows else {}) if k.startswith("p") and k.endswith("_fill_ratio")),
+                  key=lambda k: int(k[1:-len("_fill_ratio")]))
+    if not keys:
+        return 0.0
+    levels = np.array([int(k[1:-len("_fill_ratio")]) / 100 for k in keys])
+    values = np.sort(np.array([[row[k] for k in keys] for row in rows], dtype=float), axis=1)
+    probabilities = [np.interp(threshold, day, levels, left=0.0, right=1.0) for day in values]
+    return float(max(probabilities))
+
+class QuantileForecaster:
+    """
+    Doğrudan (direct) çok ufuklu kantil tahmincisi
+
+    Her (ufuk, kantil) için tüm barajlarda ortak bir
+    HistGradientBoostingRegressor(loss="quantile") eğitilir; barajlar statik
+    ortak değişkenleriyle (kapasite, konum, ilçe) ayırt edilir, böylece model
+    boyutu baraj sayısından bağımsızdır. Hedef, ufuk sonundaki doluluğun bugüne
+    göre değişimidir. Eğitilmeyen ara günler komşu ufuklardan doğrusal
+    enterpolasyonla doldurulur, kantiller çaprazlanmasın diye sıralanır.
+    """
+
+    def __init__(self, quantiles: List[float] = None, horizons: List[int] = None,
+                 feature_engine: FeatureEngine = None, params: Optional[Dict] = None):
+        self.quantiles = sorted(quantiles or settings.model.quantile_levels)
+        self.horizons = sorted(horizons or settings.model.quantile_horizons)
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.params = params if params is not None else settings.model.model_params.get("quantile_gradient_boosting", {})
+
+        if any(not 0 < q < 1 for q in self.quantiles):
+            raise ValueError(f"Kantiller (0, 1) aralığında olmalı: {self.quantiles}")
+
+        self.models: Dict[int, Dict[float, Any]] = {}
+        self.fit_seconds: Optional[float] = None
+        self.predict_seconds: Optional[float] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.models)
+
+    def _create_model(self, quantile: float):
+        """Kantil kaybıyla histogram tabanlı gradient boosting"""
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        params = dict(self.params)
+        params.setdefault("max_iter", 200)
+        params.setdefault("learning_rate", 0.1)
+        params.setdefault("random_state", 42)
+        return HistGradientBoostingRegressor(loss="quantile", quantile=quantile, **params)
+
+    def _design_matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        """Özellik sütunları + statik baraj ortak değişkenleri"""
+        X = frame[self.feature_engine.feature_columns].to_numpy(dtype=np.float32)
+        return np.hstack([X, static_features_for_rows(frame["dam_name"])])
+
+    def _horizon_targets(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        Her satır için h gün sonraki doluluk değişimi
+
+        Hedef satır kaydırmayla değil tarihle eşlenir; h gün sonrası
+        gözlenmemişse değişim NaN olur.
+        """
+        target = self.feature_engine.target_column
+        frame = features.copy()
+        frame["date"] = pd.to_datetime(frame["date"])
+        frame = frame.sort_values(["dam_name", "date"], kind="stable").reset_index(drop=True)
+        days = frame["date"].dt.normalize()
+        observed = frame[target].set_axis(pd.MultiIndex.from_arrays([frame["dam_name"], days]))
+        observed = observed[~observed.index.duplicated(keep="last")]
+        for horizon in self.horizons:
+            future = pd.MultiIndex.from_arrays([frame["dam_name"], days + pd.Timedelta(days=horizon)])
+            frame[f"delta_{horizon}"] = observed.reindex(future).to_numpy() - frame[target].to_numpy()
+        return frame
+
+    def fit(self, features: pd.DataFrame) -> "QuantileForecaster":
+        """
+        Tüm (ufuk, kantil) modellerini eğit
+
+        Args:
+            features: FeatureEngine.transform çıktısı
+        """
+        target = self.feature_engine.target_column
+        frame = self._horizon_targets(features)
+        frame = frame[frame[target].notna()]
+        X_all = self._design_matrix(frame)
+
+        started = time.perf_counter()
+        self.models = {}
+        for horizon in self.horizons:
+            y = frame[f"delta_{horizon}"].to_numpy(dtype=np.float64)
+            usable = np.isfinite(y)
+            if usable.sum() < settings.data.min_data_points:
+                logger.warning(f"{horizon} günlük ufuk için yetersiz veri ({int(usable.sum())} satır)")
+                continue
+            self.models[horizon] = {
+                quantile: self._create_model(quantile).fit(X_all[usable], y[usable])
+                for quantile in self.quantiles
+            }
+        self.fit_seconds = time.perf_counter() - started
+
+        logger.info(f"Kantil modelleri eğitildi: {len(self.models)} ufuk x {len(self.quantiles)} kantil "
+                    f"({self.fit_seconds:.2f} sn)")
+        return self
+
+    def predict_matrix(self, features: pd.DataFrame, days_ahead: int = None) -> Dict[str, Any]:
+        """
+        Tüm barajlar için tek geçişte kantil yolları
+
+        Args:
+            features: FeatureEngine.transform çıktısı (her barajın son satırı kullanılır)
+            days_ahead: Tahmin ufku (gün)
+
+        Returns:
+            Dict: dam_names, dates (baraj, gün), values (baraj, gün, kantil)
+        """
+        if not self.is_fitted:
+            raise ValueError("Kantil modelleri henüz eğitilmedi")
+        if days_ahead is None:
+            days_ahead = settings.model.prediction_days
+
+        started = time.perf_counter()
+        target = self.feature_engine.target_column
+        latest = features.copy()
+        latest["date"] = pd.to_datetime(latest["date"])
+        latest = latest.dropna(subset=[target]).sort_values(["dam_name", "date"], kind="stable")
+        latest = latest.groupby("dam_name", sort=False).tail(1).reset_index(drop=True)
+
+        X = self._design_matrix(latest)
+        current = latest[target].to_numpy(dtype=np.float64)
+        horizons = [h for h in self.models]
+
+        # (baraj, ufuk, kantil) - her model tüm barajları tek çağrıda tahmin eder
+        deltas = np.empty((len(latest), len(horizons), len(self.quantiles)))
+        for i, horizon in enumerate(horizons):
+            for j, quantile in enumerate(self.quantiles):
+                deltas[:, i, j] = self.models[horizon][quantile].predict(X)
+        deltas = np.sort(deltas, axis=2)
+
+        # Gün 0'da tüm kantiller mevcut doluluktur; ara günler doğrusal enterpolasyon
+        days = np.arange(1, days_ahead + 1)
+        knots = np.r_[0, horizons]
+        upper = np.clip(np.searchsorted(knots, days), 1, len(knots) - 1)
+        lower = upper - 1
+        weight = np.clip((days - knots[lower]) / (knots[upper] - knots[lower]), 0.0, 1.0)[None, :, None]
+        knot_values = np.concatenate([np.zeros((len(latest), 1, len(self.quantiles))), deltas], axis=1)
+        paths = knot_values[:, lower] * (1 - weight) + knot_values[:, upper] * weight
+        values = np.clip(current[:, None, None] + paths, 0.0, 1.0)
+
+        dates = latest["date"].to_numpy()[:, None] + (days * np.timedelta64(1, "D"))[None, :]
+        self.predict_seconds = time.perf_counter() - started
+        return {"dam_names": latest["dam_name"].tolist(), "dates": dates, "values": values}
+
+    def predict(self, features: pd.DataFrame, days_ahead: int = None) -> Dict[str, pd.DataFrame]:
+        """
+        Barajlar için P10/P50/P90 doluluk yolları
+
+        Returns:
+            Dict[str, pd.DataFrame]: baraj -> (date, p10, p50, p90)
+        """
+        result = self.predict_matrix(features, days_ahead)
+        labels = [quantile_label(q) for q in self.quantiles]
+        paths = {}
+        for d, dam_name in enumerate(result["dam_names"]):
+            frame = pd.DataFrame(result["values"][d], columns=labels)
+            frame.insert(0, "date", pd.DatetimeIndex(result["dates"][d]))
+            paths[dam_name] = frame
+        return paths
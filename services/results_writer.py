@@ -0,0 +1,299 @@
+"""
+Sonuç Yazıcı - Akışlı JSON/NDJSON ve sıkıştırılmış sütunsal (Parquet) çıktılar,
+atomik dışa aktarım ve manifest
+"""
+import os
+import json
+import shutil
+import hashlib
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+import logging
+import numpy as np
+import pandas as pd
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # orjson opsiyonel, yoksa standart json kullanılır
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pyarrow opsiyonel, yoksa CSV yazılır
+    pa = pq = None
+    PYARROW_AVAILABLE = False
+
+MANIFEST_FILE = "manifest.json"
+TABLE_FORMATS = ["parquet", "csv"]
+HASH_BLOCK_BYTES = 1 << 20
+
+def json_default(obj: Any) -> Any:
+    """JSON kodlayıcı için tarih, numpy, enum ve pydantic dönüşümleri"""
+    if isinstance(obj, (datetime, date, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, "dict") and callable(obj.dict):
+        return obj.dict()
+    return str(obj)
+
+def encode_json(payload: Any) -> bytes:
+    """Tek satırlık UTF-8 JSON (orjson varsa onunla)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, default=json_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, ensure_ascii=False, default=json_default).encode("utf-8")
+
+def prediction_rows(predictions: Dict[str, List[Dict]]) -> Iterator[Dict]:
+    """Baraj -> tahmin listesi sözlüğünü kopyalayarak düz satırlara aç (girdi değişmez)"""
+    for dam_name, rows in predictions.items():
+        for row in rows:
+            yield {"dam_name": dam_name, **row}
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _unify_schemas(current, incoming):
+    """
+    İki parça şemasının ortak şeması (null -> somut tip, int -> float gibi yükseltmelerle)
+
+    Raises:
+        ValueError: Tipler uzlaştırılamıyorsa (ör. string ve int)
+    """
+    try:
+        try:
+            return pa.unify_schemas([current, incoming], promote_options="permissive")
+        except TypeError:  # pyarrow < 14: yalnızca null sütunlar birleştirilir
+            return pa.unify_schemas([current, incoming])
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Parça şemaları uyuşmuyor: {e}") from e
+
+def _frame_chunks(data: Union[pd.DataFrame, Iterable], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """DataFrame'i dilimlere böl; DataFrame/sözlük akışlarını chunk_rows'luk çerçevelere topla"""
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+        return
+
+    buffer: List[Dict] = []
+    for item in data:
+        if isinstance(item, pd.DataFrame):
+            if buffer:
+                yield pd.DataFrame(buffer)
+                buffer = []
+            yield from _frame_chunks(item, chunk_rows)
+            continue
+        buffer.append(item)
+        if len(buffer) >= chunk_rows:
+            yield pd.DataFrame(buffer)
+            buffer = []
+    if buffer:
+        yield pd.DataFrame(buffer)
+
+class ResultsWriter:
+    """
+    Bir dışa aktarım çalıştırmasının dosyalarını yazar
+
+    Dosyalar önce gizli bir hazırlık dizinine parça parça yazılır; commit()
+    manifest'i ekleyip dizini tek os.replace ile son adına taşır. Böylece
+    okuyucular ya eksiksiz bir çalıştırma dizini görür ya da hiçbir şey.
+    Tablolar chunk_rows'luk parçalar hâlinde yazılır (Parquet'te satır grubu),
+    JSON raporu üst düzey anahtar bazında akıtılır; bellek kullanımı çıktı
+    boyutundan bağımsız kalır.
+
+    Kullanım:
+        with ResultsWriter("results", run_id="izmir_20240101_120000") as writer:
+            writer.write_table("combined_data", frame)
+            writer.write_json("report", report)
+    """
+
+    def __init__(self, output_dir: str = None, run_id: str = None, table_format: str = None,
+                 compression: str = None, chunk_rows: int = None, metadata: Dict[str, Any] = None):
+        self.output_dir = Path(output_dir or settings.data.results_dir)
+        self.run_id = run_id or f"izmir_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.table_format = table_format or settings.data.results_table_format
+        self.compression = compression if compression is not None else settings.data.results_compression
+        self.chunk_rows = chunk_rows or settings.data.results_chunk_rows
+        self.metadata = metadata or {}
+
+        if self.table_format not in TABLE_FORMATS:
+            raise ValueError(f"Desteklenmeyen tablo formatı: {self.table_format}. Desteklenenler: {TABLE_FORMATS}")
+        if self.table_format == "parquet" and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow yüklü değil, tablolar CSV olarak yazılacak")
+            self.table_format = "csv"
+
+        self.final_dir = self.output_dir / self.run_id
+        self.staging_dir = self.output_dir / f".{self.run_id}.tmp"
+        self.files: List[Dict[str, Any]] = []
+        self._committed = False
+
+    # -- Yaşam döngüsü ----------------------------------------------------
+
+    def __enter__(self) -> "ResultsWriter":
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def begin(self) -> "ResultsWriter":
+        if self.staging_dir.exists():
+            shutil.rmtree(self.staging_dir)
+        self.staging_dir.mkdir(parents=True)
+        return self
+
+    def abort(self) -> None:
+        """Hazırlık dizinini sil; önceki çıktılar etkilenmez"""
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        logger.warning(f"Dışa aktarım iptal edildi: {self.run_id}")
+
+    def commit(self) -> Path:
+        """Manifest'i yaz ve çalıştırma dizinini atomik olarak yayınla"""
+        if self._committed:
+            return self.final_dir
+        for entry in self.files:
+            entry["sha256"] = _file_digest(self.staging_dir / entry["file"])
+        manifest = {
+            "run_id": self.run_id,
+            "created_at": datetime.now(),
+            "serializer": "orjson" if ORJSON_AVAILABLE else "json",
+            "files": self.files,
+            **self.metadata
+        }
+        with open(self.staging_dir / MANIFEST_FILE, "wb") as f:
+            f.write(encode_json(manifest))
+
+        if self.final_dir.exists():
+            shutil.rmtree(self.final_dir)
+        os.replace(self.staging_dir, self.final_dir)
+        self._committed = True
+        logger.info(f"Sonuçlar yayınlandı: {self.final_dir} ({len(self.files)} dosya)")
+        return self.final_dir
+
+    def _record(self, file_name: str, kind: str, rows: Optional[int]) -> Path:
+        path = self.staging_dir / file_name
+        self.files.append({"file": file_name, "format": kind, "rows": rows, "bytes": path.stat().st_size})
+        return path
+
+    # -- Yazıcılar --------------------------------------------------------
+
+    def write_table(self, name: str, data: Union[pd.DataFrame, Iterable], schema=None) -> Path:
+        """
+        Tabloyu parça parça yaz
+
+        Args:
+            name: Dosya adı (uzantısız)
+            data: DataFrame, DataFrame akışı veya satır sözlükleri akışı
+            schema: İsteğe bağlı pyarrow şeması (Parquet); verilmezse parçalardan
+                çıkarılır ve gerektiğinde genişletilir
+        """
+        if self.table_format == "parquet":
+            return self._write_parquet(name, data, schema)
+        return self._write_csv(name, data)
+
+    def _write_parquet(self, name: str, data, schema=None) -> Path:
+        file_name = f"{name}.parquet"
+        path = self.staging_dir / file_name
+        writer = None
+        rows = 0
+        try:
+            for chunk in _frame_chunks(data, self.chunk_rows):
+                table = pa.Table.from_pandas(chunk, preserve_index=False, schema=schema)
+                if writer is None:
+                    writer = self._open_parquet(path, table.schema)
+                elif not table.schema.equals(writer.schema, check_metadata=False):
+                    # Sonraki parçada tip genişleyebilir (ilk parçada hep None olan
+                    # sütun, int'ten float'a geçen sütun); dosya ortak şemaya yükseltilir
+                    unified = _unify_schemas(writer.schema, table.schema)
+                    if not unified.equals(writer.schema, check_metadata=False):
+                        writer = self._promote_parquet(writer, path, unified)
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(pa.table({}) if schema is None else schema.empty_table(), path)
+        return self._record(file_name, "parquet", rows)
+
+    def _open_parquet(self, path: Path, schema):
+        return pq.ParquetWriter(path, schema, compression=self.compression or "none")
+
+    def _promote_parquet(self, writer, path: Path, schema):
+        """Yazılmış satır gruplarını genişletilmiş şemayla yeniden yaz, yeni yazıcıyı döndür"""
+        writer.close()
+        previous = path.with_name(f"{path.name}.prev")
+        os.replace(path, previous)
+        promoted = self._open_parquet(path, schema)
+        source = pq.ParquetFile(previous)
+        for group in range(source.num_row_groups):
+            promoted.write_table(source.read_row_group(group).cast(schema))
+        previous.unlink()
+        logger.info(f"{path.name} şeması yükseltildi: {schema.names}")
+        return promoted
+
+    def _write_csv(self, name: str, data) -> Path:
+        compressed = self.compression in ("gzip", "gz")
+        file_name = f"{name}.csv.gz" if compressed else f"{name}.csv"
+        rows = 0
+        options = {"compression": "gzip"} if compressed else {}
+        with open(self.staging_dir / file_name, "wb") as handle:
+            for i, chunk in enumerate(_frame_chunks(data, self.chunk_rows)):
+                chunk.to_csv(handle, index=False, header=(i == 0), encoding="utf-8", **options)
+                rows += len(chunk)
+        return self._record(file_name, "csv.gz" if compressed else "csv", rows)
+
+    def write_ndjson(self, name: str, records: Iterable[Any]) -> Path:
+        """Her kaydı bir JSON satırı olarak akıt"""
+        file_name = f"{name}.ndjson"
+        rows = 0
+        with open(self.staging_dir / file_name, "wb") as f:
+            for record in records:
+                f.write(encode_json(record))
+                f.write(b"\n")
+                rows += 1
+        return self._record(file_name, "ndjson", rows)
+
+    def write_json(self, name: str, document: Dict[str, Any]) -> Path:
+        """
+        Sözlüğü üst düzey anahtar bazında akıtarak tek JSON belgesi olarak yaz
+
+        Tüm belge tek bir dizgeye kodlanmaz; her anahtarın değeri ayrı kodlanıp yazılır.
+        """
+        file_name = f"{name}.json"
+        with open(self.staging_dir / file_name, "wb") as f:
+            f.write(b"{")
+            for i, (key, value) in enumerate(document.items()):
+                if i:
+                    f.write(b",")
+                f.write(encode_json(str(key)))
+                f.write(b":")
+                f.write(encode_json(value))
+            f.write(b"}")
+        return self._record(file_name, "json", None)
+
+def read_manifest(run_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Yayınlanmış bir çalıştırmanın manifest'ini oku"""
+    with open(Path(run_dir) / MANIFEST_FILE, "rb") as f:
+        return json.loads(f.read())
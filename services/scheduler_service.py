@@ -0,0 +1,190 @@
+"""
+Yenileme Zamanlayıcısı - settings.data.data_update_interval aralığıyla
+sıcak uygulama üzerinde periyodik veri yenileme
+"""
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import logging
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    """
+    Uygulamayı bellekte tutarak verileri periyodik olarak yeniler
+
+    Her döngüde app.refresh_data() çağrılır; yalnızca girdisi değişen
+    aşamalar yeniden hesaplanır ve analiz/tahmin/uyarı/rapor önbelleği
+    ısıtılır. Yüklenmiş modeller ve aşama önbellekleri döngüler arasında
+    korunur.
+
+    Çakışma koruması: aynı anda tek döngü çalışır; çalışan döngü varken
+    tetiklenen döngü atlanır. Aralıktan uzun süren döngülerin kaçırdığı
+    zaman dilimleri art arda çalıştırılmaz, bir sonraki dilime geçilir.
+    Her döngüye [0, jitter] aralığında rastgele gecikme eklenir.
+    """
+
+    def __init__(self, app, interval: float = None, jitter: float = None,
+                 run_on_start: bool = None, refresh_kwargs: Dict[str, Any] = None,
+                 listeners: List[Callable[[Dict[str, Any]], None]] = None, seed: int = None):
+        """
+        Args:
+            app: IzmirDamPredictionApp (veya aynı arayüzde nesne)
+            interval: Yenileme aralığı (saniye)
+            jitter: Rastgele gecikme üst sınırı (saniye, aralıktan küçük tutulur)
+            run_on_start: Başlarken hemen yenile
+            refresh_kwargs: app.refresh_data() argümanları (dam_names, days, ...)
+            listeners: Başarılı döngü sonrası durum sözlüğüyle çağrılan fonksiyonlar
+            seed: Gecikme üreteci tohumu
+        """
+        self.app = app
+        self.interval = float(interval if interval is not None else settings.data.data_update_interval)
+        if self.interval <= 0:
+            raise ValueError(f"Yenileme aralığı pozitif olmalı: {self.interval}")
+        jitter = float(jitter if jitter is not None else settings.data.refresh_jitter_seconds)
+        self.jitter = min(max(jitter, 0.0), 0.5 * self.interval)
+        self.run_on_start = settings.data.refresh_on_start if run_on_start is None else run_on_start
+        self.refresh_kwargs = refresh_kwargs or {}
+        self.listeners = list(listeners or [])
+        self._random = random.Random(seed)
+
+        self._cycle_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_run_at: Optional[datetime] = None
+        self.stats = {"cycles": 0, "failures": 0, "consecutive_failures": 0,
+                      "skipped_overlaps": 0, "missed_slots": 0}
+        self.last_attempt_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_changed: Dict[str, bool] = {}
+        self.last_error: Optional[str] = None
+
+    # -- Döngü ------------------------------------------------------------
+
+    def run_cycle(self) -> Optional[Dict[str, bool]]:
+        """
+        Tek yenileme döngüsü
+
+        Returns:
+            Değişen girdiler; döngü atlandıysa veya başarısızsa None
+        """
+        if not self._cycle_lock.acquire(blocking=False):
+            self.stats["skipped_overlaps"] += 1
+            logger.warning("Önceki yenileme sürüyor, bu döngü atlandı")
+            return None
+
+        started = time.perf_counter()
+        self.last_attempt_at = datetime.now()
+        try:
+            changed = self.app.refresh_data(**self.refresh_kwargs)
+            if any(changed.values()) or self.last_success_at is None:
+                self._warm()
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.stats["consecutive_failures"] += 1
+            self.last_error = str(e)
+            logger.error(f"Yenileme döngüsü hatası: {e}")
+            return None
+        finally:
+            self.last_duration = time.perf_counter() - started
+            self.stats["cycles"] += 1
+            self._cycle_lock.release()
+
+        self.stats["consecutive_failures"] = 0
+        self.last_error = None
+        self.last_success_at = datetime.now()
+        self.last_changed = changed
+        logger.info(f"Yenileme döngüsü tamamlandı ({self.last_duration:.2f}s)")
+
+        status = self.status()
+        for listener in self.listeners:
+            try:
+                listener(status)
+            except Exception as e:
+                logger.error(f"Yenileme dinleyicisi hatası: {e}")
+        return changed
+
+    def _warm(self) -> None:
+        """Sorgulanan aşamaları önbelleğe al"""
+        self.app.analyze_dams()
+        self.app.predict_future_levels()
+        self.app.generate_alerts()
+        self.app.generate_report()
+
+    # -- Zamanlama --------------------------------------------------------
+
+    def _next_slot(self, scheduled: float, now: float) -> float:
+        """Kaçırılan dilimleri atlayarak bir sonraki dilimin zamanı"""
+        next_slot = scheduled + self.interval
+        if next_slot <= now:
+            missed = int((now - next_slot) // self.interval) + 1
+            self.stats["missed_slots"] += missed
+            next_slot += missed * self.interval
+            logger.warning(f"Yenileme aralığı aşıldı, {missed} dilim atlandı")
+        return next_slot
+
+    def _loop(self) -> None:
+        slot = time.monotonic() if self.run_on_start else time.monotonic() + self.interval
+        while not self._stop_event.is_set():
+            delay = 0.0 if (self.run_on_start and self.stats["cycles"] == 0) else self._random.uniform(0.0, self.jitter)
+            wait = max(slot + delay - time.monotonic(), 0.0)
+            self._next_run_at = datetime.now() + timedelta(seconds=wait)
+            if self._stop_event.wait(wait):
+                break
+            self.run_cycle()
+            slot = self._next_slot(slot, time.monotonic())
+
+    # -- Yaşam döngüsü ----------------------------------------------------
+
+    def start(self) -> "RefreshScheduler":
+        """Zamanlayıcıyı arka plan iş parçacığında başlat"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Yenileme zamanlayıcısı başlatıldı (aralık {self.interval:g}s, gecikme ≤{self.jitter:g}s)")
+        return self
+
+    def stop(self, timeout: float = None) -> None:
+        """Zamanlayıcıyı durdur; süren döngünün bitmesi beklenir"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._next_run_at = None
+        logger.info("Yenileme zamanlayıcısı durduruldu")
+
+    def run_forever(self) -> None:
+        """Ön planda çalış (Ctrl+C ile durur)"""
+        self.start()
+        try:
+            while self._thread.is_alive():
+                self._thread.join(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """Zamanlayıcı durumu (son başarılı yenileme zamanı dahil)"""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "in_progress": self._cycle_lock.locked(),
+            "last_success_at": self.last_success_at,
+            "last_attempt_at": self.last_attempt_at,
+            "last_duration_seconds": self.last_duration,
+            "last_changed": dict(self.last_changed),
+            "last_error": self.last_error,
+            "next_run_at": self._next_run_at,
+            **self.stats
+        }
@@ -0,0 +1,61 @@
+"""
+Aşama Önbelleği - Veri sürümüne bağlı boru hattı aşaması sonuçları
+"""
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+from services.instrumentation import tracer
+
+logger = logging.getLogger(__name__)
+
+class StageCache:
+    """
+    Boru hattı aşamalarının sonuçlarını veri sürümü başına bir kez hesaplar
+
+    Sonuçlar (aşama, parametreler) anahtarıyla tutulur; veri sürümü
+    değişince tümü düşer. Veri dışı durum değiştiğinde (model eğitimi,
+    indis/klimatoloji güncellemesi) invalidate() çağrılır. Dönen nesneler
+    paylaşılır, çağıranlar değiştirmemelidir.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self._results: Dict[Tuple[str, Tuple], Any] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_compute(self, version: str, stage: str, compute: Callable[[], Any],
+                       *key: Hashable) -> Any:
+        """
+        Aşama sonucunu önbellekten döndür, yoksa hesapla
+
+        Args:
+            version: Güncel veri sürümü
+            stage: Aşama adı
+            compute: Sonucu üreten parametresiz fonksiyon
+            *key: Sonucu etkileyen ek parametreler (ör. tahmin ufku)
+        """
+        if version != self.version:
+            self._results.clear()
+            self.version = version
+
+        cache_key = (stage, key)
+        if cache_key in self._results:
+            self.stats["hits"] += 1
+            tracer.count("stage_cache.hits")
+            return self._results[cache_key]
+
+        self.stats["misses"] += 1
+        tracer.count("stage_cache.misses")
+        result = compute()
+        self._results[cache_key] = result
+        return result
+
+    def invalidate(self, *stages: str) -> None:
+        """Verilen aşamaları (boşsa tümünü) düşür"""
+        if not stages:
+            self._results.clear()
+            return
+        for cache_key in [k for k in self._results if k[0] in stages]:
+            del self._results[cache_key]
+
+    def __contains__(self, stage: str) -> bool:
+        return any(k[0] == stage for k in self._results)
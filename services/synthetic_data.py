@@ -0,0 +1,351 @@
+"""
+Sentetik Veri Üreteci - İZSU ve meteoroloji servislerinin çevrimdışı yedeği,
+benchmark ve yük testleri için korelasyonlu, mevsimsel baraj ve meteoroloji
+panelleri
+"""
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+import logging
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from scipy.special import ndtri
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DAM_COLUMNS = ["date", "dam_name", "current_volume_mcm", "total_capacity_mcm", "fill_ratio",
+               "inflow_mcm", "outflow_mcm", "evaporation_mcm"]
+WEATHER_COLUMNS = ["date", "dam_name", "temp_max", "temp_min", "precipitation", "humidity",
+                   "pressure", "wind_speed", "latitude", "longitude", "nearest_station"]
+REQUIRED_FIELDS = ["capacity_mcm", "latitude", "longitude"]
+
+# Her değişkenin kendi rastgele akışı vardır; parça boyu seriyi değiştirmez.
+# Sıra değişirse aynı tohum farklı veri üretir, yeni akışlar sona eklenmeli.
+STREAMS = ["static", "temp_regional", "temp_local", "diurnal", "rain_regional", "rain_local",
+           "rain_amount", "humidity", "pressure_regional", "pressure_local", "wind",
+           "inflow", "outflow", "storage"]
+
+DAYS_PER_YEAR = 365.25
+# Sıcaklık temmuz sonunda, yağış ocakta tepe yapar (Ege iklimi)
+TEMPERATURE_PEAK_DOY = 205
+# Başlangıçtaki depolama geçici rejimini atmak için seriden önce üretilen gün sayısı
+BURN_IN_DAYS = 365
+
+# AR(1) kalıcılık katsayıları (günlük)
+TEMPERATURE_PERSISTENCE = 0.8
+WET_SPELL_PERSISTENCE = 0.6
+PRESSURE_PERSISTENCE = 0.7
+CATCHMENT_PERSISTENCE = 0.97   # ~1 aylık havza belleği
+STORAGE_PERSISTENCE = 0.995    # çok yıllı kurak/yağışlı dönemler
+# Yağışlı gün sürecinde bölgesel bileşenin payı (barajlar arası korelasyon)
+REGIONAL_RAIN_SHARE = 0.7
+# Havza nemi anomalisinin günlük doluluk değişimine katkısı
+STORAGE_RESPONSE = 0.0027
+# Akılar kapasitenin günlük oranı olarak: ortalama havza girişi ~%0.28/gün
+# (yılda ~1 hazne), sıcak yaz günü buharlaşması ~%0.05/gün, asgari salım
+INFLOW_RATE = 0.0014
+EVAPORATION_RATE = 0.002
+RELEASE_FLOOR_RATE = 0.0003
+
+# API yedeklerinin paylaştığı panel (süreç boyunca tek tohum)
+_shared_panel: Dict[str, object] = {}
+
+def _season(doy: np.ndarray) -> np.ndarray:
+    """Mevsim sinyali: temmuz sonunda +1, ocak sonunda -1"""
+    return np.cos(2 * np.pi * (doy - TEMPERATURE_PEAK_DOY) / DAYS_PER_YEAR)
+
+def _wet_probability(season: np.ndarray) -> np.ndarray:
+    """Yağışlı gün olasılığı (kışın ~0.45, yazın ~0.05)"""
+    return np.clip(0.25 - 0.2 * season, 0.02, 0.6)
+
+def _rain_scale(season: np.ndarray) -> np.ndarray:
+    """Yağışlı gün ortalama yağış miktarı ölçeği (mm)"""
+    return 6.0 - 3.0 * season
+
+# Gamma(0.8) ortalaması 0.8; yıllık ortalama günlük yağış (havza nemi normu)
+_CLIMATOLOGY_SEASON = _season(np.arange(1, 366))
+CLIMATOLOGICAL_PRECIPITATION = float(np.mean(
+    _wet_probability(_CLIMATOLOGY_SEASON) * 0.8 * _rain_scale(_CLIMATOLOGY_SEASON)))
+
+class SyntheticDataGenerator:
+    """
+    Vektörel sentetik baraj + meteoroloji paneli üreteci
+
+    Tüm barajlar ve günler (gün x baraj) dizileri üzerinde tek geçişte
+    üretilir, satır başına döngü yoktur. Meteoroloji bölgesel ortak ve
+    baraja özgü bileşenlerden oluşur (barajlar arası korelasyon); yağışlı
+    günler bölgesel bir Gauss kopulasıyla seçilir. Baraj paneli aynı
+    meteorolojiden türetilir: yağış havza nemini, havza nemi girişi ve
+    depolama anomalisini besler, sıcaklık buharlaşmayı belirler. Doluluk
+    kış yağışlarının ardından ilkbaharda tepe yapar. Akılar kapasiteyle
+    ölçeklenir ve depolamayla kütle dengesindedir: her gün
+    giriş - çıkış - buharlaşma = hacim değişimi; çıkış bu dengeden
+    (asgari salımın altına inmeden) bulunur.
+
+    Kalıcı süreçler AR(1) filtreleriyle üretilir ve filtre durumu parçalar
+    arasında taşınır; her değişken SeedSequence'tan türetilen ayrı bir
+    np.random.Generator akışı kullanır. Böylece aynı tohumla parça parça
+    üretim tek seferlik üretimle aynı seriyi verir.
+
+    Kullanım:
+        generator = SyntheticDataGenerator(seed=42)
+        dam_data, weather_data = generator.generate(days=365)
+        generator.write("data/synthetic", days=30 * 365, table_format="csv")
+    """
+
+    def __init__(self, dams: Mapping[str, Dict] = None, seed: Optional[int] = None,
+                 end_date: Union[str, date, None] = None):
+        """
+        Args:
+            dams: Baraj adı -> bilgi (capacity_mcm, latitude, longitude);
+                None ise settings.dam_registry
+            seed: Tohum (None ise settings.data.synthetic_seed, o da None ise rastgele)
+            end_date: Son gün (varsayılan bugün)
+
+        Raises:
+            ValueError: Baraj yoksa veya zorunlu alan eksikse
+        """
+        dams = settings.dam_registry if dams is None else dams
+        if not dams:
+            raise ValueError("Sentetik veri için en az bir baraj gerekli")
+        for name, info in dams.items():
+            missing = [field for field in REQUIRED_FIELDS if info.get(field) is None]
+            if missing:
+                raise ValueError(f"{name} barajında eksik alanlar: {missing}")
+
+        self.names = np.array(list(dams), dtype=object)
+        self.capacity = np.array([float(dams[name]["capacity_mcm"]) for name in self.names])[None, :]
+        self.latitude = np.array([float(dams[name]["latitude"]) for name in self.names])[None, :]
+        self.longitude = np.array([float(dams[name]["longitude"]) for name in self.names])[None, :]
+        self.stations = np.array([f"Sample_{name}" for name in self.names], dtype=object)[None, :]
+
+        seed = settings.data.synthetic_seed if seed is None else seed
+        # Tohumsuz üreteç de kendi içinde tekrarlanabilir olmalı (write iki geçiş yapar)
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.end_date = pd.Timestamp(end_date if end_date is not None else datetime.now()).normalize()
+
+    # -- Üretim -----------------------------------------------------------
+
+    def iter_chunks(self, days: int, chunk_days: int = None) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Paneli tarih sırasıyla parça parça üret
+
+        Args:
+            days: Gün sayısı (son gün end_date)
+            chunk_days: Parça boyu (gün, varsayılan settings.data.synthetic_chunk_days)
+
+        Yields:
+            (baraj verisi, meteoroloji verisi) parçaları; satırlar tarih, sonra baraj sırasında
+        """
+        if days < 1:
+            raise ValueError(f"Gün sayısı pozitif olmalı: {days}")
+        chunk_days = chunk_days or settings.data.synthetic_chunk_days
+        if chunk_days < 1:
+            raise ValueError(f"Parça boyu pozitif olmalı: {chunk_days}")
+
+        rngs = {name: np.random.default_rng(child) for name, child in
+                zip(STREAMS, np.random.SeedSequence(self.entropy).spawn(len(STREAMS)))}
+        params = self._dam_parameters(rngs["static"])
+        state: Dict[str, np.ndarray] = {}
+
+        dates = pd.date_range(end=self.end_date, periods=days + BURN_IN_DAYS, freq="D")
+        self._step(dates[:BURN_IN_DAYS], rngs, params, state)
+        for start in range(BURN_IN_DAYS, len(dates), chunk_days):
+            chunk = dates[start:start + chunk_days]
+            dam_columns, weather_columns = self._step(chunk, rngs, params, state)
+            yield self._frame(chunk, dam_columns), self._frame(chunk, weather_columns)
+
+    def generate(self, days: int, chunk_days: int = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Paneli DataFrame olarak üret
+
+        Returns:
+            Tuple: (baraj verisi, meteoroloji verisi)
+        """
+        dam_parts: List[pd.DataFrame] = []
+        weather_parts: List[pd.DataFrame] = []
+        for dam_part, weather_part in self.iter_chunks(days, chunk_days):
+            dam_parts.append(dam_part)
+            weather_parts.append(weather_part)
+        if len(dam_parts) == 1:
+            return dam_parts[0], weather_parts[0]
+        return (pd.concat(dam_parts, ignore_index=True), pd.concat(weather_parts, ignore_index=True))
+
+    def dam_data(self, days: int) -> pd.DataFrame:
+        """Yalnızca baraj paneli (İZSU verisiyle aynı sütunlar)"""
+        return self.generate(days)[0]
+
+    def weather_data(self, days: int) -> pd.DataFrame:
+        """Yalnızca meteoroloji paneli (meteoroloji servisiyle aynı sütunlar)"""
+        return self.generate(days)[1]
+
+    def write(self, output_dir: str, days: int, run_id: str = None, table_format: str = None,
+              chunk_days: int = None) -> Path:
+        """
+        Paneli parça parça dosyaya yaz (bellek kullanımı gün sayısından bağımsız)
+
+        Dosyalar ResultsWriter ile atomik yayınlanır: <output_dir>/<run_id>/
+        dam_data ve weather_data tabloları (parquet veya csv) ile manifest.
+
+        Returns:
+            Path: Yayınlanan dizin
+        """
+        from services.results_writer import ResultsWriter
+
+        run_id = run_id or f"synthetic_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        metadata = {"generator": {"dams": len(self.names), "days": days,
+                                  "end_date": self.end_date.strftime("%Y-%m-%d"), "entropy": str(self.entropy)}}
+        with ResultsWriter(output_dir, run_id=run_id, table_format=table_format, metadata=metadata) as writer:
+            # Tohum aynı olduğundan iki geçiş aynı paneli üretir
+            writer.write_table("dam_data", (dam for dam, _ in self.iter_chunks(days, chunk_days)))
+            writer.write_table("weather_data", (weather for _, weather in self.iter_chunks(days, chunk_days)))
+        logger.info(f"Sentetik veri yazıldı: {len(self.names)} baraj x {days} gün -> {writer.final_dir}")
+        return writer.final_dir
+
+    # -- Süreçler ---------------------------------------------------------
+
+    def _dam_parameters(self, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """Baraja özgü sabitler (1 x baraj)"""
+        n_dams = len(self.names)
+        return {
+            "base_fill": rng.uniform(0.45, 0.75, (1, n_dams)),
+            "temperature_offset": rng.normal(0.0, 1.0, (1, n_dams)),
+        }
+
+    @staticmethod
+    def _ar1(state: Dict[str, np.ndarray], key: str, innovations: np.ndarray, phi: float,
+             initial: np.ndarray) -> np.ndarray:
+        """
+        y[t] = phi * y[t-1] + innovations[t] (gün ekseninde, tüm seriler birlikte)
+
+        Filtre durumu state[key]'de bir sonraki parçaya taşınır; ilk parçada
+        y[-1] = initial kabul edilir.
+        """
+        zi = state.get(key)
+        if zi is None:
+            zi = phi * np.broadcast_to(initial, (1, innovations.shape[1]))
+        output, state[key] = lfilter([1.0], [1.0, -phi], innovations, axis=0, zi=zi)
+        return output
+
+    def _step(self, dates: pd.DatetimeIndex, rngs: Dict[str, np.random.Generator],
+              params: Dict[str, np.ndarray], state: Dict[str, np.ndarray]
+              ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Bir tarih parçası için meteoroloji ve baraj sütunları (gün x baraj)"""
+        n_days, n_dams = len(dates), len(self.names)
+        shape, regional = (n_days, n_dams), (n_days, 1)
+        doy = dates.dayofyear.to_numpy()[:, None]
+        season = _season(doy)
+
+        # Sıcaklık: mevsim + bölgesel kalıcı anomali + yerel gürültü
+        temp_sd = 1.5 * np.sqrt(1 - TEMPERATURE_PERSISTENCE ** 2)
+        temp_anomaly = self._ar1(state, "temp", rngs["temp_regional"].normal(0.0, temp_sd, regional),
+                                 TEMPERATURE_PERSISTENCE, 0.0)
+        temp_max = (23.0 + 9.0 * season + params["temperature_offset"] + temp_anomaly
+                    + rngs["temp_local"].normal(0.0, 1.0, shape))
+        diurnal_range = np.maximum(11.0 + 2.0 * season + rngs["diurnal"].normal(0.0, 1.5, shape), 4.0)
+        temp_min = temp_max - diurnal_range
+
+        # Yağış: bölgesel kalıcı bileşenli Gauss kopulası ile yağışlı gün, gamma miktar
+        rain_sd = np.sqrt(1 - WET_SPELL_PERSISTENCE ** 2)
+        rain_regional = self._ar1(state, "rain", rngs["rain_regional"].normal(0.0, rain_sd, regional),
+                                  WET_SPELL_PERSISTENCE, 0.0)
+        latent = (np.sqrt(REGIONAL_RAIN_SHARE) * rain_regional
+                  + np.sqrt(1 - REGIONAL_RAIN_SHARE) * rngs["rain_local"].standard_normal(shape))
+        wet = latent < ndtri(_wet_probability(season))
+        amount = rngs["rain_amount"].gamma(0.8, 1.0, shape) * _rain_scale(season)
+        precipitation = np.where(wet, amount, 0.0)
+
+        humidity = np.clip(62.0 - 14.0 * season + 12.0 * wet + rngs["humidity"].normal(0.0, 6.0, shape), 15.0, 100.0)
+        pressure_sd = 3.0 * np.sqrt(1 - PRESSURE_PERSISTENCE ** 2)
+        pressure = (1014.0 - 4.0 * season - 4.0 * wet
+                    + self._ar1(state, "pressure", rngs["pressure_regional"].normal(0.0, pressure_sd, regional),
+                                PRESSURE_PERSISTENCE, 0.0)
+                    + rngs["pressure_local"].normal(0.0, 1.0, shape))
+        wind_speed = rngs["wind"].gamma(4.0, 2.2, shape) + 3.0 * wet
+
+        # Havza nemi: yağışın ~1 aylık üstel ortalaması (iklim ortalaması 1)
+        wetness = self._ar1(state, "catchment", (1 - CATCHMENT_PERSISTENCE) * precipitation,
+                            CATCHMENT_PERSISTENCE, CLIMATOLOGICAL_PRECIPITATION) / CLIMATOLOGICAL_PRECIPITATION
+        catchment_inflow = (self.capacity * INFLOW_RATE * (0.4 + 1.6 * wetness)
+                            * rngs["inflow"].lognormal(0.0, 0.15, shape))
+        # Yazın sulama talebiyle artan asgari salım
+        release_floor = self.capacity * RELEASE_FLOOR_RATE * np.maximum(
+            1.0 + 0.3 * season + rngs["outflow"].normal(0.0, 0.1, shape), 0.2)
+
+        # Depolama anomalisi havza nemini biriktirir: kış yağışı ilkbahar tepesi,
+        # ardışık kurak yıllar çok yıllı düşüş üretir
+        storage_noise = STORAGE_RESPONSE * (wetness - 1.0) + rngs["storage"].normal(0.0, 0.002, shape)
+        storage = self._ar1(state, "storage", storage_noise, STORAGE_PERSISTENCE, 0.0)
+        fill_ratio = np.clip(params["base_fill"] + storage, 0.05, 0.98)
+        volume = self.capacity * fill_ratio
+
+        # Buharlaşma göl yüzeyiyle (~hacim^(2/3)) ve sıcaklıkla ölçeklenir
+        evaporation = (self.capacity * EVAPORATION_RATE * fill_ratio ** (2 / 3)
+                       * np.maximum(0.1 + 0.02 * (temp_max - 15.0), 0.02))
+
+        # Kütle dengesi: çıkış dengeyi kapatır; asgari salım tutmazsa giriş artırılır
+        change = np.diff(volume, axis=0, prepend=state.get("volume", volume[:1]))
+        state["volume"] = volume[-1:]
+        outflow = np.maximum(catchment_inflow - evaporation - change, release_floor)
+        inflow = change + evaporation + outflow
+
+        dam_columns = {
+            "current_volume_mcm": volume,
+            "total_capacity_mcm": self.capacity,
+            "fill_ratio": fill_ratio,
+            "inflow_mcm": inflow,
+            "outflow_mcm": outflow,
+            "evaporation_mcm": evaporation,
+        }
+        weather_columns = {
+            "temp_max": temp_max,
+            "temp_min": temp_min,
+            "precipitation": precipitation,
+            "humidity": humidity,
+            "pressure": pressure,
+            "wind_speed": wind_speed,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "nearest_station": self.stations,
+        }
+        return dam_columns, weather_columns
+
+    def _frame(self, dates: pd.DatetimeIndex, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """(gün x baraj) sütunlarını tarih-baraj sıralı uzun tabloya aç"""
+        n_days, n_dams = len(dates), len(self.names)
+        data = {
+            "date": np.repeat(dates.strftime("%Y-%m-%d").to_numpy(dtype=object), n_dams),
+            "dam_name": np.tile(self.names, n_days),
+        }
+        for column, values in columns.items():
+            data[column] = np.broadcast_to(values, (n_days, n_dams)).ravel()
+        return pd.DataFrame(data)
+
+def shared_sample_panel(days: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    İZSU ve meteoroloji yedeklerinin ortak örnek paneli
+
+    Baraj ve meteoroloji verisi tek generate() çağrısından gelir; ayrı
+    üreteçler ayrı tohumlarla yağış -> giriş -> depolama ilişkisini koparırdı.
+    Panel kayıttaki tüm barajlar için üretilir ve süreç boyunca saklanır:
+    daha kısa istekler son days günü alır, daha uzun istek ya da gün
+    değişimi paneli aynı tohumla yeniden üretir.
+
+    Args:
+        days: Gün sayısı (son gün bugün)
+
+    Returns:
+        Tuple: (baraj verisi, meteoroloji verisi) kopyaları
+    """
+    end_date = pd.Timestamp(datetime.now()).normalize()
+    if "entropy" not in _shared_panel:
+        _shared_panel["entropy"] = np.random.SeedSequence(settings.data.synthetic_seed).entropy
+    if _shared_panel.get("end_date") != end_date or _shared_panel.get("days", 0) < days:
+        generator = SyntheticDataGenerator(seed=_shared_panel["entropy"], end_date=end_date)
+        _shared_panel.update(end_date=end_date, days=days, panel=generator.generate(days))
+
+    start = (end_date - pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    return tuple(frame[frame["date"] >= start].reset_index(drop=True)
+                 for frame in _shared_panel["panel"])
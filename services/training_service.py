@@ -0,0 +1,307 @@
+"""
+Model Eğitim Servisi - settings.model.model_types modellerini barajlar ve
+CV fold'ları üzerinde paralel eğitir
+"""
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+from config.settings import settings
+from services.feature_service import FeatureEngine, STATIC_FEATURE_COLUMNS, static_features_for_rows
+
+logger = logging.getLogger(__name__)
+
+# Kuraklık sınıfı eşikleri (models/dam.py ile aynı merdiven)
+DROUGHT_CLASS_THRESHOLDS = [0.2, 0.4, 0.6, 0.8]
+
+GLOBAL_MODEL_KEY = "__global__"
+
+def create_model(model_type: str, params: Optional[Dict] = None):
+    """Model tipinden scikit-learn tahminleyicisi oluştur"""
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    params = dict(params or {})
+    if model_type == "random_forest":
+        params.setdefault("n_estimators", 100)
+        params.setdefault("random_state", 42)
+        # Paralellik süreç havuzunda; ağaç içi thread açma
+        params.setdefault("n_jobs", 1)
+        return RandomForestRegressor(**params)
+    elif model_type == "gradient_boosting":
+        params.setdefault("n_estimators", 100)
+        params.setdefault("random_state", 42)
+        return GradientBoostingRegressor(**params)
+    elif model_type == "linear_regression":
+        return LinearRegression(**params)
+    elif model_type == "logistic_regression":
+        params.setdefault("max_iter", 1000)
+        return make_pipeline(StandardScaler(), LogisticRegression(**params))
+    else:
+        raise ValueError(f"Desteklenmeyen model tipi: {model_type}")
+
+def is_classifier(model_type: str) -> bool:
+    """Model kuraklık sınıfı mı (True) yoksa doluluk oranı mı (False) tahmin ediyor"""
+    return model_type == "logistic_regression"
+
+def drought_classes(fill_ratio: np.ndarray) -> np.ndarray:
+    """Doluluk oranını kuraklık sınıfına çevir (0=kritik ... 4=normal)"""
+    return np.digitize(fill_ratio, DROUGHT_CLASS_THRESHOLDS)
+
+def time_series_folds(n_samples: int, n_folds: int,
+                      dates: Optional[np.ndarray] = None) -> List[Tuple[int, int, int]]:
+    """
+    Zaman serisi CV fold sınırları (eğitim hep testten önce gelir)
+
+    Args:
+        n_samples: Satır sayısı
+        n_folds: Fold sayısı
+        dates: Satırların sıralı tarihleri; verilirse sınırlar benzersiz günlere
+            konur (global modda aynı günün barajları eğitim ve teste bölünmez)
+
+    Returns:
+        List[Tuple[int, int, int]]: (eğitim_sonu, test_başı, test_sonu) satır indisleri
+    """
+    if dates is None:
+        unit_starts = np.arange(n_samples + 1)
+    else:
+        unique_dates = np.unique(dates)
+        unit_starts = np.r_[np.searchsorted(dates, unique_dates, side="left"), n_samples]
+    n_units = len(unit_starts) - 1
+
+    test_size = n_units // (n_folds + 1)
+    if test_size < 1:
+        return []
+    folds = []
+    for fold in range(n_folds):
+        train_end = n_units - (n_folds - fold) * test_size
+        folds.append((int(unit_starts[train_end]), int(unit_starts[train_end]),
+                      int(unit_starts[train_end + test_size])))
+    return folds
+
+def _fold_metrics(model_type: str, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """Fold tahmin metrikleri"""
+    if is_classifier(model_type):
+        return {"accuracy": float(np.mean(y_true == y_pred))}
+
+    error = y_pred - y_true
+    ss_tot = np.sum((y_true - y_true.mean()) ** 2)
+    return {
+        "rmse": float(np.sqrt(np.mean(error ** 2))),
+        "mae": float(np.mean(np.abs(error))),
+        "r2": float(1 - np.sum(error ** 2) / ss_tot) if ss_tot > 0 else 0.0
+    }
+
+def _run_training_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Süreç havuzu işçisi - tek (veri seti, model, fold) görevi
+
+    Matrisler pickle ile kopyalanmaz; işçi .npy dosyalarını mmap ile açar ve
+    işletim sistemi sayfaları süreçler arasında paylaşılır.
+    """
+    X = np.load(task["x_path"], mmap_mode="r")
+    y = np.load(task["y_path"], mmap_mode="r")
+    model_type = task["model_type"]
+    if is_classifier(model_type):
+        y = drought_classes(y)
+
+    model = create_model(model_type, task.get("params"))
+    fold = task.get("fold")
+
+    if fold is None:
+        model.fit(X, y)
+        return {**task, "model": model}
+
+    train_end, test_start, test_end = fold
+    y_train = y[:train_end]
+    if is_classifier(model_type) and len(np.unique(y_train)) < 2:
+        return {**task, "metrics": None}
+
+    model.fit(X[:train_end], y_train)
+    y_pred = model.predict(X[test_start:test_end])
+    return {**task, "metrics": _fold_metrics(model_type, np.asarray(y[test_start:test_end]), y_pred)}
+
+@dataclass
+class TrainingResult:
+    """Bir (baraj, model tipi) eğitim sonucu"""
+    dam_name: str
+    model_type: str
+    feature_columns: List[str]
+    model: Any = None
+    cv_metrics: List[Dict[str, float]] = field(default_factory=list)
+    n_samples: int = 0
+
+    @property
+    def mean_metrics(self) -> Dict[str, float]:
+        """Fold metriklerinin ortalaması"""
+        if not self.cv_metrics:
+            return {}
+        keys = self.cv_metrics[0].keys()
+        return {key: float(np.mean([m[key] for m in self.cv_metrics])) for key in keys}
+
+class ModelTrainer:
+    """
+    Baraj doluluk modellerini paralel eğiten servis
+
+    Her (veri seti x model tipi x fold) bir görevdir ve ProcessPoolExecutor'a
+    dağıtılır. Veri setleri geçici dizine .npy olarak yazılır. tuned_params
+    verilirse (baraj, model tipi) için aranmış hiperparametreler
+    model_params üzerine yazılır (bkz. ModelRegistry.tuned_params).
+    """
+
+    def __init__(self, model_types: List[str] = None, n_jobs: int = None,
+                 n_folds: int = None, mode: str = None,
+                 feature_engine: FeatureEngine = None,
+                 model_params: Dict[str, Dict] = None,
+                 tuned_params: Callable[[str, str], Optional[Dict]] = None):
+        self.model_types = model_types or settings.model.model_types
+        self.n_jobs = n_jobs if n_jobs is not None else settings.model.n_jobs
+        self.n_folds = n_folds or settings.model.cross_validation_folds
+        self.mode = mode or settings.model.training_mode
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.model_params = model_params or settings.model.model_params
+        self.tuned_params = tuned_params
+
+        if self.mode not in ("per_dam", "global"):
+            raise ValueError(f"Desteklenmeyen eğitim modu: {self.mode}")
+
+    @property
+    def workers(self) -> int:
+        """Gerçek işçi süreç sayısı"""
+        if self.n_jobs is None or self.n_jobs < 1:
+            return os.cpu_count() or 1
+        return self.n_jobs
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """Model girdisi sütunları (global modda statik baraj değişkenleri eklenir)"""
+        columns = list(self.feature_engine.feature_columns)
+        if self.mode == "global":
+            columns += STATIC_FEATURE_COLUMNS
+        return columns
+
+    def build_datasets(self, features: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Özellik çerçevesinden (X, y) matrisleri oluştur
+
+        Args:
+            features: FeatureEngine.transform çıktısı
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]: baraj (veya global) ->
+                (X, y, tarihler); tarihler fold sınırları içindir
+        """
+        columns = self.feature_engine.feature_columns
+        target = self.feature_engine.target_column
+        usable = features.dropna(subset=columns + [target]).sort_values(["date", "dam_name"], kind="stable")
+
+        if self.mode == "global":
+            groups = {GLOBAL_MODEL_KEY: usable}
+        else:
+            groups = {name: group for name, group in usable.groupby("dam_name", sort=False)}
+
+        datasets = {}
+        for key, group in groups.items():
+            if len(group) < settings.data.min_data_points:
+                logger.warning(f"Eğitim için yetersiz veri: {key} ({len(group)} satır)")
+                continue
+            X = group[columns].to_numpy(dtype=np.float32)
+            if self.mode == "global":
+                # Tüm barajların yığılmış paneli + statik baraj ortak değişkenleri
+                X = np.hstack([X, static_features_for_rows(group["dam_name"])])
+            X = np.ascontiguousarray(X)
+            y = np.ascontiguousarray(group[target].to_numpy(dtype=np.float64))
+            datasets[key] = (X, y, pd.to_datetime(group["date"]).to_numpy())
+
+        return datasets
+
+    def _build_tasks(self, datasets: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                     work_dir: str) -> List[Dict[str, Any]]:
+        """Veri setlerini diske yaz ve görev listesini oluştur"""
+        tasks = []
+        for index, (key, (X, y, dates)) in enumerate(datasets.items()):
+            x_path = os.path.join(work_dir, f"X_{index}.npy")
+            y_path = os.path.join(work_dir, f"y_{index}.npy")
+            np.save(x_path, X)
+            np.save(y_path, y)
+
+            folds = time_series_folds(len(y), self.n_folds, dates)
+            for model_type in self.model_types:
+                base = {
+                    "key": key,
+                    "model_type": model_type,
+                    "x_path": x_path,
+                    "y_path": y_path,
+                    "params": self._params(key, model_type)
+                }
+                tasks.extend({**base, "fold": fold} for fold in folds)
+                tasks.append({**base, "fold": None})
+        return tasks
+
+    def _params(self, key: str, model_type: str) -> Optional[Dict]:
+        """Model parametreleri: ayarlardakiler, varsa aranmış olanlarla güncellenmiş"""
+        params = self.model_params.get(model_type)
+        tuned = self.tuned_params(key, model_type) if self.tuned_params is not None else None
+        if tuned:
+            logger.info(f"{key} / {model_type}: aranmış hiperparametreler kullanılıyor {tuned}")
+            return {**(params or {}), **tuned}
+        return params
+
+    def run_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Görevleri süreç havuzunda (veya tek işçide sıralı) çalıştır"""
+        if self.workers == 1 or len(tasks) == 1:
+            return [_run_training_task(task) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            return list(executor.map(_run_training_task, tasks))
+
+    def train(self, features: pd.DataFrame) -> Dict[str, Dict[str, TrainingResult]]:
+        """
+        Tüm model tiplerini barajlar üzerinde eğit
+
+        Args:
+            features: FeatureEngine.transform çıktısı
+
+        Returns:
+            Dict[str, Dict[str, TrainingResult]]: baraj -> model tipi -> sonuç
+        """
+        datasets = self.build_datasets(features)
+        if not datasets:
+            logger.warning("Eğitilecek veri seti yok")
+            return {}
+
+        work_dir = tempfile.mkdtemp(prefix="izmir_training_")
+        try:
+            tasks = self._build_tasks(datasets, work_dir)
+            logger.info(f"{len(datasets)} veri seti x {len(self.model_types)} model için "
+                        f"{len(tasks)} eğitim görevi {self.workers} işçiye dağıtılıyor")
+            outputs = self.run_tasks(tasks)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        results: Dict[str, Dict[str, TrainingResult]] = {}
+        for output in outputs:
+            key, model_type = output["key"], output["model_type"]
+            result = results.setdefault(key, {}).setdefault(model_type, TrainingResult(
+                dam_name=key,
+                model_type=model_type,
+                feature_columns=self.feature_columns,
+                n_samples=len(datasets[key][1])
+            ))
+            if output["fold"] is None:
+                result.model = output["model"]
+            elif output.get("metrics"):
+                result.cv_metrics.append(output["metrics"])
+
+        for key, models in results.items():
+            for model_type, result in models.items():
+                logger.info(f"{key} / {model_type}: {result.mean_metrics}")
+
+        return results
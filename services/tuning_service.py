@@ -0,0 +1,376 @@
+"""
+Hiperparametre Arama Servisi - Zaman serisi CV fold'ları üzerinde ardışık
+yarılama (successive halving) / Hyperband, süreç havuzunda paralel denemeler
+"""
+import math
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+import logging
+from config.settings import settings
+from services.feature_service import FeatureEngine
+from services.training_service import (
+    ModelTrainer, create_model, is_classifier, drought_classes, time_series_folds, _fold_metrics
+)
+
+logger = logging.getLogger(__name__)
+
+# Model tiplerine göre varsayılan arama uzayları (settings.model.tuning_search_spaces ile ezilebilir)
+DEFAULT_SEARCH_SPACES: Dict[str, Dict[str, List]] = {
+    "random_forest": {
+        "n_estimators": [50, 100, 200, 400],
+        "max_depth": [None, 5, 10, 20],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": [1.0, 0.5, "sqrt"]
+    },
+    "gradient_boosting": {
+        "n_estimators": [50, 100, 200, 400],
+        "learning_rate": [0.01, 0.05, 0.1, 0.2],
+        "max_depth": [2, 3, 5],
+        "subsample": [0.7, 0.85, 1.0]
+    },
+    "linear_regression": {
+        "fit_intercept": [True, False]
+    },
+    "logistic_regression": {
+        "C": [0.01, 0.1, 1.0, 10.0, 100.0]
+    }
+}
+
+# Bütçe ne olursa olsun bir fold'un eğitiminde kullanılacak en az satır
+MIN_TRAIN_ROWS = 10
+
+def grid_size(space: Dict[str, List]) -> int:
+    """Tam ızgara aramasındaki kombinasyon sayısı"""
+    return int(np.prod([len(values) for values in space.values()])) if space else 1
+
+def sample_candidates(space: Dict[str, List], n_candidates: int,
+                      rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Arama uzayından tekrarsız rastgele aday konfigürasyonlar seç"""
+    names = list(space)
+    total = grid_size(space)
+    if total <= n_candidates:
+        indices = range(total)
+    else:
+        indices = rng.choice(total, size=n_candidates, replace=False)
+
+    candidates = []
+    for index in indices:
+        params = {}
+        for name in names:
+            index, choice = divmod(int(index), len(space[name]))
+            params[name] = space[name][choice]
+        candidates.append(params)
+    return candidates
+
+def _run_trial_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Süreç havuzu işçisi - tek (aday, bütçe, fold) denemesi
+
+    Özellik matrisleri tüm denemeler arasında paylaşılır: .npy dosyaları
+    mmap ile açılır, kopyalanmaz. Bütçe, fold eğitim penceresinin en yeni
+    kesridir.
+    """
+    X = np.load(task["x_path"], mmap_mode="r")
+    y = np.load(task["y_path"], mmap_mode="r")
+    model_type = task["model_type"]
+    if is_classifier(model_type):
+        y = drought_classes(y)
+
+    train_end, test_start, test_end = task["fold"]
+    n_train = min(train_end, max(MIN_TRAIN_ROWS, int(math.ceil(task["budget"] * train_end))))
+    train_start = train_end - n_train
+
+    y_train = y[train_start:train_end]
+    if is_classifier(model_type) and len(np.unique(y_train)) < 2:
+        return {"study": task["study"], "candidate": task["candidate"], "metrics": None}
+
+    model = create_model(model_type, task["params"])
+    model.fit(X[train_start:train_end], y_train)
+    y_pred = model.predict(X[test_start:test_end])
+    metrics = _fold_metrics(model_type, np.asarray(y[test_start:test_end]), y_pred)
+    return {"study": task["study"], "candidate": task["candidate"], "metrics": metrics}
+
+def _score(model_type: str, metrics: List[Dict[str, float]]) -> float:
+    """Küçük olan daha iyi skor (regresyonda RMSE, sınıflamada 1 - doğruluk)"""
+    if not metrics:
+        return float("inf")
+    if is_classifier(model_type):
+        return 1.0 - float(np.mean([m["accuracy"] for m in metrics]))
+    return float(np.mean([m["rmse"] for m in metrics]))
+
+@dataclass
+class _Study:
+    """Bir (veri seti, model tipi, Hyperband kolu) için ardışık yarılama durumu"""
+    key: str
+    model_type: str
+    candidates: List[Dict[str, Any]]
+    budgets: List[float]
+    rung: int = 0
+    history: List[Dict[str, Any]] = field(default_factory=list)
+    best_metrics: List[Dict[str, float]] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.rung >= len(self.budgets) or not self.candidates
+
+@dataclass
+class TuningResult:
+    """Bir (baraj, model tipi) için arama sonucu"""
+    dam_name: str
+    model_type: str
+    best_params: Dict[str, Any]
+    best_score: float
+    cv_metrics: List[Dict[str, float]] = field(default_factory=list)
+    n_trials: int = 0
+    n_fold_fits: int = 0
+    grid_fold_fits: int = 0
+    history: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def mean_metrics(self) -> Dict[str, float]:
+        """Tam bütçedeki fold metriklerinin ortalaması"""
+        if not self.cv_metrics:
+            return {}
+        keys = self.cv_metrics[0].keys()
+        return {key: float(np.mean([m[key] for m in self.cv_metrics])) for key in keys}
+
+class HyperparameterTuner:
+    """
+    Barajlar x model tipleri için ardışık yarılama / Hyperband araması
+
+    Her yarılama basamağında (rung) tüm çalışmaların (baraj x model x kol)
+    denemeleri tek bir süreç havuzuna birlikte verilir; basamak sonunda her
+    çalışmada adayların en iyi 1/eta'lık kısmı bir sonraki, eta kat daha
+    büyük bütçeye terfi eder.
+    """
+
+    def __init__(self, model_types: List[str] = None, strategy: str = None,
+                 n_candidates: int = None, reduction_factor: int = None,
+                 min_budget: float = None, n_folds: int = None, n_jobs: int = None,
+                 mode: str = None, feature_engine: FeatureEngine = None,
+                 search_spaces: Dict[str, Dict[str, List]] = None, random_state: int = 42):
+        self.model_types = model_types or settings.model.model_types
+        self.strategy = strategy or settings.model.tuning_strategy
+        self.n_candidates = n_candidates or settings.model.tuning_n_candidates
+        self.reduction_factor = reduction_factor or settings.model.tuning_reduction_factor
+        self.min_budget = min_budget or settings.model.tuning_min_budget
+        self.n_folds = n_folds or settings.model.cross_validation_folds
+        self.n_jobs = n_jobs if n_jobs is not None else settings.model.n_jobs
+        self.feature_engine = feature_engine or FeatureEngine()
+        self.trainer = ModelTrainer(model_types=self.model_types, n_jobs=self.n_jobs, n_folds=self.n_folds,
+                                    mode=mode, feature_engine=self.feature_engine)
+        self.search_spaces = {**DEFAULT_SEARCH_SPACES, **(search_spaces or settings.model.tuning_search_spaces)}
+        self.random_state = random_state
+
+        if self.strategy not in ("successive_halving", "hyperband"):
+            raise ValueError(f"Desteklenmeyen arama stratejisi: {self.strategy}")
+        if self.reduction_factor < 2:
+            raise ValueError(f"Yarılama katsayısı en az 2 olmalı: {self.reduction_factor}")
+        if not 0 < self.min_budget <= 1:
+            raise ValueError(f"Minimum bütçe (0, 1] aralığında olmalı: {self.min_budget}")
+
+    @property
+    def workers(self) -> int:
+        """Gerçek işçi süreç sayısı"""
+        return self.trainer.workers
+
+    def _rung_budgets(self, n_rungs: int) -> List[float]:
+        """En büyüğü 1.0 olan, eta kat büyüyen bütçeler"""
+        return [self.reduction_factor ** (rung - n_rungs + 1) for rung in range(n_rungs)]
+
+    def _brackets(self) -> List[Tuple[int, int]]:
+        """(aday sayısı, basamak sayısı) kolları"""
+        eta = self.reduction_factor
+        s_max = int(math.floor(math.log(1 / self.min_budget, eta) + 1e-9))
+        if self.strategy == "successive_halving":
+            return [(self.n_candidates, s_max + 1)]
+        return [(int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), s + 1) for s in range(s_max, -1, -1)]
+
+    def _create_studies(self, keys: List[str]) -> List[_Study]:
+        """Her (veri seti, model tipi, kol) için çalışma oluştur"""
+        rng = np.random.default_rng(self.random_state)
+        studies = []
+        for key in keys:
+            for model_type in self.model_types:
+                space = self.search_spaces.get(model_type, {})
+                # Küçük uzaylarda yarılama kazandırmaz, tüm ızgara tam bütçeyle denenir
+                if grid_size(space) <= self.reduction_factor:
+                    candidates = sample_candidates(space, grid_size(space), rng)
+                    studies.append(_Study(key, model_type, candidates, [1.0]))
+                    continue
+                for n_candidates, n_rungs in self._brackets():
+                    candidates = sample_candidates(space, n_candidates, rng)
+                    studies.append(_Study(key, model_type, candidates, self._rung_budgets(n_rungs)))
+        return studies
+
+    def _rung_tasks(self, studies: List[_Study], paths: Dict[str, Tuple[str, str]],
+                    folds: Dict[str, List[Tuple[int, int, int]]]) -> List[Dict[str, Any]]:
+        """Aktif çalışmaların mevcut basamak görevleri"""
+        tasks = []
+        for index, study in enumerate(studies):
+            if study.done:
+                continue
+            x_path, y_path = paths[study.key]
+            for candidate, params in enumerate(study.candidates):
+                for fold in folds[study.key]:
+                    tasks.append({
+                        "study": index,
+                        "candidate": candidate,
+                        "model_type": study.model_type,
+                        "params": params,
+                        "budget": study.budgets[study.rung],
+                        "fold": fold,
+                        "x_path": x_path,
+                        "y_path": y_path
+                    })
+        return tasks
+
+    def _promote(self, studies: List[_Study], outputs: List[Dict[str, Any]]) -> None:
+        """Basamak sonuçlarına göre her çalışmada en iyi adayları terfi ettir"""
+        collected: Dict[Tuple[int, int], List[Dict[str, float]]] = {}
+        for output in outputs:
+            metrics = collected.setdefault((output["study"], output["candidate"]), [])
+            if output["metrics"]:
+                metrics.append(output["metrics"])
+
+        for index, study in enumerate(studies):
+            if study.done:
+                continue
+            budget = study.budgets[study.rung]
+            scored = []
+            for candidate, params in enumerate(study.candidates):
+                metrics = collected.get((index, candidate), [])
+                score = _score(study.model_type, metrics)
+                study.history.append({"params": params, "budget": budget, "score": score})
+                scored.append((score, candidate, metrics))
+
+            scored.sort(key=lambda item: item[0])
+            study.rung += 1
+            if study.done:
+                study.candidates = [study.candidates[scored[0][1]]]
+                study.best_metrics = scored[0][2]
+            else:
+                keep = max(1, len(scored) // self.reduction_factor)
+                study.candidates = [study.candidates[candidate] for _, candidate, _ in scored[:keep]]
+                # Tek aday kaldıysa ara bütçeleri atlayıp doğrudan tam bütçeye geç
+                if keep == 1:
+                    study.rung = len(study.budgets) - 1
+
+    def tune(self, features: pd.DataFrame) -> Dict[str, Dict[str, TuningResult]]:
+        """
+        Tüm barajlar ve model tipleri için en iyi hiperparametreleri ara
+
+        Args:
+            features: FeatureEngine.transform çıktısı
+
+        Returns:
+            Dict[str, Dict[str, TuningResult]]: baraj -> model tipi -> sonuç
+        """
+        datasets = self.trainer.build_datasets(features)
+        if not datasets:
+            logger.warning("Hiperparametre araması için veri seti yok")
+            return {}
+
+        work_dir = tempfile.mkdtemp(prefix="izmir_tuning_")
+        try:
+            # Özellik matrisleri bir kez yazılır, tüm denemeler paylaşır
+            paths, folds = {}, {}
+            for index, (key, (X, y, dates)) in enumerate(datasets.items()):
+                paths[key] = (os.path.join(work_dir, f"X_{index}.npy"), os.path.join(work_dir, f"y_{index}.npy"))
+                np.save(paths[key][0], X)
+                np.save(paths[key][1], y)
+                folds[key] = time_series_folds(len(y), self.n_folds, dates)
+
+            studies = self._create_studies(list(datasets))
+            n_fits = 0
+            executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+            try:
+                while True:
+                    tasks = self._rung_tasks(studies, paths, folds)
+                    if not tasks:
+                        break
+                    n_fits += len(tasks)
+                    logger.info(f"Hiperparametre basamağı: {len(tasks)} deneme {self.workers} işçiye dağıtılıyor")
+                    if executor is None:
+                        outputs = [_run_trial_fold(task) for task in tasks]
+                    else:
+                        outputs = list(executor.map(_run_trial_fold, tasks, chunksize=max(1, len(tasks) // (self.workers * 4))))
+                    self._promote(studies, outputs)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return self._collect_results(studies, folds, n_fits)
+
+    def _collect_results(self, studies: List[_Study], folds: Dict[str, List],
+                         n_fits: int) -> Dict[str, Dict[str, TuningResult]]:
+        """Hyperband kollarının en iyisini (baraj, model tipi) başına seç"""
+        results: Dict[str, Dict[str, TuningResult]] = {}
+        for study in studies:
+            if not study.candidates:
+                continue
+            metrics = study.best_metrics
+            score = _score(study.model_type, metrics)
+            if not math.isfinite(score):
+                # Tüm fold'lar atlandıysa (ör. tek sınıflı eğitim dilimi) aday değerlendirilemedi
+                logger.warning(f"{study.key} / {study.model_type}: hiçbir fold skorlanamadı, sonuç dışı bırakıldı")
+                continue
+            space = self.search_spaces.get(study.model_type, {})
+
+            current = results.setdefault(study.key, {}).get(study.model_type)
+            if current is None:
+                current = TuningResult(
+                    dam_name=study.key,
+                    model_type=study.model_type,
+                    best_params=study.candidates[0],
+                    best_score=score,
+                    cv_metrics=metrics,
+                    grid_fold_fits=grid_size(space) * len(folds[study.key])
+                )
+                results[study.key][study.model_type] = current
+            elif score < current.best_score:
+                current.best_params, current.best_score, current.cv_metrics = study.candidates[0], score, metrics
+
+            current.history.extend(study.history)
+            current.n_trials = len(current.history)
+            current.n_fold_fits += sum(len(folds[study.key]) for _ in study.history)
+
+        for key, models in results.items():
+            for model_type, result in models.items():
+                logger.info(f"{key} / {model_type}: en iyi {result.best_params} (skor {result.best_score:.4f}, "
+                            f"{result.n_fold_fits} fit / ızgara {result.grid_fold_fits})")
+        logger.info(f"Hiperparametre araması tamamlandı: toplam {n_fits} fold fit")
+        return results
+
+    def fit_best(self, features: pd.DataFrame,
+                 results: Dict[str, Dict[str, TuningResult]]) -> Dict[str, Dict[str, Any]]:
+        """En iyi konfigürasyonları tüm veriyle eğit (ModelTrainer görev havuzuyla)"""
+        datasets = self.trainer.build_datasets(features)
+        work_dir = tempfile.mkdtemp(prefix="izmir_tuning_fit_")
+        try:
+            tasks = []
+            for index, (key, (X, y, _)) in enumerate(datasets.items()):
+                if key not in results:
+                    continue
+                x_path, y_path = os.path.join(work_dir, f"X_{index}.npy"), os.path.join(work_dir, f"y_{index}.npy")
+                np.save(x_path, X)
+                np.save(y_path, y)
+                for model_type, result in results[key].items():
+                    tasks.append({"key": key, "model_type": model_type, "x_path": x_path, "y_path": y_path,
+                                  "params": result.best_params, "fold": None})
+            outputs = self.trainer.run_tasks(tasks) if tasks else []
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        models: Dict[str, Dict[str, Any]] = {}
+        for output in outputs:
+            models.setdefault(output["key"], {})[output["model_type"]] = output["model"]
+        return models
@@ -0,0 +1,336 @@
+"""
+Su Dengesi Servisi - FAO-56 Penman-Monteith referans evapotranspirasyonu ve
+tüm barajlar için vektörel günlük hazne depolama simülasyonu
+"""
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional, Union
+import logging
+from config.settings import settings
+from services.bathymetry_service import DamCurveSet
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba opsiyonel, yoksa NumPy yolu kullanılır
+    njit = None
+    NUMBA_AVAILABLE = False
+
+SOLAR_CONSTANT = 0.0820          # MJ m-2 dk-1
+STEFAN_BOLTZMANN = 4.903e-9      # MJ K-4 m-2 gün-1
+SURFACE_AREA_EXPONENT = 2 / 3    # Alan-hacim ilişkisi A ~ V^(2/3)
+
+def saturation_vapour_pressure(temperature: np.ndarray) -> np.ndarray:
+    """Doymuş buhar basıncı e°(T) (kPa) - FAO-56 denklem 11"""
+    return 0.6108 * np.exp(17.27 * temperature / (temperature + 237.3))
+
+def extraterrestrial_radiation(latitude: np.ndarray, day_of_year: np.ndarray) -> np.ndarray:
+    """Atmosfer dışı radyasyon Ra (MJ m-2 gün-1) - FAO-56 denklem 21"""
+    phi = np.deg2rad(latitude)
+    angle = 2 * np.pi * day_of_year / 365
+    inverse_distance = 1 + 0.033 * np.cos(angle)
+    declination = 0.409 * np.sin(angle - 1.39)
+    sunset_angle = np.arccos(np.clip(-np.tan(phi) * np.tan(declination), -1.0, 1.0))
+    return (24 * 60 / np.pi) * SOLAR_CONSTANT * inverse_distance * (
+        sunset_angle * np.sin(phi) * np.sin(declination) +
+        np.cos(phi) * np.cos(declination) * np.sin(sunset_angle)
+    )
+
+def fao56_reference_et(temp_max: np.ndarray, temp_min: np.ndarray, humidity: np.ndarray,
+                       wind_speed: np.ndarray, pressure: np.ndarray, latitude: np.ndarray,
+                       day_of_year: np.ndarray, wind_height: float = 10.0,
+                       solar_radiation: Optional[np.ndarray] = None,
+                       radiation_coefficient: float = None) -> np.ndarray:
+    """
+    FAO-56 Penman-Monteith günlük referans evapotranspirasyon ET0 (mm/gün)
+
+    Tüm girdiler aynı şekle yayınlanabilen dizilerdir (ör. baraj x gün).
+    Güneş radyasyonu ölçülmemişse Hargreaves sıcaklık farkı formülüyle
+    (denklem 50) tahmin edilir. Günlük adımda toprak ısı akısı G = 0 alınır.
+
+    Args:
+        temp_max, temp_min: Günlük maksimum/minimum sıcaklık (°C)
+        humidity: Ortalama bağıl nem (%)
+        wind_speed: wind_height yüksekliğinde rüzgar hızı (m/s)
+        pressure: Atmosfer basıncı (hPa)
+        latitude: Enlem (derece)
+        day_of_year: Yılın günü (1-366)
+        wind_height: Rüzgar ölçüm yüksekliği (m)
+        solar_radiation: Ölçülmüş güneş radyasyonu Rs (MJ m-2 gün-1)
+        radiation_coefficient: Hargreaves kRs katsayısı
+
+    Returns:
+        np.ndarray: ET0 (mm/gün), negatif değerler 0'a kırpılır
+    """
+    if radiation_coefficient is None:
+        radiation_coefficient = settings.model.radiation_coefficient
+
+    temp_max = np.asarray(temp_max, dtype=np.float64)
+    temp_min = np.asarray(temp_min, dtype=np.float64)
+    temp_mean = (temp_max + temp_min) / 2
+
+    # Buhar basıncı açığı (denklem 12, 19)
+    es = (saturation_vapour_pressure(temp_max) + saturation_vapour_pressure(temp_min)) / 2
+    ea = np.clip(np.asarray(humidity, dtype=np.float64), 0, 100) / 100 * es
+
+    # Eğim ve psikrometrik sabit (denklem 13, 8)
+    delta = 4098 * saturation_vapour_pressure(temp_mean) / (temp_mean + 237.3) ** 2
+    gamma = 0.000665 * np.asarray(pressure, dtype=np.float64) / 10
+
+    # 2 m rüzgar hızı (denklem 47)
+    u2 = np.asarray(wind_speed, dtype=np.float64) * 4.87 / np.log(67.8 * wind_height - 5.42)
+
+    # Net radyasyon (denklem 21, 37, 38, 39, 50)
+    ra = extraterrestrial_radiation(np.asarray(latitude, dtype=np.float64), np.asarray(day_of_year))
+    if solar_radiation is None:
+        rs = radiation_coefficient * np.sqrt(np.maximum(temp_max - temp_min, 0.0)) * ra
+    else:
+        rs = np.asarray(solar_radiation, dtype=np.float64)
+    rso = 0.75 * ra
+    rns = (1 - 0.23) * rs
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cloudiness = np.clip(np.where(rso > 0, rs / rso, 0.0), 0.3, 1.0)
+    rnl = (STEFAN_BOLTZMANN * ((temp_max + 273.16) ** 4 + (temp_min + 273.16) ** 4) / 2 *
+           (0.34 - 0.14 * np.sqrt(ea)) * (1.35 * cloudiness - 0.35))
+    rn = rns - rnl
+
+    # Penman-Monteith (denklem 6)
+    numerator = 0.408 * delta * rn + gamma * (900 / (temp_mean + 273)) * u2 * (es - ea)
+    denominator = delta + gamma * (1 + 0.34 * u2)
+    return np.maximum(numerator / denominator, 0.0)
+
+def wind_speed_to_ms(wind_speed: np.ndarray, unit: str = None) -> np.ndarray:
+    """Rüzgar hızını m/s'ye çevir"""
+    unit = unit or settings.data.weather_wind_speed_unit
+    if unit == "km/h":
+        return np.asarray(wind_speed, dtype=np.float64) / 3.6
+    if unit == "m/s":
+        return np.asarray(wind_speed, dtype=np.float64)
+    raise ValueError(f"Desteklenmeyen rüzgar hızı birimi: {unit}")
+
+def reference_et_for_frame(weather_data: pd.DataFrame) -> np.ndarray:
+    """WeatherService şemasındaki çerçeve için satır başına ET0 (mm/gün)"""
+    day_of_year = pd.to_datetime(weather_data["date"]).dt.dayofyear.to_numpy()
+    return fao56_reference_et(
+        temp_max=weather_data["temp_max"].to_numpy(dtype=np.float64),
+        temp_min=weather_data["temp_min"].to_numpy(dtype=np.float64),
+        humidity=weather_data["humidity"].to_numpy(dtype=np.float64),
+        wind_speed=wind_speed_to_ms(weather_data["wind_speed"].to_numpy(dtype=np.float64)),
+        pressure=weather_data["pressure"].to_numpy(dtype=np.float64),
+        latitude=weather_data["latitude"].to_numpy(dtype=np.float64),
+        day_of_year=day_of_year
+    )
+
+def power_law_area(storage: np.ndarray, capacity: np.ndarray, full_area: np.ndarray) -> np.ndarray:
+    """Hacimden yüzey alanı (km²): A = A_dolu * (V / V_kapasite)^(2/3)"""
+    return full_area * np.power(np.clip(storage / capacity, 0.0, 1.0), SURFACE_AREA_EXPONENT)
+
+def _integrate_storage_numpy(initial_storage: np.ndarray, capacity: np.ndarray, full_area: np.ndarray,
+                             inflow: np.ndarray, outflow: np.ndarray, precipitation: np.ndarray,
+                             evaporation_depth: np.ndarray,
+                             area_function: Callable = power_law_area) -> Dict[str, np.ndarray]:
+    """
+    Saf NumPy depolama entegrasyonu
+
+    Depolama kendinden önceki güne bağlı olduğundan zaman ekseni sıralıdır;
+    her gün tüm barajlar tek vektör işlemiyle ilerletilir.
+    """
+    n_dams, n_days = inflow.shape
+    storage = np.empty((n_dams, n_days))
+    evaporation = np.empty((n_dams, n_days))
+    spill = np.empty((n_dams, n_days))
+
+    current = np.minimum(initial_storage.astype(np.float64), capacity)
+    for day in range(n_days):
+        area = area_function(current, capacity, full_area)
+        evaporated = np.minimum(evaporation_depth[:, day] * area * 1e-3, current)
+        updated = current + inflow[:, day] + precipitation[:, day] * area * 1e-3 - evaporated - outflow[:, day]
+        spill[:, day] = np.maximum(updated - capacity, 0.0)
+        current = np.clip(updated, 0.0, capacity)
+        storage[:, day] = current
+        evaporation[:, day] = evaporated
+
+    return {"storage": storage, "evaporation": evaporation, "spill": spill}
+
+def _storage_loop(initial_storage, capacity, full_area, inflow, outflow, precipitation,
+                  evaporation_depth, storage, evaporation, spill):
+    """numba ile derlenen skaler döngü (güç yasası alan ilişkisi)"""
+    n_dams, n_days = inflow.shape
+    for dam in range(n_dams):
+        current = min(initial_storage[dam], capacity[dam])
+        for day in range(n_days):
+            ratio = min(max(current / capacity[dam], 0.0), 1.0)
+            area = full_area[dam] * ratio ** SURFACE_AREA_EXPONENT
+            evaporated = min(evaporation_depth[dam, day] * area * 1e-3, current)
+            updated = (current + inflow[dam, day] + precipitation[dam, day] * area * 1e-3 -
+                       evaporated - outflow[dam, day])
+            spill[dam, day] = max(updated - capacity[dam], 0.0)
+            current = min(max(updated, 0.0), capacity[dam])
+            storage[dam, day] = current
+            evaporation[dam, day] = evaporated
+
+_storage_kernel = njit(cache=True)(_storage_loop) if NUMBA_AVAILABLE else None
+
+def integrate_storage(initial_storage: np.ndarray, capacity: np.ndarray, full_area: np.ndarray,
+                      inflow: np.ndarray, outflow: np.ndarray, precipitation: np.ndarray,
+                      evaporation_depth: np.ndarray, area_function: Callable = None,
+                      use_numba: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """
+    Günlük hazne depolamasını tüm barajlar için entegre et
+
+    S[t] = clip(S[t-1] + Q_giriş + (P - E) * A(S[t-1]) - Q_çıkış, 0, kapasite)
+
+    Args:
+        initial_storage, capacity, full_area: (baraj,) başlangıç hacmi (mcm),
+            kapasite (mcm), dolu yüzey alanı (km²)
+        inflow, outflow: (baraj, gün) havza girişi ve çekim/salım (mcm/gün)
+        precipitation, evaporation_depth: (baraj, gün) göl yüzeyine yağış ve açık su buharlaşması (mm/gün)
+        area_function: (hacim, kapasite, dolu alan) -> alan; verilirse NumPy yolu kullanılır
+        use_numba: None ise numba varsa kullanılır
+
+    Returns:
+        Dict[str, np.ndarray]: storage, evaporation, spill (baraj, gün) mcm
+    """
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in
+              (initial_storage, capacity, full_area, inflow, outflow, precipitation, evaporation_depth)]
+    if use_numba is None:
+        use_numba = NUMBA_AVAILABLE
+    if use_numba and not NUMBA_AVAILABLE:
+        logger.warning("numba yüklü değil, NumPy entegrasyonu kullanılıyor")
+        use_numba = False
+
+    if use_numba and area_function is None:
+        shape = arrays[3].shape
+        outputs = {name: np.empty(shape) for name in ("storage", "evaporation", "spill")}
+        _storage_kernel(*arrays, outputs["storage"], outputs["evaporation"], outputs["spill"])
+        return outputs
+
+    return _integrate_storage_numpy(*arrays, area_function=area_function or power_law_area)
+
+class WaterBalanceSimulator:
+    """
+    Çok barajlı günlük su dengesi simülatörü
+
+    Meteorolojik veri (baraj, gün) matrislerine çevrilir, ET0 tek vektör
+    çağrısıyla hesaplanır, açık su katsayısıyla göl buharlaşmasına, yüzey
+    alanıyla hacme dönüştürülür. Ölçülmüş giriş yoksa havza alanı ve akış
+    katsayısıyla yağıştan tahmin edilir. Alan-kot-hacim eğrileri verilirse
+    yüzey alanı eğriden okunur ve çıktıya su kotu eklenir.
+    """
+
+    def __init__(self, dam_info: Dict[str, Dict] = None, open_water_coefficient: float = None,
+                 runoff_coefficient: float = None, area_function: Callable = None,
+                 use_numba: Optional[bool] = None, curves: DamCurveSet = None):
+        self.dam_info = dam_info if dam_info is not None else settings.dam_registry
+        self.open_water_coefficient = (open_water_coefficient if open_water_coefficient is not None
+                                       else settings.model.open_water_coefficient)
+        self.runoff_coefficient = (runoff_coefficient if runoff_coefficient is not None
+                                   else settings.model.runoff_coefficient)
+        self.area_function = area_function
+        self.use_numba = use_numba
+        self.curves = curves
+
+    @staticmethod
+    def _panel(frame: pd.DataFrame, column: str, dam_names: List[str],
+               dates: pd.DatetimeIndex, fill_value: float = np.nan) -> np.ndarray:
+        """Uzun çerçeveden (baraj, gün) matris"""
+        if column not in frame.columns:
+            return np.full((len(dam_names), len(dates)), fill_value)
+        panel = frame.pivot_table(index="dam_name", columns="date", values=column, aggfunc="mean")
+        panel = panel.reindex(index=dam_names, columns=dates)
+        return panel.to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _broadcast(values: Union[None, float, Dict[str, float], np.ndarray],
+                   dam_names: List[str], n_days: int) -> np.ndarray:
+        """Skaler / baraj sözlüğü / matris girdiyi (baraj, gün) matrise yay"""
+        if values is None:
+            return np.zeros((len(dam_names), n_days))
+        if isinstance(values, dict):
+            values = np.array([values.get(name, 0.0) for name in dam_names], dtype=np.float64)[:, None]
+        return np.broadcast_to(np.asarray(values, dtype=np.float64), (len(dam_names), n_days)).copy()
+
+    def simulate(self, weather_data: pd.DataFrame, initial_storage: Dict[str, float] = None,
+                 outflow: Union[float, Dict[str, float], np.ndarray] = None,
+                 inflow_data: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Su dengesi simülasyonu
+
+        Args:
+            weather_data: WeatherService şemasında meteorolojik veri
+            initial_storage: baraj -> başlangıç hacmi (mcm), varsayılan yarı dolu
+            outflow: Günlük çekim/salım (mcm/gün); skaler, baraj sözlüğü veya (baraj, gün) matris
+            inflow_data: Ölçülmüş girişler (dam_name, date, inflow_mcm); eksik günler tahminle doldurulur
+
+        Returns:
+            pd.DataFrame: dam_name, date, et0_mm, evaporation_mm, inflow_mcm, outflow_mcm,
+                evaporation_mcm, spill_mcm, storage_mcm, fill_ratio
+                (+ surface_area_km2, elevation_m eğriler verildiyse)
+        """
+        if weather_data.empty:
+            return pd.DataFrame()
+
+        weather = weather_data.copy()
+        weather["date"] = pd.to_datetime(weather["date"])
+        dam_names = [name for name in pd.unique(weather["dam_name"]) if name in self.dam_info]
+        if not dam_names:
+            logger.warning("Su dengesi için bilinen baraj yok")
+            return pd.DataFrame()
+
+        dates = pd.date_range(weather["date"].min(), weather["date"].max(), freq="D")
+        weather["et0_mm"] = reference_et_for_frame(weather)
+
+        # Eksik günlerde ET0 için baraj ortalaması, yağış için 0
+        et0 = self._panel(weather, "et0_mm", dam_names, dates)
+        et0 = np.where(np.isnan(et0), np.nanmean(et0, axis=1, keepdims=True), et0)
+        precipitation = np.nan_to_num(self._panel(weather, "precipitation", dam_names, dates))
+        evaporation_depth = self.open_water_coefficient * et0
+
+        info = [self.dam_info[name] for name in dam_names]
+        capacity = np.array([d["capacity_mcm"] for d in info], dtype=np.float64)
+        full_area = np.array([d.get("surface_area_km2", 0.0) for d in info], dtype=np.float64)
+        catchment = np.array([d.get("catchment_area_km2", 0.0) for d in info], dtype=np.float64)
+
+        # Havza girişi (mcm): akış katsayısı * yağış (mm) * havza alanı (km²) * 1e-3
+        inflow = self.runoff_coefficient * precipitation * catchment[:, None] * 1e-3
+        if inflow_data is not None and not inflow_data.empty and "inflow_mcm" in inflow_data.columns:
+            observed = inflow_data.copy()
+            observed["date"] = pd.to_datetime(observed["date"])
+            measured = self._panel(observed, "inflow_mcm", dam_names, dates)
+            inflow = np.where(np.isnan(measured), inflow, measured)
+
+        outflow = self._broadcast(outflow, dam_names, len(dates))
+        if initial_storage is None:
+            initial_storage = {}
+        initial = np.array([initial_storage.get(name, cap / 2) for name, cap in zip(dam_names, capacity)])
+
+        area_function = self.area_function
+        use_curves = self.curves is not None and all(name in self.curves for name in dam_names)
+        if self.curves is not None and not use_curves:
+            logger.warning("Bazı barajların eğrisi yok, güç yasası alan ilişkisi kullanılıyor")
+        if use_curves and area_function is None:
+            area_function = self.curves.area_function(dam_names)
+
+        result = integrate_storage(initial, capacity, full_area, inflow, outflow, precipitation,
+                                   evaporation_depth, area_function=area_function,
+                                   use_numba=self.use_numba)
+
+        n_days = len(dates)
+        output = pd.DataFrame({
+            "dam_name": np.repeat(dam_names, n_days),
+            "date": np.tile(dates.to_numpy(), len(dam_names)),
+            "et0_mm": et0.ravel(),
+            "evaporation_mm": evaporation_depth.ravel(),
+            "inflow_mcm": inflow.ravel(),
+            "outflow_mcm": outflow.ravel(),
+            "evaporation_mcm": result["evaporation"].ravel(),
+            "spill_mcm": result["spill"].ravel(),
+            "storage_mcm": result["storage"].ravel(),
+            "fill_ratio": (result["storage"] / capacity[:, None]).ravel()
+        })
+        if use_curves:
+            output["surface_area_km2"] = self.curves.convert(dam_names, result["storage"], "volume", "area").ravel()
+            output["elevation_m"] = self.curves.convert(dam_names, result["storage"], "volume", "elevation").ravel()
+        return output
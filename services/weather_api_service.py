@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import logging
 import time
 from config.settings import settings
+from services.instrumentation import instrument_session
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ class WeatherAPIService:
         self.openweather_base_url = settings.api.openweather_base_url
         self.openweather_api_key = settings.api.openweather_api_key
         
-        self.session = requests.Session()
+        self.session = instrument_session(requests.Session())
         self.session.headers.update({
             'User-Agent': 'IzmirDamPrediction/1.0',
             'Accept': 'application/json'
@@ -268,34 +269,15 @@ class WeatherAPIService:
         Returns:
             pd.DataFrame: Örnek hava durumu verileri
         """
-        import numpy as np
-        
-        weather_data = []
-        
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-            
-            for dam_name in dam_names:
-                dam_info = settings.get_dam_info(dam_name)
-                if not dam_info:
-                    continue
-                
-                # Gerçekçi hava durumu verileri
-                weather_data.append({
-                    'date': date,
-                    'dam_name': dam_name,
-                    'temp_max': np.random.uniform(15, 35),
-                    'temp_min': np.random.uniform(5, 20),
-                    'precipitation': np.random.exponential(2.0),
-                    'humidity': np.random.uniform(40, 80),
-                    'pressure': np.random.uniform(1000, 1020),
-                    'wind_speed': np.random.uniform(5, 15),
-                    'latitude': dam_info['latitude'],
-                    'longitude': dam_info['longitude'],
-                    'nearest_station': f"Sample_{dam_name}"
-                })
-        
-        return pd.DataFrame(weather_data)
+        from services.synthetic_data import shared_sample_panel
+
+        # Baraj yedeğiyle aynı panelden: yağış ve doluluk birbiriyle tutarlı kalır
+        wanted = {settings.dam_registry.resolve(dam_name) for dam_name in dam_names}
+        weather_data = shared_sample_panel(days)[1]
+        weather_data = weather_data[weather_data["dam_name"].isin(wanted)].reset_index(drop=True)
+        if weather_data.empty:
+            return pd.DataFrame()
+        return weather_data
     
     def get_current_weather(self, dam_name: str) -> Optional[Dict]:
         """
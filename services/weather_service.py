@@ -2,13 +2,14 @@
 Meteorolojik Veri Servisi - İzmir bölgesi için özelleştirilmiş
 """
 import pandas as pd
-import requests
+from functools import cached_property
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-from geopy.distance import geodesic
 import numpy as np
 from config.settings import settings
+from services.instrumentation import count_http_response
+from services.water_balance_service import reference_et_for_frame
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +29,18 @@ class WeatherStation:
     
     def get_distance_to_point(self, lat: float, lon: float) -> float:
         """Belirli bir noktaya olan mesafeyi hesapla (km)"""
+        from geopy.distance import geodesic
         return geodesic((self.latitude, self.longitude), (lat, lon)).kilometers
 
 class WeatherService:
     """İzmir bölgesi meteorolojik veri servisi"""
     
-    def __init__(self):
-        self.weather_stations: Dict[str, WeatherStation] = {}
-        self._initialize_izmir_stations()
+    @cached_property
+    def weather_stations(self) -> Dict[str, WeatherStation]:
+        """İstasyon tablosu (ilk erişimde kurulur)"""
+        return self._initialize_izmir_stations()
     
-    def _initialize_izmir_stations(self) -> None:
+    def _initialize_izmir_stations(self) -> Dict[str, WeatherStation]:
         """İzmir bölgesi meteoroloji istasyonlarını başlat"""
         # İzmir ve çevresindeki meteoroloji istasyonları
         stations_data = [
@@ -91,6 +94,7 @@ class WeatherService:
             }
         ]
         
+        stations = {}
         for station_data in stations_data:
             station = WeatherStation(
                 station_id=station_data["station_id"],
@@ -98,7 +102,8 @@ class WeatherService:
                 latitude=station_data["latitude"],
                 longitude=station_data["longitude"]
             )
-            self.weather_stations[station.station_id] = station
+            stations[station.station_id] = station
+        return stations
     
     def get_nearest_station(self, latitude: float, longitude: float, 
                           max_distance_km: float = 50.0) -> Optional[WeatherStation]:
@@ -144,7 +149,9 @@ class WeatherService:
         }
         
         try:
-            response = requests.get(f"{base_url}/forecast", params=params, timeout=30)
+            import requests
+            response = requests.get(f"{base_url}/forecast", params=params, timeout=30,
+                                    hooks={"response": count_http_response})
             response.raise_for_status()
             data = response.json()
             
@@ -196,7 +203,9 @@ class WeatherService:
         }
         
         try:
-            response = requests.get(f"{base_url}/onecall", params=params, timeout=30)
+            import requests
+            response = requests.get(f"{base_url}/onecall", params=params, timeout=30,
+                                    hooks={"response": count_http_response})
             response.raise_for_status()
             data = response.json()
             
@@ -321,20 +330,16 @@ class WeatherService:
         return summary
     
     def calculate_evaporation_estimate(self, weather_data: pd.DataFrame) -> pd.Series:
-        """Buharlaşma tahmini hesapla"""
+        """Referans evapotranspirasyon tahmini (FAO-56 Penman-Monteith, mm/gün)"""
         if weather_data.empty:
             return pd.Series()
         
-        # Penman-Monteith benzeri basit formül
-        temp_avg = (weather_data['temp_max'] + weather_data['temp_min']) / 2
-        humidity = weather_data['humidity']
-        wind_speed = weather_data['wind_speed']
+        # Basınç veya konum yoksa deniz seviyesi ve İzmir merkezi varsayılır
+        defaults = {"pressure": 1013.25, "latitude": settings.visualization.map_center[0]}
+        missing = {column: value for column, value in defaults.items() if column not in weather_data.columns}
+        frame = weather_data.assign(**missing) if missing else weather_data
         
-        # Basit buharlaşma formülü (mm/gün)
-        evaporation = (temp_avg - 10) * (1 - humidity / 100) * (1 + wind_speed / 10) * 0.1
-        evaporation = np.clip(evaporation, 0, 10)  # 0-10 mm/gün arasında sınırla
-        
-        return evaporation
+        return pd.Series(reference_et_for_frame(frame), index=weather_data.index)
     
     def get_station_info(self) -> List[Dict]:
         """Meteoroloji istasyonu bilgileri"""
@@ -0,0 +1,122 @@
+"""
+Anlık Bildirim Test Dosyası
+Sorgu servisinin süreç içi istemcisini, abonelik filtrelerini ve kuyruk
+taşma (backpressure) politikalarını test eder
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import json
+from urllib.parse import quote
+import pytest
+from config.settings import settings
+from services.push_service import PushBroker
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Örnek CSV verileriyle hazırlanmış uygulama (uyarı durumu geçici dizine yazılır)"""
+    from main import IzmirDamPredictionApp
+
+    monkeypatch.setattr(settings.model, "alert_state_path", str(tmp_path / "alert_state.json"))
+
+    app = IzmirDamPredictionApp()
+    app.setup_data_sources("csv", "csv",
+                           dam_csv_path=os.path.join(DATA_DIR, "izmir_dam_data.csv"),
+                           weather_csv_path=os.path.join(DATA_DIR, "izmir_weather_data.csv"))
+    app.load_dam_data()
+    app.load_weather_data()
+    app.process_data()
+    return app
+
+def test_local_client(app):
+    """LocalClient soketsiz istekleri yanıtlar"""
+    from services.http_service import DamQueryService, LocalClient
+
+    async def run():
+        service = DamQueryService(app, port=0)
+        await service.refresh()
+        client = LocalClient(service)
+        dam_name = next(iter(service.snapshot.history))
+
+        status, health = await client.get("/health")
+        assert status == 200 and health["status"] == "ok"
+        status, history = await client.get(f"/dams/{dam_name}/history?days=2")
+        assert status == 200 and len(history["history"]) == 2
+        status, _ = await client.get(f"/dams/{dam_name}/history?days=-1")
+        assert status == 400
+        status, _ = await client.get("/dams/Yok/history")
+        assert status == 404
+
+    asyncio.run(run())
+
+def test_subscribe_filters_dams():
+    """subscribe(dams=...) yalnızca seçili barajların olaylarını ve durumunu verir"""
+    async def run():
+        broker = PushBroker(queue_size=8, policy="drop_oldest")
+        subscriber = broker.subscribe(dams=["Tahtalı"])
+        broker.publish("trend", "Balçova", {"current": "decreasing"})
+        broker.publish("trend", "Tahtalı", {"current": "increasing"})
+        broker.publish("alert", None, {"action": "OPENED"})
+
+        received = [await subscriber.next(timeout=0.1) for _ in range(2)]
+        assert [event.dam_name for event in received] == ["Tahtalı", None]
+        assert await subscriber.next(timeout=0.01) is None
+
+        states = {"Tahtalı": {"trend": "increasing"}, "Balçova": {"trend": "decreasing"}}
+        assert subscriber.visible(states) == {"Tahtalı": {"trend": "increasing"}}
+        assert broker.subscribe().visible(states) == states
+
+    asyncio.run(run())
+
+def test_sse_initial_state_respects_dam_filter(app):
+    """/events?dams=... ilk state çerçevesi yalnızca seçili barajları içerir"""
+    from services.http_service import DamQueryService
+
+    async def run():
+        service = DamQueryService(app, host="127.0.0.1", port=0)
+        await service.start()
+        try:
+            dam_name = next(iter(service.snapshot.dam_states))
+            reader, writer = await asyncio.open_connection("127.0.0.1", service.port)
+            writer.write(f"GET /events?dams={quote(dam_name)} HTTP/1.1\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            await reader.readuntil(b"\r\n\r\n")
+            frame = await asyncio.wait_for(reader.readuntil(b"\n\n"), timeout=5)
+            data = json.loads(frame.split(b"data: ", 1)[1])
+            assert data["event"] == "state"
+            assert set(data) - {"id", "event", "dam_name"} == {dam_name}
+            writer.close()
+        finally:
+            await service.stop()
+
+    asyncio.run(run())
+
+def test_backpressure_drop_oldest():
+    """Kuyruk dolunca en eski olaylar atılır ve önce resync gönderilir"""
+    async def run():
+        broker = PushBroker(queue_size=2, policy="drop_oldest")
+        subscriber = broker.subscribe()
+        for i in range(5):
+            broker.publish("trend", "Tahtalı", {"current": i})
+
+        resync = await subscriber.next(timeout=0.1)
+        assert resync.name == "resync" and resync.payload == {"dropped": 3}
+        remaining = [(await subscriber.next(timeout=0.1)).payload["current"] for _ in range(2)]
+        assert remaining == [3, 4]
+
+    asyncio.run(run())
+
+def test_backpressure_disconnect():
+    """disconnect politikasında yetişemeyen abone kapatılır ve listeden düşer"""
+    broker = PushBroker(queue_size=2, policy="disconnect")
+    subscriber = broker.subscribe()
+    for i in range(3):
+        broker.publish("trend", "Tahtalı", {"current": i})
+    assert subscriber.closed
+
+    broker.publish("trend", "Tahtalı", {"current": 3})
+    assert subscriber.id not in broker.subscribers